@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Markdown Benchmark - Throughput of compiling generated notes into ReportLab flowables
+
+Usage: python benchmarks/markdown_benchmark.py [--sections N] [--repeat N] [--notes FILE.md]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from markdown_compiler import MarkdownCompiler, inline_markup
+from render_benchmark import sample_notes
+from theme import get_document_factory
+
+
+def rich_notes(sections: int) -> str:
+    """Synthetic notes plus nested lists, a table, a code block and a quote per section"""
+    extra = "\n".join([
+        "  - Nested point with *italic* and `code`",
+        "    - Deeper point: a < b & c > d",
+        "| Quantity | Symbol | Unit |",
+        "|---|---|---|",
+        "| Focal length | **f** | m |",
+        "| Power | P | D |",
+        "```",
+        "1/v + 1/u = 1/f",
+        "```",
+        "> Remember: **virtual** images are always erect",
+        "---",
+    ])
+    return "\n".join(f"{block}\n{extra}" for block in sample_notes(sections).split("\n\n"))
+
+
+def measure(func, repeat: int) -> float:
+    """Best wall time of ``repeat`` runs, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the markdown-to-flowable compiler")
+    parser.add_argument("--sections", type=int, default=200, help="Concept sections in the synthetic notes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    parser.add_argument("--notes", help="Compile this markdown file instead of synthetic notes")
+    args = parser.parse_args()
+
+    notes = Path(args.notes).read_text(encoding='utf-8') if args.notes else rich_notes(args.sections)
+    factory = get_document_factory({})
+
+    seconds = measure(lambda: MarkdownCompiler(factory.styles, factory.frame_width).compile(notes), args.repeat)
+    lines = notes.count("\n") + 1
+    print(f"Notes: {len(notes) / 1e6:.2f} MB, {lines:,} lines")
+    print(f"Compile: {seconds * 1000:.1f} ms ({len(notes) / 1e6 / seconds:.2f} MB/s, {lines / seconds:,.0f} lines/s)")
+
+    # Inline conversion must stay linear in the number of emphasis spans on a line
+    print("Bold spans per line -> inline conversion time")
+    for spans in (1_000, 10_000, 100_000):
+        line = "plain **bold** " * spans
+        seconds = measure(lambda: inline_markup(line), args.repeat)
+        print(f"  {spans:>7,}: {seconds * 1000:8.1f} ms ({seconds / spans * 1e6:.2f} us/span)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Render Benchmark - Time per chapter for turning generated notes into PDFs
+
+Usage: python benchmarks/render_benchmark.py [--chapters N] [--sections N] [--notes FILE.md] [--processes N]
+       [--formats md,html,epub]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from notes_generator import NotesGenerator
+from output_backends import output_formats
+from render_pool import RenderPool
+from utils import load_config
+
+
+def sample_notes(sections: int = 12) -> str:
+    """Markdown shaped like Gemini's notes: headings, bullets, numbered lists and bold spans"""
+    parts = ["# 📚 Light - Reflection and Refraction", "", "## 🎯 Chapter Overview",
+             "Light travels in straight lines and is **reflected** or **refracted** at surfaces.", ""]
+    for n in range(1, sections + 1):
+        parts += [f"## 🔑 Concept {n}: Mirror formula & lens power", "",
+                  f"### Definition {n}",
+                  "- **Focal length** (f) is the distance between the pole and the principal focus",
+                  "- Sign convention: distances measured against the incident light are negative",
+                  "1. The mirror formula is **1/v + 1/u = 1/f** and magnification m = -v/u",
+                  "2. Power P = 1/f, measured in **dioptres** when f is in metres",
+                  "A longer paragraph that explains the concept in plain words, with **key terms** in bold, "
+                  "several clauses, and enough text to wrap over a few lines of the page. " * 3,
+                  ""]
+    return "\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF rendering of generated notes")
+    parser.add_argument("--chapters", type=int, default=20, help="Chapters to render (default: 20)")
+    parser.add_argument("--sections", type=int, default=12, help="Concept sections per synthetic chapter")
+    parser.add_argument("--notes", help="Render this markdown file instead of synthetic notes")
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Also render every chapter on a render pool with N processes (0: skip)")
+    parser.add_argument("--formats", default="",
+                        help="Also time these output formats per chapter, e.g. md,html,epub")
+    args = parser.parse_args()
+
+    notes = Path(args.notes).read_text(encoding='utf-8') if args.notes else sample_notes(args.sections)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = load_config()
+        config['output'] = {**config['output'], 'notes_dir': tmp}
+        config['cache'] = {'enabled': False}
+
+        started = time.perf_counter()
+        generator = NotesGenerator(None, config)
+        setup = time.perf_counter() - started
+
+        timings = []
+        for i in range(args.chapters):
+            started = time.perf_counter()
+            generator.save_as_pdf(notes, "Science", f"Chapter {i + 1}")
+            timings.append(time.perf_counter() - started)
+
+        if args.processes:
+            pool = RenderPool(args.processes)
+            # Warm the workers up so process start-up is not counted
+            for future in [generator.submit_pdf(pool, notes, "Science", "Warm-up") for _ in range(args.processes)]:
+                future.result()
+            started = time.perf_counter()
+            futures = [generator.submit_pdf(pool, notes, "Science", f"Chapter {i + 1}") for i in range(args.chapters)]
+            for future in futures:
+                future.result()
+            pooled = time.perf_counter() - started
+            pool.close()
+
+        format_timings = {}
+        for name in output_formats({'format': args.formats}) if args.formats else []:
+            started = time.perf_counter()
+            for i in range(args.chapters):
+                generator.save_outputs(notes, "Science", f"Chapter {i + 1}", [name])
+            format_timings[name] = (time.perf_counter() - started) / args.chapters
+
+    timings_ms = sorted(t * 1000 for t in timings)
+    p95 = timings_ms[min(len(timings_ms) - 1, int(len(timings_ms) * 0.95))]
+    print(f"Notes: {len(notes):,} characters, {len(notes.splitlines()):,} lines")
+    print(f"Generator setup: {setup * 1000:.1f} ms")
+    print(f"Rendered {len(timings)} chapters in {sum(timings):.2f} s "
+          f"({len(timings) / sum(timings):.1f} chapters/s)")
+    print(f"Per chapter: first {timings[0] * 1000:.1f} ms, median {statistics.median(timings_ms):.1f} ms, "
+          f"p95 {p95:.1f} ms")
+    print(f"Factory stats: {generator.documents.stats()}")
+    if args.processes:
+        print(f"Render pool ({args.processes} processes): {args.chapters} chapters in {pooled:.2f} s "
+              f"({args.chapters / pooled:.1f} chapters/s, {sum(timings) / pooled:.1f}x in-thread)")
+    for name, seconds in format_timings.items():
+        print(f"Format {name}: {seconds * 1000:.2f} ms per chapter "
+              f"({statistics.mean(timings) / seconds:.0f}x faster than PDF)")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,11 @@ A complete agentic system for generating study notes from NCERT textbooks
 
 import os
 import sys
+import argparse
+import json
+import time
 from pathlib import Path
+from typing import List
 from dotenv import load_dotenv
 from colorama import init, Fore, Style
 
@@ -14,14 +18,79 @@ from colorama import init, Fore, Style
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from agent import NCERTNotesAgent
-from utils import display_banner, get_user_input, load_config, setup_directories
+from checkpoints import UnknownRunError
+from manifest import ManifestError, apply_manifest, manifest_from_args, resolve_chapters
+from prefetch import prefetch_chapters, print_prefetch_report
+from utils import display_banner, get_catalogue, get_user_input, load_config, setup_directories
 
 # Initialize colorama for cross-platform colored output
 init(autoreset=True)
 
+# Exit status of headless runs
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_INVALID = 2
+EXIT_INTERRUPTED = 130
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Generate study notes from NCERT textbooks")
+    parser.add_argument("command", nargs="?", choices=["generate", "prefetch", "run"], default="generate",
+                        help="'generate' notes interactively (default), 'prefetch' every chapter PDF, "
+                             "or 'run' a headless job from a manifest and/or flags")
+    parser.add_argument("--grades",
+                        help="Batch mode: process every chapter of these grades (comma-separated, or 'all') in one run")
+    
+    headless = parser.add_argument_group("headless runs ('run' command)")
+    headless.add_argument("--manifest", help="YAML/JSON job manifest (grades, subjects, chapters, concurrency, cache)")
+    headless.add_argument("--subjects", help="Comma-separated subjects (default: all)")
+    headless.add_argument("--chapters", help="Comma-separated chapter numbers, ranges (1-5) or names (default: all)")
+    headless.add_argument("--shard", help="Process only shard INDEX/COUNT of the selected chapters, e.g. 0/4")
+    headless.add_argument("--mode", choices=["sequential", "pipeline", "async", "batch_prediction"], help="Concurrency mode override")
+    headless.add_argument("--format", help="Comma-separated output formats: pdf, md, html, epub (default: output.format)")
+    headless.add_argument("--status-file", help="Also write the final JSON status to this file")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Resume a checkpointed run: skip finished chapters and continue the rest")
+    parser.add_argument("--workers", type=int,
+                        help="Parallel downloads for prefetch (default: concurrency.download_workers)")
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument("--no-cache", action="store_true",
+                             help="Do not read or write the notes and extracted-text caches")
+    cache_group.add_argument("--refresh", action="store_true",
+                             help="Ignore cached results and overwrite them with fresh ones")
+    return parser.parse_args(argv)
+
+
+def apply_cli_overrides(config: dict, args: argparse.Namespace):
+    """Apply command-line options on top of the loaded configuration"""
+    cache_config = config.setdefault('cache', {})
+    if args.no_cache:
+        cache_config['enabled'] = False
+    if args.refresh:
+        cache_config['refresh'] = True
+
+
+def parse_grades(value: str) -> List[int]:
+    """Grades named by --grades, where 'all' means every grade in subjects.json"""
+    available = get_catalogue().grades()
+    if value.strip().lower() == "all":
+        return available
+    
+    grades = [int(part) for part in value.split(",") if part.strip()]
+    unknown = [grade for grade in grades if grade not in available]
+    if unknown:
+        raise ValueError(f"No subjects data for grade(s) {unknown}; available: {available}")
+    return grades
+
+
 def main():
     """Main entry point for the application"""
     
+    args = parse_args()
+    
+    if args.command == "run":
+        sys.exit(run_headless(args))
+    
     # Display banner
     display_banner()
     
@@ -30,10 +99,15 @@ def main():
     
     # Load configuration
     config = load_config()
+    apply_cli_overrides(config, args)
     
     # Setup directories
     setup_directories(config)
     
+    if args.command == "prefetch":
+        run_prefetch(config, args.workers, args.grades)
+        return
+    
     # Get API key
     # api_key = os.getenv("ANTHROPIC_API_KEY")
     # if not api_key:
@@ -45,6 +119,14 @@ def main():
     print(f"{Fore.CYAN}INFO: Make sure you have authenticated with Google Cloud CLI.")
     print(f"{Fore.CYAN}Run 'gcloud auth application-default login' in your terminal.")
     
+    if args.resume:
+        run_resume(config, args.resume)
+        return
+    
+    if args.grades:
+        run_batch(config, args.grades)
+        return
+    
     # Get user input
     print(f"\n{Fore.CYAN}{'='*70}")
     print(f"{Fore.CYAN}📚 Subject and Chapter Selection")
@@ -83,7 +165,7 @@ def main():
         
         print(f"\n{Fore.GREEN}{'='*70}")
         print(f"{Fore.GREEN}✨ All Done! Notes generation complete.")
-        print(f"{Fore.WHITE}📂 Check the '{config['output']['notes_dir']}' folder for your PDFs.")
+        print(f"{Fore.WHITE}📂 Check the '{config['output']['notes_dir']}' folder for your notes.")
         print(f"{Fore.GREEN}{'='*70}\n")
         
     except KeyboardInterrupt:
@@ -95,5 +177,129 @@ def main():
         traceback.print_exc()
         sys.exit(1)
 
+def run_headless(args: argparse.Namespace) -> int:
+    """
+    Run a job without any prompts and return its exit status.
+    
+    The last line on stdout is a JSON status object. Exit status is 0 when every
+    chapter succeeded, 1 when some failed, 2 for an invalid job and 130 when interrupted.
+    """
+    load_dotenv()
+    started = time.monotonic()
+    status = {"status": "error", "total": 0, "completed": 0, "failed": 0}
+    exit_code = EXIT_INVALID
+    
+    try:
+        manifest = manifest_from_args(args)
+        config = load_config()
+        apply_manifest(config, manifest)
+        apply_cli_overrides(config, args)
+        setup_directories(config)
+        
+        status.update(manifest=args.manifest, shard=manifest.get('shard'),
+                      mode=config.get('concurrency', {}).get('mode', 'sequential'))
+        
+        if args.resume:
+            status.update(NCERTNotesAgent(config=config).resume(args.resume))
+        else:
+            entries = resolve_chapters(manifest, get_catalogue(), config['grade'])
+            if not entries:
+                raise ManifestError("no chapters selected")
+            status.update(NCERTNotesAgent(config=config).run_chapters(entries))
+        
+        exit_code = EXIT_FAILURES if status["failed"] else EXIT_OK
+        status["status"] = "partial" if status["failed"] else "ok"
+    except (ManifestError, UnknownRunError) as e:
+        status["error"] = str(e)
+    except KeyboardInterrupt:
+        status.update(status="interrupted", error="interrupted")
+        exit_code = EXIT_INTERRUPTED
+    except Exception as e:
+        status["error"] = f"{type(e).__name__}: {str(e)}"
+        exit_code = EXIT_FAILURES
+    
+    status["seconds"] = round(time.monotonic() - started, 3)
+    report = json.dumps(status, ensure_ascii=False)
+    if args.status_file:
+        Path(args.status_file).write_text(report + "\n", encoding="utf-8")
+    print(report)
+    return exit_code
+
+def run_resume(config: dict, run_id: str):
+    """Continue an interrupted or partially failed run from its checkpoints"""
+    print(f"\n{Fore.MAGENTA}🚀 Resuming run {run_id}...")
+    agent = NCERTNotesAgent(config=config)
+    
+    try:
+        summary = agent.resume(run_id)
+    except UnknownRunError as e:
+        print(f"{Fore.RED}❌ {str(e)}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print(f"\n\n{Fore.YELLOW}⚠️  Process interrupted by user. Resume again with --resume {run_id}")
+        sys.exit(0)
+    
+    if summary["failed"]:
+        sys.exit(1)
+
+def run_batch(config: dict, grades_arg: str):
+    """Generate notes for every chapter of several grades with one agent (one model client, HTTP pool and cache)"""
+    try:
+        grades = parse_grades(grades_arg)
+    except ValueError as e:
+        print(f"{Fore.RED}❌ {str(e)}")
+        sys.exit(1)
+    
+    catalogue = get_catalogue()
+    print(f"\n{Fore.GREEN}{'='*70}")
+    print(f"{Fore.GREEN}📋 Batch Summary:")
+    total_chapters = 0
+    for grade in grades:
+        count = sum(1 for entry in catalogue.chapters(grade) if entry.url)
+        total_chapters += count
+        print(f"{Fore.WHITE}   Grade {grade}: {Fore.YELLOW}{count} chapters")
+    print(f"{Fore.GREEN}   Total: {Fore.YELLOW}{total_chapters} chapters")
+    print(f"{Fore.GREEN}{'='*70}")
+    
+    confirm = input(f"\n{Fore.CYAN}➡️  Proceed with note generation? (yes/no): {Style.RESET_ALL}").strip().lower()
+    if confirm not in ['yes', 'y']:
+        print(f"{Fore.YELLOW}❌ Cancelled.")
+        sys.exit(0)
+    
+    print(f"\n{Fore.MAGENTA}🚀 Initializing NCERT Notes Generator Agent...")
+    agent = NCERTNotesAgent(config=config)
+    
+    try:
+        summary = agent.run_batch(grades)
+    except KeyboardInterrupt:
+        print(f"\n\n{Fore.YELLOW}⚠️  Process interrupted by user. Exiting...")
+        sys.exit(0)
+    
+    print(f"\n{Fore.GREEN}✨ Batch complete. Check the '{config['output']['notes_dir']}' folder (one grade_<n> folder per extra grade).")
+    if summary["failed"]:
+        sys.exit(1)
+
+def run_prefetch(config: dict, workers: int = None, grades_arg: str = None):
+    """Warm the downloads directory with every chapter PDF of the configured grade (or of --grades)"""
+    print(f"\n{Fore.CYAN}{'='*70}")
+    print(f"{Fore.CYAN}📥 Prefetching NCERT PDFs into '{config['output']['downloads_dir']}'")
+    print(f"{Fore.CYAN}{'='*70}")
+    
+    try:
+        grades = parse_grades(grades_arg) if grades_arg else None
+    except ValueError as e:
+        print(f"{Fore.RED}❌ {str(e)}")
+        sys.exit(1)
+    
+    try:
+        report = prefetch_chapters(config, workers, grades)
+    except KeyboardInterrupt:
+        print(f"\n\n{Fore.YELLOW}⚠️  Prefetch interrupted by user. Partial downloads will resume next time.")
+        sys.exit(0)
+    
+    print_prefetch_report(report)
+    if report["failed"]:
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
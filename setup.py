@@ -30,11 +30,13 @@ setup(
     install_requires=[
         "anthropic>=0.39.0",
         "langgraph>=0.2.0",
+        "langgraph-checkpoint-sqlite>=2.0.0",
         "langchain>=0.1.0",
         "PyPDF2>=3.0.0",
         "reportlab>=4.0.0",
         "beautifulsoup4>=4.12.0",
         "requests>=2.31.0",
+        "aiohttp>=3.9.0",
         "pdfplumber>=0.10.0",
         "python-dotenv>=1.0.0",
         "pyyaml>=6.0.1",
@@ -3,22 +3,37 @@
 Agent Module - Core agentic workflow using LangGraph
 """
 
-from typing import List, Dict, TypedDict
+import asyncio
+import contextlib
+from collections import Counter
+from typing import List, Dict, Iterable, Optional, Tuple, TypedDict
 from pathlib import Path
+import aiohttp
 from langgraph.graph import StateGraph, END
 import vertexai
 from vertexai.generative_models import GenerativeModel
 from colorama import Fore, Style
 
+from catalogue import Chapter
+from checkpoints import RunCheckpoints, resume_point
 from pdf_processor import PDFProcessor
-from notes_generator import NotesGenerator
-from utils import log_progress
+from batch_prediction import BatchPredictor
+from notes_generator import NotesGenerator, generate_notes_batch
+from output_manifest import OutputManifest, output_key
+from pipeline import ChapterPipeline, DEFAULT_STAGE_WORKERS
+from render_pool import RenderPool
+from utils import get_catalogue, log_progress
+
+
+# Workflow stages in execution order
+STAGES = ["download_pdf", "extract_content", "generate_notes", "save_notes"]
 
 
 class AgentState(TypedDict):
     """State for the agent workflow"""
     subjects: List[str]
     chapters: Dict[str, List[str]]
+    grade: int
     current_subject: str
     current_chapter: str
     pdf_path: str
@@ -26,7 +41,10 @@ class AgentState(TypedDict):
     generated_notes: str
     pdf_saved: bool
     error: str
+    failed_stage: str
     progress: str
+    output_key: str
+    up_to_date: bool
 
 
 class NCERTNotesAgent:
@@ -38,26 +56,64 @@ class NCERTNotesAgent:
         self.client = GenerativeModel(model_name=config['google']['model'])
         self.pdf_processor = PDFProcessor(config)
         self.notes_generator = NotesGenerator(self.client, config)
+        self._grade_generators = {}
         self.workflow = self._build_workflow()
+        self.async_workflow = self._build_workflow(use_async=True)
+        self._http_session = None
+        self.checkpoints = None
+        self.batch_predictor = None
+        self._batch_notes = {}
+        self.render_pool = None
+        self._renders = {}
+        self.output_manifest = OutputManifest.from_config(config)
+        self._up_to_date = []
     
-    def _build_workflow(self) -> StateGraph:
-        """Build the LangGraph workflow"""
+    def _build_workflow(self, use_async: bool = False, checkpointer=None) -> StateGraph:
+        """Build the LangGraph workflow, optionally from the asyncio-native nodes and with a checkpointer"""
         workflow = StateGraph(AgentState)
         
         # Add nodes
-        workflow.add_node("download_pdf", self.download_pdf_node)
-        workflow.add_node("extract_content", self.extract_content_node)
-        workflow.add_node("generate_notes", self.generate_notes_node)
-        workflow.add_node("save_notes", self.save_notes_node)
+        if use_async:
+            workflow.add_node("download_pdf", self.adownload_pdf_node)
+            workflow.add_node("extract_content", self.aextract_content_node)
+            workflow.add_node("generate_notes", self.agenerate_notes_node)
+            workflow.add_node("save_notes", self.asave_notes_node)
+        else:
+            workflow.add_node("download_pdf", self.download_pdf_node)
+            workflow.add_node("extract_content", self.extract_content_node)
+            workflow.add_node("generate_notes", self.generate_notes_node)
+            workflow.add_node("save_notes", self.save_notes_node)
+        
+        workflow.add_node("record_failure", self.record_failure_node)
         
-        # Define edges
+        # Define edges: every stage continues only while no error is recorded,
+        # otherwise the chapter goes straight to the failure sink
         workflow.set_entry_point("download_pdf")
-        workflow.add_edge("download_pdf", "extract_content")
-        workflow.add_edge("extract_content", "generate_notes")
-        workflow.add_edge("generate_notes", "save_notes")
-        workflow.add_edge("save_notes", END)
+        for stage, next_stage in zip(STAGES, STAGES[1:] + [END]):
+            workflow.add_conditional_edges(stage, self._route_after(next_stage),
+                                           list(dict.fromkeys([next_stage, "record_failure", END])))
+        workflow.add_edge("record_failure", END)
         
-        return workflow.compile()
+        return workflow.compile(checkpointer=checkpointer)
+    
+    @staticmethod
+    def _route_after(next_stage: str):
+        """Conditional edge: go on to ``next_stage`` unless the node recorded an error or found the outputs current"""
+        def route(state: AgentState) -> str:
+            if state.get("error"):
+                return "record_failure"
+            return END if state.get("up_to_date") else next_stage
+        return route
+    
+    @staticmethod
+    def _finished(state: dict) -> bool:
+        """Pipeline stop predicate: the chapter failed or its outputs are already up to date"""
+        return bool(state.get("error") or state.get("up_to_date"))
+    
+    def record_failure_node(self, state: AgentState) -> AgentState:
+        """Node: Failure sink, reached as soon as any stage records an error"""
+        log_progress(f"Skipping remaining stages after {state['failed_stage'] or 'unknown'} failure", "warning")
+        return state
     
     def download_pdf_node(self, state: AgentState) -> AgentState:
         """Node: Download PDF from NCERT website"""
@@ -67,11 +123,15 @@ class NCERTNotesAgent:
         log_progress(f"Downloading: {subject} - {chapter}", "download")
         
         try:
-            pdf_path = self.pdf_processor.download_chapter(subject, chapter)
+            pdf_path = self.pdf_processor.download_chapter(subject, chapter, state["grade"])
+            if not self.pdf_processor.downloader.is_valid_pdf(pdf_path):
+                raise FileNotFoundError(f"no complete PDF at {pdf_path}")
             state["pdf_path"] = str(pdf_path)
             log_progress(f"Downloaded: {pdf_path.name}", "success")
+            self._check_outputs(state)
         except Exception as e:
             state["error"] = f"Download failed: {str(e)}"
+            state["failed_stage"] = "download_pdf"
             log_progress(state["error"], "error")
         
         return state
@@ -86,6 +146,7 @@ class NCERTNotesAgent:
             log_progress(f"Extracted {len(content)} characters", "success")
         except Exception as e:
             state["error"] = f"Extraction failed: {str(e)}"
+            state["failed_stage"] = "extract_content"
             log_progress(state["error"], "error")
         
         return state
@@ -95,87 +156,674 @@ class NCERTNotesAgent:
         log_progress("Generating AI-powered study notes...", "ai")
         
         try:
-            notes = self.notes_generator.generate_notes(
-                state["extracted_content"],
-                state["current_subject"],
-                state["current_chapter"]
-            )
+            if self._streams_pdf(state):
+                notes, pdf_path = self._generator_for(state).stream_notes_to_pdf(
+                    state["extracted_content"],
+                    state["current_subject"],
+                    state["current_chapter"],
+                    state.get("output_key") or None
+                )
+                state["pdf_saved"] = True
+                log_progress(f"Streamed and saved: {pdf_path.name}", "success")
+            else:
+                notes = self._generator_for(state).generate_notes(
+                    state["extracted_content"],
+                    state["current_subject"],
+                    state["current_chapter"]
+                )
             state["generated_notes"] = notes
             log_progress("Notes generated successfully", "success")
         except Exception as e:
             state["error"] = f"Note generation failed: {str(e)}"
+            state["failed_stage"] = "generate_notes"
             log_progress(state["error"], "error")
+            return state
+        
+        if self.render_pool and not state["pdf_saved"] and "pdf" in self._generator_for(state).formats:
+            # Start rendering now; blocks while the pool's queue is full, which holds back generation
+            try:
+                self._renders[self._task_key(state)] = self._generator_for(state).submit_pdf(
+                    self.render_pool, notes, state["current_subject"], state["current_chapter"],
+                    state.get("output_key") or None)
+            except Exception as e:
+                log_progress(f"Could not queue render, retrying at save: {str(e)}", "warning")
         
         return state
     
     def save_notes_node(self, state: AgentState) -> AgentState:
-        """Node: Save generated notes as PDF"""
-        log_progress("Saving notes to PDF...", "save")
+        """Node: Save generated notes in every configured output format"""
+        formats = self._pending_formats(state)
+        if not formats:
+            # Already rendered while streaming
+            self._record_outputs(state)
+            return state
+        
+        log_progress(f"Saving notes ({', '.join(formats)})...", "save")
         
         try:
-            pdf_path = self.notes_generator.save_as_pdf(
-                state["generated_notes"],
-                state["current_subject"],
-                state["current_chapter"]
-            )
+            paths = self._save_outputs(state, formats)
+            self._record_outputs(state)
+            state["pdf_saved"] = True
+            log_progress(f"Saved: {', '.join(path.name for path in paths)}", "success")
+        except Exception as e:
+            state["error"] = f"Save failed: {str(e)}"
+            state["failed_stage"] = "save_notes"
+            log_progress(state["error"], "error")
+        
+        return state
+    
+    async def adownload_pdf_node(self, state: AgentState) -> AgentState:
+        """Async node: Download PDF over the shared aiohttp session"""
+        subject = state["current_subject"]
+        chapter = state["current_chapter"]
+        
+        log_progress(f"Downloading: {subject} - {chapter}", "download")
+        
+        try:
+            pdf_path = await self.pdf_processor.adownload_chapter(subject, chapter, self._http_session, state["grade"])
+            if not self.pdf_processor.downloader.is_valid_pdf(pdf_path):
+                raise FileNotFoundError(f"no complete PDF at {pdf_path}")
+            state["pdf_path"] = str(pdf_path)
+            log_progress(f"Downloaded: {pdf_path.name}", "success")
+            await asyncio.to_thread(self._check_outputs, state)
+        except Exception as e:
+            state["error"] = f"Download failed: {str(e)}"
+            state["failed_stage"] = "download_pdf"
+            log_progress(state["error"], "error")
+        
+        return state
+    
+    async def aextract_content_node(self, state: AgentState) -> AgentState:
+        """Async node: Extract text in a worker thread so the event loop stays free"""
+        log_progress(f"Extracting content from PDF: {state['current_chapter']}", "process")
+        
+        try:
+            content = await asyncio.to_thread(self.pdf_processor.extract_text, state["pdf_path"])
+            state["extracted_content"] = content
+            log_progress(f"Extracted {len(content)} characters", "success")
+        except Exception as e:
+            state["error"] = f"Extraction failed: {str(e)}"
+            state["failed_stage"] = "extract_content"
+            log_progress(state["error"], "error")
+        
+        return state
+    
+    async def agenerate_notes_node(self, state: AgentState) -> AgentState:
+        """Async node: Generate study notes with the async Gemini API"""
+        log_progress(f"Generating AI-powered study notes: {state['current_chapter']}", "ai")
+        
+        try:
+            if self._streams_pdf(state):
+                notes, pdf_path = await self._generator_for(state).astream_notes_to_pdf(
+                    state["extracted_content"],
+                    state["current_subject"],
+                    state["current_chapter"],
+                    state.get("output_key") or None
+                )
+                state["pdf_saved"] = True
+                log_progress(f"Streamed and saved: {pdf_path.name}", "success")
+            else:
+                notes = await self._generator_for(state).agenerate_notes(
+                    state["extracted_content"],
+                    state["current_subject"],
+                    state["current_chapter"]
+                )
+            state["generated_notes"] = notes
+            log_progress("Notes generated successfully", "success")
+        except Exception as e:
+            state["error"] = f"Note generation failed: {str(e)}"
+            state["failed_stage"] = "generate_notes"
+            log_progress(state["error"], "error")
+        
+        return state
+    
+    async def asave_notes_node(self, state: AgentState) -> AgentState:
+        """Async node: Write the output formats in a worker thread, the PDF in the render pool if running"""
+        formats = self._pending_formats(state)
+        if not formats:
+            # Already rendered while streaming
+            await asyncio.to_thread(self._record_outputs, state)
+            return state
+        
+        log_progress(f"Saving notes ({', '.join(formats)}): {state['current_chapter']}", "save")
+        
+        try:
+            paths = await asyncio.to_thread(self._save_outputs, state, formats)
+            await asyncio.to_thread(self._record_outputs, state)
             state["pdf_saved"] = True
-            log_progress(f"Saved: {pdf_path.name}", "success")
+            log_progress(f"Saved: {', '.join(path.name for path in paths)}", "success")
         except Exception as e:
             state["error"] = f"Save failed: {str(e)}"
+            state["failed_stage"] = "save_notes"
+            log_progress(state["error"], "error")
+        
+        return state
+    
+    def batch_notes_node(self, state: AgentState) -> AgentState:
+        """Node: Pick up the chapter's notes from the finished batch prediction job"""
+        try:
+            notes = self._batch_notes.pop(self._task_key(state))
+            if isinstance(notes, Exception):
+                raise notes
+            state["generated_notes"] = notes
+            log_progress(f"Batch notes received: {state['current_chapter']}", "success")
+        except Exception as e:
+            state["error"] = f"Note generation failed: {str(e)}"
+            state["failed_stage"] = "generate_notes"
             log_progress(state["error"], "error")
         
         return state
     
-    def run(self, subjects: List[str], chapters: Dict[str, List[str]]):
+    def _streams_pdf(self, state: AgentState) -> bool:
+        """Whether the chapter's PDF is built while Gemini streams (only when PDF output is wanted)"""
+        return self.config['google'].get('stream', False) and "pdf" in self._generator_for(state).formats
+    
+    def _pending_formats(self, state: AgentState) -> List[str]:
+        """Output formats the chapter still needs; a PDF rendered while streaming is already saved"""
+        formats = self._generator_for(state).formats
+        if not state["pdf_saved"]:
+            return list(formats)
+        # Only a PDF streamed during generation is saved before this stage
+        return [name for name in formats if name != "pdf"] if self._streams_pdf(state) else []
+    
+    def _save_outputs(self, state: AgentState, formats: List[str]) -> List[Path]:
+        """
+        Write the chapter's notes in ``formats``.
+        
+        With a render pool the PDF is laid out in a worker process (often
+        queued right after generation) while the cheap formats are written
+        here, so all of them come from the one generated text in parallel.
+        """
+        generator = self._generator_for(state)
+        notes, subject, chapter = state["generated_notes"], state["current_subject"], state["current_chapter"]
+        key = state.get("output_key") or None
+        
+        pdf = None
+        if self.render_pool and "pdf" in formats:
+            formats = [name for name in formats if name != "pdf"]
+            pdf = self._renders.pop(self._task_key(state), None)
+            if pdf is None:
+                pdf = generator.submit_pdf(self.render_pool, notes, subject, chapter, key)
+        
+        paths = generator.save_outputs(notes, subject, chapter, formats, key)
+        if pdf is not None:
+            paths.insert(0, pdf.result())
+        return paths
+    
+    def _check_outputs(self, state: AgentState):
+        """
+        Derive the chapter's output key from its downloaded PDF and, in
+        incremental mode, mark the chapter up to date when the manifest already
+        records every configured format for that key.
+        """
+        generator = self._generator_for(state)
+        try:
+            source = self.output_manifest.source_hash(state["pdf_path"])
+        except OSError as e:
+            log_progress(f"Cannot hash {state['pdf_path']}, outputs will not be tracked: {str(e)}", "warning")
+            return
+        state["output_key"] = output_key(source, generator.output_provenance())
+        
+        chapter_id = self.output_manifest.chapter_id(*self._task_key(state))
+        if self.output_manifest.incremental and self.output_manifest.up_to_date(
+                chapter_id, state["output_key"], generator.formats):
+            state["up_to_date"] = True
+            self._up_to_date.append(chapter_id)
+            log_progress(f"Up to date, skipping: {state['current_subject']} - {state['current_chapter']}", "success")
+    
+    def _record_outputs(self, state: AgentState):
+        """Record the chapter's output files and what produced them in the output manifest"""
+        key = state.get("output_key")
+        if not key:
+            # Source could not be hashed, or the state predates output keys
+            return
+        
+        generator = self._generator_for(state)
+        subject, chapter = state["current_subject"], state["current_chapter"]
+        provenance = {"source_pdf": state["pdf_path"],
+                      "source_sha256": self.output_manifest.source_hash(state["pdf_path"]),
+                      **generator.output_provenance()}
+        files = {name: generator.output_path(subject, chapter, key, name) for name in generator.formats}
+        self.output_manifest.record(self.output_manifest.chapter_id(*self._task_key(state)), key, provenance, files)
+    
+    @staticmethod
+    def _done_message(state: dict) -> str:
+        return "Up to date, skipped" if state.get("up_to_date") else "Completed successfully"
+    
+    def _stage_workers(self, key: str) -> int:
+        """Worker threads for a pipeline stage from its `concurrency` setting"""
+        workers = self.config.get('concurrency', {}).get(key, DEFAULT_STAGE_WORKERS[key])
+        if key == "render_workers" and self.render_pool:
+            # Save threads only wait on the pool; one per queue slot keeps every process busy
+            return max(workers, self.render_pool.max_pending)
+        return workers
+    
+    @staticmethod
+    def _task_key(state: AgentState) -> Tuple[int, str, str]:
+        return state["grade"], state["current_subject"], state["current_chapter"]
+    
+    def _generator_for(self, state: AgentState) -> NotesGenerator:
+        """Notes generator for the state's grade, sharing the model client and response cache"""
+        grade = state["grade"]
+        if grade not in self._grade_generators:
+            self._grade_generators[grade] = self.notes_generator.for_grade(grade)
+        return self._grade_generators[grade]
+    
+    def _initial_state(self, subjects: List[str], chapters: Dict[str, List[str]],
+                       subject: str, chapter: str, grade: Optional[int] = None) -> AgentState:
+        """Build the starting state for a single chapter"""
+        return AgentState(
+            subjects=subjects,
+            chapters=chapters,
+            grade=grade or self.pdf_processor.grade,
+            current_subject=subject,
+            current_chapter=chapter,
+            pdf_path="",
+            extracted_content="",
+            generated_notes="",
+            pdf_saved=False,
+            error="",
+            failed_stage="",
+            progress="",
+            output_key="",
+            up_to_date=False
+        )
+    
+    def run(self, subjects: List[str], chapters: Dict[str, List[str]]) -> dict:
         """Run the agent for specified subjects and chapters"""
+        states = [
+            self._initial_state(subjects, chapters, subject, chapter)
+            for subject in subjects if subject in chapters
+            for chapter in chapters[subject]
+        ]
+        return self.run_states(states)
+    
+    def run_batch(self, grades: Iterable[int]) -> dict:
+        """Run every downloadable chapter of several grades as one combined work queue"""
+        catalogue = get_catalogue()
+        return self.run_chapters([entry for grade in grades for entry in catalogue.chapters(grade) if entry.url])
+    
+    def run_chapters(self, entries: List[Chapter]) -> dict:
+        """Run a list of catalogue chapters, possibly spanning grades, as one work queue"""
+        return self.run_states(self._states_for_tasks([(entry.grade, entry.subject, entry.name) for entry in entries]))
+    
+    def resume(self, run_id: str) -> dict:
+        """Resume a checkpointed run: finished chapters are skipped, the rest continue where they stopped"""
+        checkpoints = RunCheckpoints.from_config(self.config, run_id)
+        try:
+            tasks = checkpoints.load_tasks()
+        finally:
+            checkpoints.close()
+        
+        return self.run_states(self._states_for_tasks(tasks), run_id=run_id)
+    
+    def _states_for_tasks(self, tasks: List[Tuple[int, str, str]]) -> List[AgentState]:
+        """Initial states for (grade, subject, chapter) tasks, keeping their order"""
+        states = []
+        
+        for grade in dict.fromkeys(task[0] for task in tasks):
+            grade_tasks = [task for task in tasks if task[0] == grade]
+            subjects = list(dict.fromkeys(subject for _, subject, _ in grade_tasks))
+            chapters = {subject: [chapter for _, s, chapter in grade_tasks if s == subject] for subject in subjects}
+            states.extend(
+                self._initial_state(subjects, chapters, subject, chapter, grade)
+                for _, subject, chapter in grade_tasks
+            )
+        
+        return states
+    
+    def run_states(self, states: List[AgentState], run_id: Optional[str] = None) -> dict:
+        """
+        Run prepared chapter states with the configured concurrency mode and print a summary.
+        
+        With checkpoints enabled every chapter's state is persisted after each
+        node under a run id; passing the id of an earlier run resumes it.
+        """
         print(f"\n{Fore.CYAN}{'='*70}")
         print(f"{Fore.CYAN}🎓 Starting Notes Generation")
         print(f"{Fore.CYAN}{'='*70}\n")
         
-        total_tasks = sum(len(chaps) for chaps in chapters.values())
-        completed = 0
-        failed = 0
+        total_tasks = len(states)
+        mode = self.config.get('concurrency', {}).get('mode', 'sequential')
+        
+        self.checkpoints = RunCheckpoints.from_config(self.config, run_id)
+        if self.checkpoints:
+            if run_id is None:
+                self.checkpoints.record_tasks([
+                    (state["grade"], state["current_subject"], state["current_chapter"]) for state in states
+                ])
+            self.workflow = self._build_workflow(checkpointer=self.checkpoints.saver)
+            action = "Resuming" if run_id else "Run id"
+            print(f"{Fore.CYAN}🔖 {action}: {self.checkpoints.run_id} "
+                  f"(resume with --resume {self.checkpoints.run_id})\n")
+        
+        # Sequential runs render inline: with one chapter in flight there is nothing to overlap
+        concurrent = mode in ('pipeline', 'async', 'batch_prediction')
+        self.render_pool = RenderPool.from_config(self.config) if concurrent else None
+        self._renders = {}
+        self._up_to_date = []
+        
+        try:
+            if mode == 'pipeline':
+                failures = self._run_pipeline(states)
+            elif mode == 'async':
+                failures = asyncio.run(self._run_async(states))
+            elif mode == 'batch_prediction':
+                failures = self._run_batch_prediction(states)
+            else:
+                failures = self._run_sequential(states)
+        finally:
+            self.pdf_processor.close()
+            if self.render_pool:
+                self.render_pool.close()
+            if self.notes_generator.instruction_cache:
+                self.notes_generator.instruction_cache.close()
+            if self.checkpoints:
+                self.checkpoints.close()
+        
+        failed = sum(failures.values())
+        
+        # Final summary
+        print(f"\n{Fore.CYAN}{'='*70}")
+        print(f"{Fore.GREEN}✅ Completed: {total_tasks - failed}/{total_tasks}")
+        if self._up_to_date:
+            print(f"{Fore.GREEN}⏭️  Up to date (skipped): {len(self._up_to_date)}/{total_tasks}")
+        if failed > 0:
+            print(f"{Fore.RED}❌ Failed: {failed}/{total_tasks}")
+            for stage, count in self._failure_histogram(failures):
+                print(f"{Fore.RED}   {stage:<16} {count:>4}  {'█' * min(count, 40)}")
+        if self.notes_generator.response_cache:
+            print(f"{Fore.WHITE}🗄️  Notes cache: {self.notes_generator.response_cache.stats()}")
+        if self.pdf_processor.text_cache:
+            print(f"{Fore.WHITE}🗄️  Text cache: {self.pdf_processor.text_cache.stats()}")
+        if self.notes_generator.instruction_cache:
+            print(f"{Fore.WHITE}🗄️  Context cache: {self.notes_generator.instruction_cache.stats()}")
+        if self.notes_generator.documents.renders:
+            print(f"{Fore.WHITE}🖨️  Rendering: {self.notes_generator.documents.stats()}")
+        if self.render_pool:
+            print(f"{Fore.WHITE}🖨️  Render pool: {self.render_pool.stats()}")
+        limiter = self.notes_generator.rate_limiter.stats()
+        if limiter["rate_limited"] or limiter["retries"]:
+            print(f"{Fore.YELLOW}⏳ Gemini throttling: {limiter}")
+        print(f"{Fore.CYAN}{'='*70}")
+        
+        summary = {"total": total_tasks, "completed": total_tasks - failed, "failed": failed,
+                   "up_to_date": len(self._up_to_date),
+                   "failures_by_stage": dict(self._failure_histogram(failures))}
+        if self.checkpoints:
+            summary["run_id"] = self.checkpoints.run_id
+        return summary
+    
+    @staticmethod
+    def _failure_stage(final_state: Optional[dict], exc: Optional[Exception] = None) -> Optional[str]:
+        """Stage a finished chapter failed in ('exception' if the workflow itself raised), or None"""
+        if exc is not None:
+            return "exception"
+        if final_state.get("error"):
+            return final_state.get("failed_stage") or "unknown"
+        return None
+    
+    @staticmethod
+    def _failure_histogram(failures: Counter) -> List[Tuple[str, int]]:
+        """Failure counts in workflow stage order, followed by any other causes"""
+        order = STAGES + sorted(set(failures) - set(STAGES))
+        return [(stage, failures[stage]) for stage in order if failures[stage]]
+    
+    def _invoke(self, state: AgentState) -> AgentState:
+        """Run one chapter through the workflow, continuing from its checkpoints when enabled"""
+        if not self.checkpoints:
+            return self.workflow.invoke(state)
+        
+        config = self.checkpoints.thread_config(state)
+        kind, snapshot = resume_point(self.workflow.get_state_history(config))
+        if kind == "done":
+            log_progress("Already completed in this run, skipping", "info")
+            return snapshot.values
+        if kind == "resume":
+            log_progress(f"Resuming at: {snapshot.next[0]}", "info")
+            return self.workflow.invoke(None, snapshot.config)
+        return self.workflow.invoke(state, config)
+    
+    async def _ainvoke(self, workflow, state: AgentState) -> AgentState:
+        """Async variant of ``_invoke`` on a workflow compiled with the async checkpointer"""
+        if not self.checkpoints:
+            return await workflow.ainvoke(state)
+        
+        config = self.checkpoints.thread_config(state)
+        kind, snapshot = resume_point([snapshot async for snapshot in workflow.aget_state_history(config)])
+        if kind == "done":
+            log_progress(f"Already completed in this run, skipping: {state['current_chapter']}", "info")
+            return snapshot.values
+        if kind == "resume":
+            log_progress(f"Resuming {state['current_chapter']} at: {snapshot.next[0]}", "info")
+            return await workflow.ainvoke(None, snapshot.config)
+        return await workflow.ainvoke(state, config)
+    
+    @contextlib.asynccontextmanager
+    async def _async_workflow_context(self):
+        """The async workflow, compiled with an async checkpointer on the run's database when enabled"""
+        if not self.checkpoints:
+            yield self.async_workflow
+            return
+        
+        async with self.checkpoints.async_saver() as saver:
+            yield self._build_workflow(use_async=True, checkpointer=saver)
+    
+    def _checkpointed_stages(self, stages: list, states: List[AgentState]) -> list:
+        """
+        Wrap pipeline stages so each persists the chapter state like a workflow node would.
         
-        for subject in subjects:
-            if subject not in chapters:
-                continue
+        Chapters restored from a checkpoint start at their next pending stage;
+        finished ones pass through every stage untouched.
+        """
+        names = [name for name, _, _ in stages]
+        start = {}
+        
+        for i, state in enumerate(states):
+            config = self.checkpoints.thread_config(state)
+            kind, snapshot = resume_point(self.workflow.get_state_history(config))
+            thread_id = config["configurable"]["thread_id"]
+            if kind == "done":
+                states[i], start[thread_id] = snapshot.values, len(names)
+            elif kind == "resume":
+                states[i], start[thread_id] = snapshot.values, names.index(snapshot.next[0])
+        
+        def wrap(index: int, name: str, node):
+            def run(state: AgentState) -> AgentState:
+                config = self.checkpoints.thread_config(state)
+                if index < start.get(config["configurable"]["thread_id"], 0):
+                    return state
+                state = node(state)
+                self.workflow.update_state(config, state, as_node=name)
+                return state
+            return run
+        
+        return [(name, wrap(i, name, node), key) for i, (name, node, key) in enumerate(stages)]
+    
+    def _run_sequential(self, states: List[AgentState]) -> Counter:
+        """Process chapters one at a time through the workflow, returning failures per stage"""
+        total_tasks = len(states)
+        failures = Counter()
+        current_book = None
+        
+        for completed, initial_state in enumerate(states, 1):
+            book = (initial_state["grade"], initial_state["current_subject"])
+            if book != current_book:
+                current_book = book
+                print(f"\n{Fore.YELLOW}📚 Subject: {book[1]} (Grade {book[0]})")
+                print(f"{Fore.YELLOW}{'-'*70}")
             
-            print(f"\n{Fore.YELLOW}📚 Subject: {subject}")
-            print(f"{Fore.YELLOW}{'-'*70}")
+            print(f"\n{Fore.WHITE}[{completed}/{total_tasks}] {initial_state['current_chapter']}")
             
-            for chapter in chapters[subject]:
-                completed += 1
-                print(f"\n{Fore.WHITE}[{completed}/{total_tasks}] {chapter}")
+            try:
+                final_state = self._invoke(initial_state)
                 
-                initial_state = AgentState(
-                    subjects=subjects,
-                    chapters=chapters,
-                    current_subject=subject,
-                    current_chapter=chapter,
-                    pdf_path="",
-                    extracted_content="",
-                    generated_notes="",
-                    pdf_saved=False,
-                    error="",
-                    progress=""
-                )
-                
-                try:
-                    final_state = self.workflow.invoke(initial_state)
+                if final_state.get("error"):
+                    failures[self._failure_stage(final_state)] += 1
+                    print(f"{Fore.RED}⚠️  {final_state['error']}")
+                else:
+                    print(f"{Fore.GREEN}✅ {self._done_message(final_state)}")
                     
-                    if final_state.get("error"):
-                        failed += 1
-                        print(f"{Fore.RED}⚠️  {final_state['error']}")
+            except Exception as e:
+                failures[self._failure_stage(None, e)] += 1
+                print(f"{Fore.RED}❌ Failed: {str(e)}")
+        
+        return failures
+    
+    def _run_pipeline(self, states: List[AgentState]) -> Counter:
+        """Process chapters concurrently with a bounded worker pool per stage, returning failures per stage"""
+        stages = [
+            ("download_pdf", self.download_pdf_node, "download_workers"),
+            ("extract_content", self.extract_content_node, "extract_workers"),
+            ("generate_notes", self.generate_notes_node, "generate_workers"),
+            ("save_notes", self.save_notes_node, "render_workers"),
+        ]
+        if self.checkpoints:
+            states = list(states)
+            stages = self._checkpointed_stages(stages, states)
+        
+        # A chapter that records an error leaves the pipeline at once, like the
+        # workflow's conditional edges to the failure sink
+        pipeline = ChapterPipeline([
+            (name, node, self._stage_workers(key))
+            for name, node, key in stages
+        ], stop=self._finished, max_in_flight=self.config.get('concurrency', {}).get('max_in_flight'))
+        
+        total_tasks = len(states)
+        
+        print(f"{Fore.YELLOW}⚡ Pipeline mode: " + ", ".join(
+            f"{name}={workers}" for name, _, workers in pipeline.stages)
+            + f"; up to {pipeline.max_in_flight} chapters in flight")
+        
+        done = 0
+        failures = Counter()
+        
+        def on_complete(index: int, state: dict, exc: Exception):
+            nonlocal done
+            done += 1
+            label = f"[{done}/{total_tasks}] {state['current_subject']} - {state['current_chapter']}"
+            
+            stage = self._failure_stage(state, exc)
+            if stage:
+                failures[stage] += 1
+            if exc is not None:
+                print(f"{Fore.RED}❌ {label} Failed: {str(exc)}")
+            elif state.get("error"):
+                print(f"{Fore.RED}⚠️  {label} {state['error']}")
+            else:
+                print(f"{Fore.GREEN}✅ {label} {self._done_message(state)}")
+        
+        pipeline.run(states, on_complete)
+        
+        return failures
+    
+    def _run_batch_prediction(self, states: List[AgentState]) -> Counter:
+        """
+        Generate all notes of the run in batch prediction jobs, returning failures per stage.
+        
+        Chapters are downloaded and extracted on the stage worker pools, every
+        pending prompt is then submitted as one job (plus one for the chunk
+        summaries of long chapters), and the PDFs are rendered once it finishes.
+        """
+        stages = [
+            ("download_pdf", self.download_pdf_node, "download_workers"),
+            ("extract_content", self.extract_content_node, "extract_workers"),
+            ("generate_notes", self.batch_notes_node, "generate_workers"),
+            ("save_notes", self.save_notes_node, "render_workers"),
+        ]
+        if self.checkpoints:
+            states = list(states)
+            stages = self._checkpointed_stages(stages, states)
+        stages = [(name, node, self._stage_workers(key)) for name, node, key in stages]
+        
+        total_tasks = len(states)
+        done = 0
+        failures = Counter()
+        
+        def on_complete(index: int, state: dict, exc: Exception):
+            nonlocal done
+            stage = self._failure_stage(state, exc)
+            if stage is None and not finishing and not state.get("up_to_date"):
+                return
+            done += 1
+            label = f"[{done}/{total_tasks}] {state['current_subject']} - {state['current_chapter']}"
+            
+            if stage:
+                failures[stage] += 1
+            if exc is not None:
+                print(f"{Fore.RED}❌ {label} Failed: {str(exc)}")
+            elif state.get("error"):
+                print(f"{Fore.RED}⚠️  {label} {state['error']}")
+            else:
+                print(f"{Fore.GREEN}✅ {label} {self._done_message(state)}")
+        
+        # Download and extract everything first; failed chapters are reported right away
+        finishing = False
+        prepared = ChapterPipeline(stages[:2], stop=self._finished).run(states, on_complete)
+        ready = [state for state in prepared if not self._finished(state)]
+        
+        pending = [state for state in ready if not state["generated_notes"] and not state["pdf_saved"]]
+        print(f"{Fore.YELLOW}📦 Batch prediction: {len(pending)} chapters to generate")
+        if pending:
+            if self.batch_predictor is None:
+                self.batch_predictor = BatchPredictor.from_config(self.config)
+            try:
+                notes = generate_notes_batch([
+                    (self._generator_for(state), state["extracted_content"], state["current_subject"], state["current_chapter"])
+                    for state in pending
+                ], self.batch_predictor)
+            except Exception as e:
+                # A failed job fails each of its chapters at the generate stage
+                notes = [e] * len(pending)
+            self._batch_notes = {self._task_key(state): result for state, result in zip(pending, notes)}
+        
+        finishing = True
+        ChapterPipeline(stages[2:], stop=self._finished).run(ready, on_complete)
+        self._batch_notes = {}
+        
+        return failures
+    
+    async def _run_async(self, states: List[AgentState]) -> Counter:
+        """Process chapters on the asyncio workflow with a bounded number in flight, returning failures per stage"""
+        concurrency = self.config.get('concurrency', {})
+        max_in_flight = concurrency.get('max_in_flight', 32)
+        total_tasks = len(states)
+        
+        print(f"{Fore.YELLOW}⚡ Async mode: up to {max_in_flight} chapters in flight")
+        
+        connector = aiohttp.TCPConnector(limit=concurrency.get('download_workers', 4))
+        timeout = aiohttp.ClientTimeout(total=300)
+        
+        async with self._async_workflow_context() as workflow, \
+                aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            self._http_session = session
+            semaphore = asyncio.Semaphore(max_in_flight)
+            
+            async def run_one(state: AgentState):
+                async with semaphore:
+                    try:
+                        return state, await self._ainvoke(workflow, state), None
+                    except Exception as e:
+                        return state, None, e
+            
+            done = 0
+            failures = Counter()
+            try:
+                for next_result in asyncio.as_completed([run_one(state) for state in states]):
+                    state, final_state, exc = await next_result
+                    done += 1
+                    label = f"[{done}/{total_tasks}] {state['current_subject']} - {state['current_chapter']}"
+                    
+                    stage = self._failure_stage(final_state, exc)
+                    if stage:
+                        failures[stage] += 1
+                    if exc is not None:
+                        print(f"{Fore.RED}❌ {label} Failed: {str(exc)}")
+                    elif final_state.get("error"):
+                        print(f"{Fore.RED}⚠️  {label} {final_state['error']}")
                     else:
-                        print(f"{Fore.GREEN}✅ Completed successfully")
-                        
-                except Exception as e:
-                    failed += 1
-                    print(f"{Fore.RED}❌ Failed: {str(e)}")
+                        print(f"{Fore.GREEN}✅ {label} {self._done_message(final_state)}")
+            finally:
+                self._http_session = None
         
-        # Final summary
-        print(f"\n{Fore.CYAN}{'='*70}")
-        print(f"{Fore.GREEN}✅ Completed: {completed - failed}/{total_tasks}")
-        if failed > 0:
-            print(f"{Fore.RED}❌ Failed: {failed}/{total_tasks}")
-        print(f"{Fore.CYAN}{'='*70}")
\ No newline at end of file
+        return failures
@@ -0,0 +1,321 @@
+"""
+Batch Prediction Module - Bulk Gemini requests through Vertex AI batch prediction jobs
+"""
+
+import json
+import secrets
+import shutil
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from utils import log_progress
+
+
+# Gemini generation parameters as spelled in batch request files
+GENERATION_CONFIG_FIELDS = {
+    "max_output_tokens": "maxOutputTokens",
+    "temperature": "temperature",
+    "top_p": "topP",
+    "top_k": "topK",
+}
+
+
+class BatchJobError(RuntimeError):
+    """Raised when a batch prediction job fails, is cancelled or does not finish in time"""
+
+
+def build_request(key: str, prompt: str, generation_config: dict, system_instruction: Optional[str] = None) -> dict:
+    """
+    One line of a batch job file: a GenerateContentRequest labelled with ``key``.
+
+    The service answers requests in any order and echoes each request next to
+    its response, so the label is what ties a prediction back to its prompt.
+    """
+    request = {
+        "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+        "generationConfig": {GENERATION_CONFIG_FIELDS.get(name, name): value
+                             for name, value in generation_config.items()},
+        "labels": {"key": key},
+    }
+    if system_instruction:
+        request["systemInstruction"] = {"parts": [{"text": system_instruction}]}
+    return {"request": request}
+
+
+def request_prompt(request: dict) -> Tuple[str, dict]:
+    """(prompt, generation config) of a request built by ``build_request``, the system instruction first"""
+    fields = {wire: name for name, wire in GENERATION_CONFIG_FIELDS.items()}
+    contents = [request["systemInstruction"]] if request.get("systemInstruction") else []
+    prompt = "\n\n".join("".join(part.get("text", "") for part in content.get("parts", []))
+                          for content in contents + request.get("contents", []))
+    generation_config = {fields.get(name, name): value
+                         for name, value in request.get("generationConfig", {}).items()}
+    return prompt, generation_config
+
+
+def parse_prediction(line: dict) -> Tuple[Optional[str], Union[str, Exception]]:
+    """(request key, generated text or the error) of one line of a job's output"""
+    key = line.get("request", {}).get("labels", {}).get("key")
+    if line.get("status"):
+        return key, BatchJobError(f"Request failed: {line['status']}")
+
+    candidates = line.get("response", {}).get("candidates") or []
+    parts = candidates[0].get("content", {}).get("parts", []) if candidates else []
+    text = "".join(part.get("text", "") for part in parts)
+    if not text:
+        reason = candidates[0].get("finishReason", "no candidates") if candidates else "no candidates"
+        return key, BatchJobError(f"Empty response ({reason})")
+    return key, text
+
+
+class BatchClient(ABC):
+    """
+    Submit/poll interface of a batch prediction service.
+
+    ``submit`` hands over a JSONL file of requests and returns a job id,
+    ``poll`` reports whether the job has finished (raising ``BatchJobError``
+    when it failed) and ``fetch_results`` copies its output JSONL files into
+    a local directory.
+    """
+
+    @abstractmethod
+    def submit(self, input_path: Path, model: str) -> str:
+        ...
+
+    @abstractmethod
+    def poll(self, job_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def fetch_results(self, job_id: str, output_dir: Path) -> List[Path]:
+        ...
+
+
+class VertexBatchClient(BatchClient):
+    """
+    Vertex AI batch prediction: job files are staged in and read back from Cloud Storage.
+
+    Every job call names ``project`` and ``location`` itself, so the batch
+    region never touches the ``vertexai.init`` settings the Gemini clients use.
+    """
+
+    def __init__(self, project: str, location: str, staging_uri: str):
+        if not staging_uri.startswith("gs://"):
+            raise ValueError(f"batch_prediction.staging_uri must be a gs:// URI, got {staging_uri!r}")
+        from google.cloud import storage
+
+        self.project = project
+        self.location = location
+        self.storage = storage.Client(project=project)
+        self.staging_uri = staging_uri.rstrip("/")
+
+    def _job(self, job_id: str):
+        from google.cloud.aiplatform import BatchPredictionJob
+
+        return BatchPredictionJob(job_id, project=self.project, location=self.location)
+
+    def submit(self, input_path: Path, model: str) -> str:
+        from google.cloud.aiplatform import BatchPredictionJob
+
+        job_uri = f"{self.staging_uri}/{input_path.stem}"
+        bucket, blob = _split_gcs_uri(f"{job_uri}/{input_path.name}")
+        self.storage.bucket(bucket).blob(blob).upload_from_filename(str(input_path))
+
+        job = BatchPredictionJob.submit(
+            model_name=publisher_model(model),
+            gcs_source=f"{job_uri}/{input_path.name}",
+            gcs_destination_prefix=f"{job_uri}/output",
+            job_display_name=input_path.stem,
+            project=self.project,
+            location=self.location,
+        )
+        return job.resource_name
+
+    def poll(self, job_id: str) -> bool:
+        job = self._job(job_id)
+        if job.state.name == "JOB_STATE_SUCCEEDED":
+            return True
+        if job.done():
+            raise BatchJobError(f"Batch job {job_id} ended as {job.state.name}: {job.error}")
+        return False
+
+    def fetch_results(self, job_id: str, output_dir: Path) -> List[Path]:
+        bucket, prefix = _split_gcs_uri(self._job(job_id).output_info.gcs_output_directory)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for blob in self.storage.list_blobs(bucket, prefix=prefix):
+            if blob.name.endswith(".jsonl"):
+                path = output_dir / f"{len(paths):03d}_{Path(blob.name).name}"
+                blob.download_to_filename(str(path))
+                paths.append(path)
+        return paths
+
+
+class LocalBatchClient(BatchClient):
+    """
+    File-based stand-in for the batch service.
+
+    Every job is a directory holding the submitted request file; the first
+    poll answers each request with ``respond(prompt, generation_config)`` and
+    writes the predictions in the service's output format. Without a
+    ``respond`` callable the requests are sent to Gemini one at a time.
+    """
+
+    def __init__(self, jobs_dir, respond: Optional[Callable[[str, dict], str]] = None):
+        self.jobs_dir = Path(jobs_dir)
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.respond = respond
+
+    def submit(self, input_path: Path, model: str) -> str:
+        job_id = f"local-{input_path.stem}"
+        job_dir = self.jobs_dir / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(input_path, job_dir / "requests.jsonl")
+        (job_dir / "model").write_text(model, encoding='utf-8')
+        return job_id
+
+    def poll(self, job_id: str) -> bool:
+        job_dir = self.jobs_dir / job_id
+        if not (job_dir / "requests.jsonl").exists():
+            raise BatchJobError(f"Unknown local batch job {job_id}")
+        if not (job_dir / "predictions.jsonl").exists():
+            self._run(job_dir)
+        return True
+
+    def fetch_results(self, job_id: str, output_dir: Path) -> List[Path]:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / "predictions.jsonl"
+        shutil.copyfile(self.jobs_dir / job_id / "predictions.jsonl", path)
+        return [path]
+
+    def _run(self, job_dir: Path):
+        respond = self.respond or self._gemini_responder((job_dir / "model").read_text(encoding='utf-8'))
+        partial = job_dir / "predictions.jsonl.part"
+
+        with open(job_dir / "requests.jsonl", 'r', encoding='utf-8') as requests, \
+                open(partial, 'w', encoding='utf-8') as predictions:
+            for line in requests:
+                if not line.strip():
+                    continue
+                request = json.loads(line)["request"]
+                prediction = {"request": request, "status": ""}
+                try:
+                    text = respond(*request_prompt(request))
+                    prediction["response"] = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                                                              "finishReason": "STOP"}]}
+                except Exception as e:
+                    prediction["status"] = str(e)
+                predictions.write(json.dumps(prediction, ensure_ascii=False) + "\n")
+
+        partial.replace(job_dir / "predictions.jsonl")
+
+    @staticmethod
+    def _gemini_responder(model: str) -> Callable[[str, dict], str]:
+        from vertexai.generative_models import GenerativeModel
+
+        client = GenerativeModel(model_name=model)
+        return lambda prompt, generation_config: client.generate_content(
+            [prompt], generation_config=generation_config).text
+
+
+class BatchPredictor:
+    """
+    Runs a set of prompts as one batch prediction job.
+
+    The requests are written to a JSONL job file under ``work_dir``, submitted
+    through the client and polled every ``poll_interval`` seconds until the
+    job finishes or ``timeout`` seconds pass; the output is then read back and
+    matched to the requests by key.
+    """
+
+    def __init__(self, client: BatchClient, work_dir, poll_interval: float = 30.0, timeout: float = 24 * 3600):
+        self.client = client
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config: dict) -> "BatchPredictor":
+        """Build the predictor and its client from the `batch_prediction:` config section"""
+        settings = config.get('batch_prediction', {})
+        work_dir = Path(settings.get('work_dir', 'ncert_notes_output/batch_jobs'))
+
+        if settings.get('client', 'vertex') == 'local':
+            client = LocalBatchClient(work_dir / "local_service")
+        else:
+            client = VertexBatchClient(
+                project=config['google']['project'],
+                location=settings.get('location', 'us-central1'),
+                staging_uri=settings.get('staging_uri', ''),
+            )
+
+        return cls(client, work_dir, poll_interval=settings.get('poll_interval', 30),
+                   timeout=settings.get('timeout_hours', 24) * 3600)
+
+    def predict(self, requests: Dict[str, tuple], model: str,
+                label: str = "notes") -> Dict[str, Union[str, Exception]]:
+        """
+        Generate text for every ``key -> (prompt, generation_config[, system_instruction])`` request.
+
+        Returns the generated text per key, or the exception for requests the
+        job could not answer. A failed job raises ``BatchJobError``.
+        """
+        if not requests:
+            return {}
+
+        name = f"{label}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(2)}"
+        input_path = self.work_dir / f"{name}.jsonl"
+        with open(input_path, 'w', encoding='utf-8') as f:
+            for key, request in requests.items():
+                f.write(json.dumps(build_request(key, *request), ensure_ascii=False) + "\n")
+
+        job_id = self.client.submit(input_path, model)
+        log_progress(f"Submitted batch job {job_id} with {len(requests)} requests", "ai")
+        self._wait(job_id)
+
+        results = {}
+        for path in self.client.fetch_results(job_id, self.work_dir / name):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        key, result = parse_prediction(json.loads(line))
+                        if key in requests:
+                            results[key] = result
+
+        missing = len(requests) - len(results)
+        for key in requests:
+            results.setdefault(key, BatchJobError("No prediction returned for this request"))
+
+        failed = sum(isinstance(result, Exception) for result in results.values())
+        log_progress(f"Batch job {job_id} finished: {len(requests) - failed}/{len(requests)} answered"
+                     + (f", {missing} missing" if missing else ""), "success" if not failed else "warning")
+        return results
+
+    def _wait(self, job_id: str):
+        """Poll the job until it has finished"""
+        started = time.monotonic()
+        while not self.client.poll(job_id):
+            elapsed = time.monotonic() - started
+            if elapsed > self.timeout:
+                raise BatchJobError(f"Batch job {job_id} did not finish within {self.timeout / 3600:.1f}h")
+            log_progress(f"Batch job {job_id} still running ({elapsed / 60:.0f} min)", "info")
+            time.sleep(self.poll_interval)
+
+
+def publisher_model(model: str) -> str:
+    """Full resource name of a Gemini model: ``gemini-x`` -> ``publishers/google/models/gemini-x``"""
+    if model.startswith("models/"):
+        return f"publishers/google/{model}"
+    if "/" not in model:
+        return f"publishers/google/models/{model}"
+    return model
+
+
+def _split_gcs_uri(uri: str) -> Tuple[str, str]:
+    """(bucket, object path) of a gs:// URI"""
+    bucket, _, path = uri[len("gs://"):].partition("/")
+    return bucket, path
@@ -0,0 +1,212 @@
+"""
+Cache Module - Persistent content-addressed caches for expensive pipeline results
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+def make_key(*parts) -> str:
+    """Build a stable SHA-256 key from strings, numbers and JSON-serialisable dicts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+_file_hashes = {}
+_file_hashes_lock = threading.Lock()
+
+
+def file_hash(path) -> str:
+    """SHA-256 of a file, memoised per (path, size, mtime) for the life of the process"""
+    path = Path(path)
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    with _file_hashes_lock:
+        if memo_key in _file_hashes:
+            return _file_hashes[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+
+    with _file_hashes_lock:
+        _file_hashes[memo_key] = digest.hexdigest()
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Content-addressed on-disk cache with size and age based eviction.
+
+    Entries live in ``<cache_dir>/<key[:2]>/<key><suffix>``. Reads refresh the
+    entry's mtime so size-based eviction drops the least recently used entries
+    first, and writes go through a temporary file and an atomic rename so
+    concurrent workers never see half-written entries.
+    """
+
+    suffix = ".bin"
+    config_name = ""
+    default_max_size_mb = 500
+    default_max_age_days = 30
+
+    def __init__(self, cache_dir, max_size_mb: float = 500, max_age_days: float = 30,
+                 refresh: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.max_age = max_age_days * 86400
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """Build the cache from the `cache:` config section, or None when caching is disabled"""
+        cache_config = config.get('cache', {})
+        if not cache_config.get('enabled', True):
+            return None
+
+        settings = cache_config.get(cls.config_name, {})
+        return cls(
+            Path(cache_config.get('dir', 'ncert_notes_output/cache')) / cls.config_name,
+            max_size_mb=settings.get('max_size_mb', cls.default_max_size_mb),
+            max_age_days=settings.get('max_age_days', cls.default_max_age_days),
+            refresh=cache_config.get('refresh', False),
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Return the cached payload for ``key`` or None, updating the hit/miss counters"""
+        path = self._path(key)
+
+        if not self.refresh:
+            try:
+                if time.time() - path.stat().st_mtime <= self.max_age:
+                    data = path.read_bytes()
+                    os.utime(path)
+                    self._count(hit=True)
+                    return data
+            except OSError:
+                pass
+
+        self._count(hit=False)
+        return None
+
+    def set_bytes(self, key: str, data: bytes):
+        """Store ``data`` under ``key``"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def evict(self) -> int:
+        """Remove expired entries, then the least recently used ones until under the size limit"""
+        now = time.time()
+        entries = []
+        removed = 0
+
+        for path in self.cache_dir.glob(f"*/*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+
+        return removed
+
+    def stats(self) -> str:
+        """Human readable hit/miss counters"""
+        lookups = self.hits + self.misses
+        rate = (self.hits / lookups * 100) if lookups else 0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate)"
+
+
+class ResponseCache(DiskCache):
+    """Caches Gemini responses keyed by the rendered prompt plus the generation config"""
+
+    suffix = ".json"
+    config_name = "responses"
+
+    def key_for(self, prompt: str, model: str, generation_config: dict) -> str:
+        return make_key(prompt, model, generation_config)
+
+    def get(self, key: str) -> Optional[str]:
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return json.loads(data)['text']
+        except (ValueError, KeyError):
+            return None
+
+    def set(self, key: str, text: str, model: str):
+        payload = {"text": text, "model": model, "created": time.time()}
+        self.set_bytes(key, json.dumps(payload).encode('utf-8'))
+
+
+class TextCache(DiskCache):
+    """
+    Caches extracted PDF text as gzip-compressed JSON (text plus metadata).
+
+    Keys combine the PDF's content hash with the extractor identity and the
+    extraction settings, so a re-downloaded file, an upgraded extractor or a
+    new ``max_pages_per_chapter`` value all miss automatically.
+    """
+
+    suffix = ".json.gz"
+    config_name = "text"
+    default_max_size_mb = 200
+    default_max_age_days = 365
+
+    def key_for(self, pdf_path, extractor: str, settings: dict) -> str:
+        return make_key(file_hash(pdf_path), extractor, settings)
+
+    def get(self, key: str) -> Optional[str]:
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return json.loads(gzip.decompress(data))['text']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key: str, text: str, metadata: dict):
+        payload = {"text": text, "metadata": dict(metadata, created=time.time())}
+        self.set_bytes(key, gzip.compress(json.dumps(payload).encode('utf-8')))
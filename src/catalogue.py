@@ -0,0 +1,123 @@
+"""
+Catalogue Module - Chapter catalogue compiled once from config/subjects.json
+"""
+
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+GRADE_KEY = re.compile(r"^grade_(\d+)$")
+
+
+class Chapter(NamedTuple):
+    """One downloadable chapter, with everything derived from subjects.json precomputed"""
+    grade: int
+    subject: str
+    book_code: Optional[str]
+    book_name: Optional[str]
+    section: Optional[str]
+    name: str
+    number: Optional[int]
+    url: Optional[str]
+    filename: str
+
+
+def canonical_filename(subject: str, chapter: str) -> str:
+    """Local file name of a chapter PDF (the name PDFProcessor has always used)"""
+    safe_subject = subject.replace(' ', '_').replace('/', '_')
+    safe_chapter = chapter.replace(' ', '_').replace('/', '_')
+    return f"{safe_subject}_{safe_chapter}.pdf"
+
+
+def _book_chapters(data: dict) -> Iterator[Tuple[Optional[str], str, Optional[int]]]:
+    """(section, chapter, number) for a book's flat ``chapters`` and its grouped ``sections``"""
+    chapters = data.get('chapters', {})
+    if isinstance(chapters, list):
+        chapters = dict.fromkeys(chapters)
+    for chapter, number in chapters.items():
+        yield None, chapter, number
+
+    for section, section_chapters in data.get('sections', {}).items():
+        for chapter, number in section_chapters.items():
+            yield section, chapter, number
+
+
+class ChapterCatalogue:
+    """
+    Every chapter of every grade, compiled once with URLs and file names formatted.
+
+    Chapters can be looked up by (grade, subject, chapter) or by (book code,
+    chapter number). Chapters that share a name across books of the same grade
+    (the Hindi readers overlap, for example) are collected in ``duplicates``.
+    """
+
+    def __init__(self, data: dict):
+        self._by_name: Dict[Tuple[int, str, str], Chapter] = {}
+        self._by_code: Dict[Tuple[str, int], Chapter] = {}
+        self._by_subject: Dict[Tuple[int, str], List[Chapter]] = {}
+        self._by_chapter: Dict[Tuple[int, str], List[Chapter]] = {}
+        self.duplicates: Dict[Tuple[int, str], List[Chapter]] = {}
+
+        for grade_key, grade_data in data.items():
+            match = GRADE_KEY.match(grade_key)
+            if not match or not isinstance(grade_data, dict):
+                continue
+            grade = int(match.group(1))
+
+            for subject, book in grade_data.get('subjects', {}).items():
+                self._by_subject[(grade, subject)] = []
+                for section, name, number in _book_chapters(book):
+                    self._add(Chapter(
+                        grade=grade,
+                        subject=subject,
+                        book_code=book.get('ncert_code'),
+                        book_name=book.get('book_name'),
+                        section=section,
+                        name=name,
+                        number=number,
+                        url=book['base_url'].format(number) if book.get('base_url') and number is not None else None,
+                        filename=canonical_filename(subject, name),
+                    ))
+
+        for key, entries in self._by_chapter.items():
+            if len(entries) > 1:
+                self.duplicates[key] = entries
+
+    def _add(self, entry: Chapter):
+        self._by_name[(entry.grade, entry.subject, entry.name)] = entry
+        self._by_subject[(entry.grade, entry.subject)].append(entry)
+        self._by_chapter.setdefault((entry.grade, entry.name), []).append(entry)
+        if entry.book_code and entry.number is not None:
+            self._by_code[(entry.book_code, entry.number)] = entry
+
+    def get(self, grade: int, subject: str, chapter: str) -> Optional[Chapter]:
+        return self._by_name.get((grade, subject, chapter))
+
+    def by_code(self, book_code: str, number: int) -> Optional[Chapter]:
+        return self._by_code.get((book_code, number))
+
+    def url(self, grade: int, subject: str, chapter: str) -> Optional[str]:
+        entry = self.get(grade, subject, chapter)
+        return entry.url if entry else None
+
+    def find(self, grade: int, chapter: str) -> List[Chapter]:
+        """Every book of a grade that has a chapter with this name"""
+        return self._by_chapter.get((grade, chapter), [])
+
+    def grades(self) -> List[int]:
+        return sorted({grade for grade, _ in self._by_subject})
+
+    def subjects(self, grade: int) -> List[str]:
+        return [subject for g, subject in self._by_subject if g == grade]
+
+    def chapter_names(self, grade: int, subject: str) -> List[str]:
+        return [entry.name for entry in self._by_subject.get((grade, subject), [])]
+
+    def chapters(self, grade: Optional[int] = None, subject: Optional[str] = None) -> Iterator[Chapter]:
+        """All chapters, optionally restricted to one grade and/or subject, in subjects.json order"""
+        for (g, s), entries in self._by_subject.items():
+            if (grade is None or g == grade) and (subject is None or s == subject):
+                yield from entries
+
+    def __len__(self) -> int:
+        return len(self._by_name)
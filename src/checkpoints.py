@@ -0,0 +1,113 @@
+"""
+Checkpoints Module - SQLite-backed LangGraph checkpoints that make batch runs resumable
+"""
+
+import json
+import secrets
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+
+# Chapter tasks recorded per run, so `--resume <run-id>` needs no other input
+RUNS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    tasks TEXT NOT NULL
+)
+"""
+
+
+class UnknownRunError(LookupError):
+    """Raised when resuming a run id that has no recorded tasks"""
+
+
+class RunCheckpoints:
+    """
+    Per-chapter workflow checkpoints for one run.
+
+    Every chapter is its own LangGraph thread (``<run-id>:<grade>:<subject>:<chapter>``)
+    and the compiled workflow persists its state after every node. On resume a
+    chapter that reached the end without error is skipped, and any other
+    chapter continues from the newest checkpoint taken before its first
+    error, so finished downloads, extractions and Gemini calls are reused.
+    """
+
+    def __init__(self, path, run_id: Optional[str] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.run_id = run_id or self.new_run_id()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute(RUNS_SCHEMA)
+        self.conn.commit()
+        self.saver = SqliteSaver(self.conn)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict, run_id: Optional[str] = None):
+        """Open the checkpoint store from the `checkpoints:` config section, or None when disabled"""
+        settings = config.get('checkpoints', {})
+        if not settings.get('enabled', False) and run_id is None:
+            return None
+        return cls(settings.get('path', 'ncert_notes_output/checkpoints.sqlite'), run_id)
+
+    @staticmethod
+    def new_run_id() -> str:
+        return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(2)}"
+
+    def close(self):
+        self.conn.close()
+
+    def record_tasks(self, tasks: List[Tuple[int, str, str]]):
+        """Remember the (grade, subject, chapter) list of this run"""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, created, tasks) VALUES (?, ?, ?)",
+                (self.run_id, datetime.now().isoformat(timespec='seconds'), json.dumps(tasks, ensure_ascii=False)),
+            )
+            self.conn.commit()
+
+    def load_tasks(self) -> List[Tuple[int, str, str]]:
+        """The (grade, subject, chapter) list recorded for this run"""
+        with self._lock:
+            row = self.conn.execute("SELECT tasks FROM runs WHERE run_id = ?", (self.run_id,)).fetchone()
+        if row is None:
+            raise UnknownRunError(f"No checkpointed run '{self.run_id}' in {self.path}")
+        return [tuple(task) for task in json.loads(row[0])]
+
+    def thread_config(self, state: dict) -> dict:
+        """LangGraph config addressing a chapter's checkpoint thread"""
+        thread_id = f"{self.run_id}:{state['grade']}:{state['current_subject']}:{state['current_chapter']}"
+        return {"configurable": {"thread_id": thread_id}}
+
+    def async_saver(self):
+        """Async context manager yielding a saver on the same database for ``ainvoke``"""
+        return AsyncSqliteSaver.from_conn_string(str(self.path))
+
+
+def resume_point(history) -> Tuple[str, Optional[object]]:
+    """
+    Classify a chapter from its checkpoint history (newest first).
+
+    Returns ("new", None) when it never ran, ("done", snapshot) when it
+    finished without error, and ("resume", snapshot) with the newest
+    error-free checkpoint that still has nodes left to run otherwise.
+    """
+    history = list(history)
+    if not history or not history[0].values:
+        return "new", None
+
+    latest = history[0]
+    if not latest.next and not latest.values.get("error"):
+        return "done", latest
+
+    for snapshot in history:
+        if snapshot.next and snapshot.values and not snapshot.values.get("error"):
+            return "resume", snapshot
+    return "new", None
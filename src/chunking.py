@@ -0,0 +1,109 @@
+"""
+Chunking Module - Token-budgeted splitting of chapter text on section boundaries
+"""
+
+import re
+from typing import List
+
+
+# Lines that start a new section in extracted NCERT text: numbered headings
+# ("2.3 Acids and Bases"), upper-case titles and the usual textbook markers
+HEADING_PATTERN = re.compile(
+    r"^\s*(?:"
+    r"\d+(?:\.\d+)+\s+\S"
+    r"|(?:CHAPTER|Chapter|EXERCISES?|Exercises?|ACTIVITY|Activity|Summary|SUMMARY|"
+    r"What you have learnt|WHAT YOU HAVE LEARNT)\b"
+    r"|[A-Z][A-Z0-9 ,:;'()\-]{4,60}$"
+    r")"
+)
+
+# Fallback boundaries for oversized sections, from coarsest to finest, with
+# the separator used to join the pieces back together
+BOUNDARIES = [
+    (re.compile(r"\n\s*\n"), "\n\n"),
+    (re.compile(r"\n"), "\n"),
+    (re.compile(r"(?<=[.!?।])\s+"), " "),
+]
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Cheap token estimate used for budgeting (Gemini averages ~4 characters per token)"""
+    return int(len(text) / chars_per_token) + 1
+
+
+def split_sections(text: str) -> List[str]:
+    """Split text into sections, starting a new one at every heading line"""
+    sections = []
+    current = []
+
+    for line in text.splitlines():
+        if HEADING_PATTERN.match(line) and any(l.strip() for l in current):
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+
+    if any(l.strip() for l in current):
+        sections.append("\n".join(current).strip())
+
+    return sections
+
+
+def _split_oversized(section: str, max_chars: int, level: int = 0) -> List[str]:
+    """Break a section that exceeds the budget on paragraph, then line, then sentence boundaries"""
+    if level == len(BOUNDARIES):
+        # No natural boundary is small enough: fall back to a hard cut
+        return [section[i:i + max_chars] for i in range(0, len(section), max_chars)]
+
+    pattern, separator = BOUNDARIES[level]
+    pieces = pattern.split(section)
+    if len(pieces) == 1:
+        return _split_oversized(section, max_chars, level + 1)
+
+    fitted = []
+    for piece in pieces:
+        if len(piece) > max_chars:
+            fitted.extend(_split_oversized(piece, max_chars, level + 1))
+        else:
+            fitted.append(piece)
+
+    return _pack(fitted, max_chars, separator)
+
+
+def _pack(pieces: List[str], max_chars: int, separator: str) -> List[str]:
+    """Greedily join consecutive pieces into chunks no longer than max_chars"""
+    chunks = []
+    current = ""
+
+    for piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            continue
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{separator}{piece}" if current else piece
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_into_chunks(text: str, max_tokens: int, chars_per_token: float = 4.0) -> List[str]:
+    """
+    Split chapter text into chunks of at most ``max_tokens`` (estimated).
+
+    Whole sections are kept together whenever they fit, neighbouring small
+    sections are packed into one chunk, and only sections larger than the
+    budget are broken up further.
+    """
+    max_chars = max(1, int(max_tokens * chars_per_token))
+    pieces = []
+
+    for section in split_sections(text):
+        if len(section) > max_chars:
+            pieces.extend(_split_oversized(section, max_chars))
+        else:
+            pieces.append(section)
+
+    return _pack(pieces, max_chars, "\n\n")
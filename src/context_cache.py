@@ -0,0 +1,106 @@
+"""
+Context Cache Module - Gemini context caching for the static notes instruction
+"""
+
+import hashlib
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+from chunking import estimate_tokens
+from utils import log_progress
+
+
+class InstructionCache:
+    """
+    Models bound to a Vertex AI context cache holding a system instruction.
+
+    Each distinct instruction (one per grade and student) is registered the
+    first time it is needed, and every chapter that shares it is then sent as
+    a short user turn against the cached content, so the template is neither
+    re-billed at the full input rate nor re-processed before the first token.
+    Instructions below the service's minimum cache size, or whose
+    registration fails, map to None and callers send them as the system
+    instruction of an ordinary model.
+    The cache's TTL is extended while a run keeps using it.
+    """
+
+    def __init__(self, model_name: str, ttl_minutes: float = 60, min_tokens: int = 2048):
+        self.model_name = model_name
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.min_tokens = min_tokens
+        self._entries: Dict[str, Optional[list]] = {}
+        self._lock = threading.Lock()
+        self.cached_requests = 0
+        self.prefix_requests = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["InstructionCache"]:
+        """Build the cache from `google.context_cache`, or None when disabled"""
+        google = config.get('google', {})
+        settings = google.get('context_cache', {})
+        if not settings.get('enabled', False):
+            return None
+        return cls(google['model'], settings.get('ttl_minutes', 60), settings.get('min_tokens', 2048))
+
+    def model_for(self, instruction: str):
+        """Model answering from the registered cache of ``instruction``, or None to send it uncached"""
+        key = hashlib.sha256(instruction.encode('utf-8')).hexdigest()
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = self._register(instruction)
+            entry = self._entries[key]
+
+            if entry is None:
+                self.prefix_requests += 1
+                return None
+
+            cached, model, refreshed = entry
+            if time.monotonic() - refreshed > self.ttl.total_seconds() / 2:
+                try:
+                    cached.update(ttl=self.ttl)
+                    entry[2] = time.monotonic()
+                except Exception as e:
+                    log_progress(f"Could not extend context cache, sending the instruction inline: {str(e)}", "warning")
+                    self._entries[key] = None
+                    self.prefix_requests += 1
+                    return None
+
+            self.cached_requests += 1
+            return model
+
+    def _register(self, instruction: str) -> Optional[list]:
+        tokens = estimate_tokens(instruction)
+        if tokens < self.min_tokens:
+            log_progress(f"Notes instruction is ~{tokens} tokens, below the {self.min_tokens}-token context cache "
+                         f"minimum; sending it as an uncached system instruction", "info")
+            return None
+
+        try:
+            from vertexai.caching import CachedContent
+            from vertexai.generative_models import GenerativeModel
+
+            cached = CachedContent.create(model_name=self.model_name, system_instruction=instruction,
+                                          ttl=self.ttl, display_name="ncert-notes-instruction")
+            log_progress(f"Registered ~{tokens}-token notes instruction as context cache {cached.name}", "ai")
+            return [cached, GenerativeModel.from_cached_content(cached), time.monotonic()]
+        except Exception as e:
+            log_progress(f"Context caching unavailable, sending the instruction inline: {str(e)}", "warning")
+            return None
+
+    def close(self):
+        """Delete the caches registered by this run instead of waiting for their TTL"""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry is not None:
+                    try:
+                        entry[0].delete()
+                    except Exception:
+                        pass
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"registered": sum(entry is not None for entry in self._entries.values()),
+                "cached_requests": self.cached_requests, "prefix_requests": self.prefix_requests}
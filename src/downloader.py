@@ -0,0 +1,343 @@
+"""
+Downloader Module - Pooled, streaming HTTP downloads with conditional revalidation
+and resumable transfers
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HostRateLimiter:
+    """
+    Host-level politeness limits shared by every download worker: at most
+    ``max_concurrent`` open requests per host, started no faster than
+    ``requests_per_second`` (0 disables the rate limit).
+    """
+
+    def __init__(self, max_concurrent: int = 4, requests_per_second: float = 0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._semaphores = {}
+        self._next_start = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold one of the host's request slots for the duration of a request"""
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_concurrent))
+
+        with semaphore:
+            if self.interval:
+                with self._lock:
+                    now = time.monotonic()
+                    start = max(now, self._next_start.get(host, now))
+                    self._next_start[host] = start + self.interval
+                time.sleep(max(0.0, start - now))
+            yield
+
+
+class PDFDownloader:
+    """
+    Downloads PDFs over a shared keep-alive connection pool.
+
+    Responses are streamed into a ``.part`` file next to the target and
+    atomically renamed into place once they are verified, so memory use stays
+    flat and a half-written file is never mistaken for a complete one. If a
+    transfer breaks, the ``.part`` file is kept and the next attempt resumes
+    it with an HTTP Range request (guarded by If-Range, so a changed file on
+    the server restarts from zero). The ETag and Last-Modified headers of
+    every download are kept in a ``.meta.json`` sidecar and sent back as
+    conditional headers on the next request, so a cached PDF can be
+    revalidated with a cheap 304 response.
+    """
+
+    def __init__(self, config: dict):
+        settings = config.get('download', {})
+        self.timeout = settings.get('timeout', 300)
+        self.chunk_size = settings.get('chunk_size', 64 * 1024)
+        self.revalidate = settings.get('revalidate', True)
+        self.min_size = settings.get('min_size', 1000)
+        self.retries = settings.get('retries', 3)
+        self.backoff_base = settings.get('backoff_base', 1.0)
+        self.backoff_max = settings.get('backoff_max', 30.0)
+        self.parallel_ranges = settings.get('parallel_ranges', 0)
+        self.parallel_min_size = int(settings.get('parallel_min_size_mb', 8) * 1024 * 1024)
+        pool_size = settings.get('pool_size', 10)
+        self.rate_limiter = HostRateLimiter(settings.get('max_per_host', pool_size),
+                                            settings.get('requests_per_second', 0))
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=max(pool_size, self.parallel_ranges))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": "ncert-notes-generator/1.0"})
+
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def metadata_path(filepath: Path) -> Path:
+        """Sidecar file holding the validators for a downloaded PDF"""
+        return filepath.with_name(filepath.name + ".meta.json")
+
+    @staticmethod
+    def part_path(filepath: Path) -> Path:
+        """In-progress download, kept across attempts so it can be resumed"""
+        return filepath.with_name(filepath.name + ".part")
+
+    @staticmethod
+    def ranges_path(filepath: Path) -> Path:
+        """Scratch file a parallel fetch assembles its byte ranges in; never resumed"""
+        return filepath.with_name(filepath.name + ".ranges")
+
+    def lock_for(self, filepath: Path) -> threading.Lock:
+        """Per-file lock so two workers never write the same ``.part`` file"""
+        with self._locks_guard:
+            return self._locks.setdefault(str(filepath), threading.Lock())
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for retry number ``attempt`` (0-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def load_metadata(self, filepath: Path) -> dict:
+        try:
+            return json.loads(self.metadata_path(filepath).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def save_metadata(self, filepath: Path, url: str, headers):
+        metadata = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "size": filepath.stat().st_size if filepath.exists() else None,
+            "downloaded_at": time.time(),
+        }
+        self.metadata_path(filepath).write_text(json.dumps(metadata, indent=2), encoding='utf-8')
+
+    def conditional_headers(self, url: str, filepath: Path) -> dict:
+        """If-None-Match / If-Modified-Since headers for an existing download of ``url``"""
+        if not filepath.exists():
+            return {}
+
+        metadata = self.load_metadata(filepath)
+        if metadata.get("url") != url:
+            return {}
+
+        headers = {}
+        if metadata.get("etag"):
+            headers["If-None-Match"] = metadata["etag"]
+        if metadata.get("last_modified"):
+            headers["If-Modified-Since"] = metadata["last_modified"]
+        return headers
+
+    def can_revalidate(self, url: str, filepath: Path) -> bool:
+        """True when revalidation is enabled and validators are stored for ``filepath``"""
+        return self.revalidate and bool(self.conditional_headers(url, filepath))
+
+    def request_headers(self, url: str, filepath: Path) -> dict:
+        """
+        Headers for the next attempt: a Range request resuming the ``.part``
+        file if there is one, otherwise conditional revalidation headers
+        """
+        part = self.part_path(filepath)
+        offset = part.stat().st_size if part.exists() else 0
+
+        if offset:
+            headers = {"Range": f"bytes={offset}-"}
+            validators = self.load_metadata(part)
+            if validators.get("url") == url:
+                validator = validators.get("etag") or validators.get("last_modified")
+                if validator:
+                    headers["If-Range"] = validator
+            return headers
+
+        return self.conditional_headers(url, filepath)
+
+    def open_part(self, url: str, filepath: Path, status: int, headers):
+        """
+        Open the ``.part`` file for the body of a 200/206 response.
+
+        Returns ``(file object, expected total size or None)``. A 206 that
+        continues the existing part appends to it; anything else truncates.
+        """
+        part = self.part_path(filepath)
+        offset = part.stat().st_size if part.exists() else 0
+        total = None
+
+        if status == 206:
+            match = re.match(r"bytes (\d+)-\d+/(\d+|\*)", headers.get("Content-Range", ""))
+            if not match or int(match.group(1)) != offset:
+                self.discard_part(filepath)
+                raise ValueError(f"unexpected Content-Range {headers.get('Content-Range')!r}")
+            if match.group(2) != "*":
+                total = int(match.group(2))
+            return open(part, 'ab'), total
+
+        if headers.get("Content-Length"):
+            total = int(headers["Content-Length"])
+        self.save_metadata(part, url, headers)
+        return open(part, 'wb'), total
+
+    def verify_pdf(self, path: Path, expected_size=None):
+        """Raise ValueError unless ``path`` looks like a complete PDF"""
+        size = path.stat().st_size
+
+        if expected_size is not None and size != expected_size:
+            raise ValueError(f"incomplete download ({size} of {expected_size} bytes)")
+        if size < self.min_size:
+            raise ValueError(f"file too small ({size} bytes)")
+
+        with open(path, 'rb') as f:
+            head = f.read(5)
+            f.seek(max(0, size - 1024))
+            tail = f.read()
+
+        if not head.startswith(b"%PDF"):
+            raise ValueError("missing %PDF header")
+        if b"%%EOF" not in tail:
+            raise ValueError("missing %%EOF marker")
+
+    def is_valid_pdf(self, path: Path) -> bool:
+        """True when ``path`` exists and passes ``verify_pdf``"""
+        try:
+            self.verify_pdf(path)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def complete(self, url: str, filepath: Path, headers, expected_size=None) -> int:
+        """Verify the ``.part`` file, move it into place and record its validators"""
+        part = self.part_path(filepath)
+
+        try:
+            self.verify_pdf(part, expected_size)
+        except (OSError, ValueError):
+            # A short read stays resumable; a corrupt or overlong file starts over
+            if expected_size is None or not part.exists() or part.stat().st_size >= expected_size:
+                self.discard_part(filepath)
+            raise
+
+        size = part.stat().st_size
+        os.replace(part, filepath)
+        self.save_metadata(filepath, url, headers)
+        self.metadata_path(part).unlink(missing_ok=True)
+        return size
+
+    def discard_part(self, filepath: Path):
+        part = self.part_path(filepath)
+        part.unlink(missing_ok=True)
+        self.metadata_path(part).unlink(missing_ok=True)
+
+    def fetch(self, url: str, filepath: Path) -> int:
+        """
+        Download ``url`` to ``filepath`` in a single attempt.
+
+        Returns the size of the verified file, or 0 when the server confirmed
+        the existing file is current (304). Raises ``requests.RequestException``
+        on network and HTTP errors (the partial file is kept for resuming) and
+        ``ValueError`` when the result is not a complete PDF.
+        """
+        with self.lock_for(filepath):
+            headers = self.request_headers(url, filepath)
+
+            if "Range" not in headers and self.parallel_ranges > 1:
+                size = self._fetch_parallel(url, filepath, headers)
+                if size is not None:
+                    return size
+
+            with self.rate_limiter.slot(url), \
+                    self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                if response.status_code == 304:
+                    return 0
+                if response.status_code == 416:
+                    # Nothing left to send: the part is either complete or unusable
+                    return self.complete(url, filepath, response.headers)
+                response.raise_for_status()
+
+                f, total = self.open_part(url, filepath, response.status_code, response.headers)
+                with f:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if chunk:
+                            f.write(chunk)
+
+                return self.complete(url, filepath, response.headers, total)
+
+    def _fetch_parallel(self, url: str, filepath: Path, headers: dict):
+        """
+        Fetch a large file as concurrent byte ranges.
+
+        Returns None when the server does not advertise range support or the
+        file is below ``parallel_min_size_mb``, so the caller falls back to a
+        single streamed request.
+        """
+        with self.rate_limiter.slot(url):
+            head = self.session.head(url, headers=headers, timeout=self.timeout, allow_redirects=True)
+        if head.status_code == 304:
+            return 0
+        if head.status_code != 200 or head.headers.get("Accept-Ranges") != "bytes":
+            return None
+
+        total = int(head.headers.get("Content-Length") or 0)
+        if total < self.parallel_min_size:
+            return None
+
+        # Ranges land in a preallocated scratch file whose holes would pass for a
+        # complete part, so it only becomes the part once every range is written
+        scratch = self.ranges_path(filepath)
+        with open(scratch, 'wb') as f:
+            f.truncate(total)
+
+        span = -(-total // self.parallel_ranges)
+        ranges = [(start, min(start + span, total) - 1) for start in range(0, total, span)]
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.parallel_ranges) as pool:
+                for future in [pool.submit(self._fetch_range, url, scratch, start, end) for start, end in ranges]:
+                    future.result()
+            os.replace(scratch, self.part_path(filepath))
+        finally:
+            scratch.unlink(missing_ok=True)
+
+        return self.complete(url, filepath, head.headers, total)
+
+    def _fetch_range(self, url: str, part: Path, start: int, end: int):
+        """Download bytes [start, end] into their slot of the preallocated scratch file"""
+        for attempt in range(self.retries):
+            try:
+                headers = {"Range": f"bytes={start}-{end}"}
+                with self.rate_limiter.slot(url), \
+                        self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    if response.status_code != 206:
+                        raise ValueError(f"range request answered with HTTP {response.status_code}")
+
+                    position = start
+                    with open(part, 'r+b') as f:
+                        f.seek(position)
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            f.write(chunk)
+                            position += len(chunk)
+
+                    if position != end + 1:
+                        raise ValueError(f"short range read ({position - start} of {end - start + 1} bytes)")
+                    return
+            except (requests.RequestException, ValueError):
+                if attempt + 1 == self.retries:
+                    raise
+                time.sleep(self.backoff_delay(attempt))
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,166 @@
+"""
+Manifest Module - Job manifests for headless (non-interactive) batch runs
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import yaml
+
+from catalogue import Chapter, ChapterCatalogue
+from output_backends import output_formats
+
+
+RANGE_PATTERN = re.compile(r"^\s*(\d+)\s*-\s*(\d+)\s*$")
+
+# Top-level manifest sections that are merged over config.yaml
+CONFIG_SECTIONS = ("concurrency", "cache", "download", "google", "notes", "pdf", "batch_prediction", "output")
+
+
+class ManifestError(ValueError):
+    """Raised when a job manifest or its equivalent CLI flags are invalid"""
+
+
+def load_manifest(path) -> dict:
+    """Read a YAML or JSON job manifest (JSON is valid YAML)"""
+    path = Path(path)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError) as e:
+        raise ManifestError(f"Cannot read manifest {path}: {str(e)}")
+
+    if not isinstance(manifest, dict):
+        raise ManifestError(f"Manifest {path} must be a mapping")
+    return manifest
+
+
+def apply_manifest(config: dict, manifest: dict):
+    """Merge the manifest's configuration sections (concurrency, cache policy, ...) over the config"""
+    for section in CONFIG_SECTIONS:
+        overrides = manifest.get(section)
+        if overrides is None:
+            continue
+        if not isinstance(overrides, dict):
+            raise ManifestError(f"Manifest section '{section}' must be a mapping")
+        config.setdefault(section, {}).update(overrides)
+
+
+def parse_shard(value: Union[str, dict, None]) -> Optional[tuple]:
+    """(index, count) from 'i/n' or {'index': i, 'count': n}"""
+    if value is None:
+        return None
+    try:
+        if isinstance(value, dict):
+            index, count = int(value['index']), int(value['count'])
+        else:
+            index, count = (int(part) for part in str(value).split("/"))
+    except (KeyError, TypeError, ValueError):
+        raise ManifestError(f"Invalid shard {value!r}; expected 'index/count'")
+
+    if count < 1 or not 0 <= index < count:
+        raise ManifestError(f"Invalid shard {value!r}; index must be in [0, count)")
+    return index, count
+
+
+def _selects(selector, entry: Chapter) -> bool:
+    """Whether one chapter selector (name, number or 'a-b' range) matches a catalogue entry"""
+    if isinstance(selector, int) or str(selector).strip().isdigit():
+        return entry.number == int(selector)
+    match = RANGE_PATTERN.match(str(selector))
+    if match:
+        low, high = int(match.group(1)), int(match.group(2))
+        return entry.number is not None and low <= entry.number <= high
+    return str(selector) == entry.name
+
+
+def _as_list(value) -> List:
+    if value is None:
+        return []
+    if isinstance(value, (str, int)):
+        return [value]
+    return list(value)
+
+
+def _split_flag(value: str) -> List[str]:
+    """Comma-separated CLI flag value as a list"""
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def resolve_chapters(manifest: dict, catalogue: ChapterCatalogue, default_grade: int) -> List[Chapter]:
+    """
+    Expand a manifest into the catalogue chapters it selects.
+
+    ``grades`` is a list or ``all`` (default: the configured grade),
+    ``subjects`` restricts the subjects (default: all), and ``chapters`` is
+    either a list applied to every subject or a mapping of subject to list
+    (which, without ``subjects``, also selects just the subjects it names).
+    Chapter selectors are names, numbers or ``"a-b"`` ranges of numbers.
+    A ``shard`` of ``i/n`` keeps every n-th chapter starting at i.
+    """
+    available = catalogue.grades()
+    grades = manifest.get('grades', [default_grade])
+    try:
+        grades = available if grades == "all" else [int(grade) for grade in _as_list(grades)]
+    except (TypeError, ValueError):
+        raise ManifestError(f"Invalid grades {grades!r}; expected a list of numbers or 'all'")
+    unknown = [grade for grade in grades if grade not in available]
+    if unknown:
+        raise ManifestError(f"No subjects data for grade(s) {unknown}; available: {available}")
+
+    chapters = manifest.get('chapters')
+    subjects = _as_list(manifest.get('subjects'))
+    if not subjects and isinstance(chapters, dict):
+        subjects = list(chapters)
+    known = {subject for grade in grades for subject in catalogue.subjects(grade)}
+    missing = [subject for subject in subjects if subject not in known]
+    if missing:
+        raise ManifestError(f"Unknown subject(s) {missing} for grade(s) {grades}")
+
+    selected = []
+
+    for grade in grades:
+        grade_subjects = catalogue.subjects(grade)
+        for subject in subjects or grade_subjects:
+            if isinstance(chapters, dict):
+                selectors = _as_list(chapters.get(subject))
+            else:
+                selectors = _as_list(chapters)
+
+            for entry in catalogue.chapters(grade, subject):
+                if entry.url and (not selectors or any(_selects(s, entry) for s in selectors)):
+                    selected.append(entry)
+
+    shard = parse_shard(manifest.get('shard'))
+    if shard:
+        index, count = shard
+        selected = selected[index::count]
+
+    return selected
+
+
+def manifest_from_args(args) -> Dict:
+    """Build a manifest from a manifest file plus the equivalent CLI flags (flags win)"""
+    manifest = load_manifest(args.manifest) if args.manifest else {}
+
+    if args.grades:
+        manifest['grades'] = "all" if args.grades.strip().lower() == "all" else _split_flag(args.grades)
+    if args.subjects:
+        manifest['subjects'] = _split_flag(args.subjects)
+    if args.chapters:
+        manifest['chapters'] = _split_flag(args.chapters)
+    if args.shard:
+        manifest['shard'] = args.shard
+    if args.mode:
+        manifest.setdefault('concurrency', {})['mode'] = args.mode
+    if args.format:
+        manifest.setdefault('output', {})['format'] = _split_flag(args.format)
+
+    output = manifest.get('output')
+    if isinstance(output, dict) and 'format' in output:
+        try:
+            output_formats(output)
+        except ValueError as e:
+            raise ManifestError(str(e))
+
+    return manifest
@@ -0,0 +1,337 @@
+"""
+Markdown Compiler Module - Single-pass conversion of Gemini markdown into ReportLab flowables or XHTML
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from reportlab.lib.units import inch
+from reportlab.platypus import HRFlowable, Paragraph, Preformatted, Spacer, Table, TableStyle
+
+
+# Characters ReportLab's paragraph parser treats as markup
+ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
+
+# Emphasis markers and the ReportLab tags they open and close
+EMPHASIS = {"**": ("<b>", "</b>"), "__": ("<b>", "</b>"), "*": ("<i>", "</i>"), "_": ("<i>", "</i>")}
+
+# Tags around `code` spans: a monospaced font for ReportLab, <code> for HTML
+CODE_FONT = ('<font face="Courier">', '</font>')
+CODE_ELEMENT = ("<code>", "</code>")
+
+BULLET_PATTERN = re.compile(r"^([ \t]*)[-*+•][ \t]+(.*)$")
+NUMBERED_PATTERN = re.compile(r"^([ \t]*)(\d{1,3})[.)][ \t]+(.*)$")
+RULE_PATTERN = re.compile(r"^([-*_])(?:[ \t]*\1){2,}$")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\|?[ \t]*:?-{2,}:?[ \t]*(\|[ \t]*:?-{2,}:?[ \t]*)*\|?$")
+
+# Deepest list nesting with its own indentation
+MAX_LIST_LEVEL = 3
+
+
+def escape(text: str) -> str:
+    """Escape text for a ReportLab paragraph"""
+    return "".join(ESCAPES.get(char, char) for char in text) if any(c in text for c in ESCAPES) else text
+
+
+def inline_markup(text: str, code_tags: Tuple[str, str] = CODE_FONT) -> str:
+    """
+    Convert inline markdown (bold, italic, code spans) into ReportLab paragraph markup.
+
+    One left-to-right scan with a stack of open emphasis markers: a marker
+    closes the nearest matching open one, and markers that are never closed
+    are emitted literally, so unbalanced input cannot produce broken tags.
+    Everything outside the markup is escaped. The <b>/<i> output is also
+    valid XHTML, so HTML output only swaps the ``code_tags``.
+    """
+    out: List[str] = []
+    stack = []  # (marker, index of its opening tag in out)
+    open_at = {marker: [] for marker in EMPHASIS}  # stack positions of each marker's open tags
+    i, n = 0, len(text)
+    backticks = "`" in text
+
+    while i < n:
+        char = text[i]
+
+        if char == "`" and backticks:
+            end = text.find("`", i + 1)
+            if end == -1:
+                backticks = False
+            elif end > i + 1:
+                out.append(f"{code_tags[0]}{escape(text[i + 1:end])}{code_tags[1]}")
+                i = end + 1
+                continue
+
+        elif char in "*_":
+            marker = char * 2 if text.startswith(char * 2, i) else char
+            if stack and stack[-1][0] == char and text.startswith(char * 3, i):
+                # A closing *** ends the inner italic before the bold around it
+                marker = char
+            before = text[i - 1] if i > 0 else " "
+            after = text[i + len(marker)] if i + len(marker) < n else " "
+            i += len(marker)
+
+            if open_at[marker] and not before.isspace() and not (char == "_" and after.isalnum()):
+                # Markers opened after the matching one were never closed: make them literal
+                position = open_at[marker].pop()
+                for unclosed, index in stack[position + 1:]:
+                    out[index] = unclosed
+                    open_at[unclosed].pop()
+                del stack[position:]
+                out.append(EMPHASIS[marker][1])
+            elif not after.isspace() and not (char == "_" and before.isalnum()):
+                open_at[marker].append(len(stack))
+                stack.append((marker, len(out)))
+                out.append(EMPHASIS[marker][0])
+            else:
+                out.append(marker)
+            continue
+
+        out.append(ESCAPES.get(char, char))
+        i += 1
+
+    for marker, index in stack:
+        out[index] = marker
+    return "".join(out)
+
+
+class MarkdownCompiler:
+    """
+    Turns markdown into flowables one line at a time.
+
+    Headings, nested bullet and numbered lists, block quotes, horizontal
+    rules, fenced code blocks and pipe tables are recognised; paragraph text
+    goes through ``inline_markup``. Every line is looked at once and
+    multi-line blocks (code, tables) are buffered until they end, so the same
+    compiler serves whole documents and streamed output. Parsing is separate
+    from the ``_heading``/``_paragraph``/... methods that emit each block, so
+    subclasses can produce other formats from the same rules.
+    """
+
+    def __init__(self, styles: Dict, width: float):
+        self.styles = styles
+        self.width = width
+        self.code: Optional[List[str]] = None
+        self.table: Optional[List[List[str]]] = None
+        self.table_header = False
+
+    def compile(self, text: str) -> list:
+        """Flowables for a complete markdown document"""
+        story = []
+        for line in text.split("\n"):
+            story.extend(self.feed(line))
+        story.extend(self.finish())
+        return story
+
+    def feed(self, line: str) -> list:
+        """Flowables completed by one more line of markdown"""
+        stripped = line.strip()
+
+        if self.code is not None:
+            if stripped.startswith("```"):
+                return self._flush_code()
+            self.code.append(line.rstrip())
+            return []
+
+        story = []
+        if self.table is not None:
+            if stripped.startswith("|"):
+                self._table_row(stripped)
+                return []
+            story.extend(self._flush_table())
+
+        if stripped.startswith("```"):
+            self.code = []
+        elif stripped.startswith("|"):
+            self.table = []
+            self._table_row(stripped)
+        else:
+            story.extend(self._line(line, stripped))
+        return story
+
+    def finish(self) -> list:
+        """Flowables for a code block or table still open at the end of the input"""
+        if self.code is not None:
+            return self._flush_code()
+        if self.table is not None:
+            return self._flush_table()
+        return []
+
+    def inline(self, text: str) -> str:
+        """Markup for the inline content of one block"""
+        return inline_markup(text)
+
+    def _line(self, line: str, stripped: str) -> list:
+        if not stripped:
+            return self._blank()
+
+        if stripped.startswith("#"):
+            level = len(stripped) - len(stripped.lstrip("#"))
+            if level <= 6 and stripped[level:level + 1] == " ":
+                return self._heading(level, self.inline(stripped[level + 1:].strip()))
+
+        if stripped[0] in "-*_" and RULE_PATTERN.match(stripped):
+            return self._rule()
+
+        if stripped.startswith(">"):
+            return self._quote(self.inline(stripped.lstrip("> \t")))
+
+        match = BULLET_PATTERN.match(line)
+        if match:
+            return self._list_item(self._list_level(match.group(1)), None, self.inline(match.group(2).strip()))
+
+        match = NUMBERED_PATTERN.match(line)
+        if match:
+            return self._list_item(self._list_level(match.group(1)), match.group(2),
+                                   self.inline(match.group(3).strip()))
+
+        return self._paragraph(self.inline(stripped), indented=line[0] in " \t")
+
+    @staticmethod
+    def _list_level(indent: str) -> int:
+        """Nesting level implied by a list item's indentation"""
+        return min(MAX_LIST_LEVEL, len(indent.replace("\t", "    ")) // 2)
+
+    def _blank(self) -> list:
+        return [Spacer(1, 0.1*inch)]
+
+    def _heading(self, level: int, text: str) -> list:
+        if level == 1:
+            return [Spacer(1, 0.2*inch), Paragraph(text, self.styles['title'])]
+        if level == 2:
+            return [Spacer(1, 0.15*inch), Paragraph(text, self.styles['heading1'])]
+        return [Paragraph(text, self.styles['heading2'])]
+
+    def _rule(self) -> list:
+        return [HRFlowable(width="100%", thickness=0.5, color="#BDC3C7", spaceBefore=4, spaceAfter=8)]
+
+    def _quote(self, text: str) -> list:
+        return [Paragraph(text, self.styles['quote'])]
+
+    def _list_item(self, level: int, number: Optional[str], text: str) -> list:
+        style = self.styles['bullet'] if level == 0 else self.styles[f'bullet{level}']
+        return [Paragraph(f"{number}. {text}" if number else f"• {text}", style)]
+
+    def _paragraph(self, text: str, indented: bool = False) -> list:
+        return [Paragraph(text, self.styles['body'])]
+
+    def _code(self, lines: List[str]) -> list:
+        return [Preformatted("\n".join(lines), self.styles['code'])]
+
+    def _table(self, rows: List[List[str]], header: bool) -> list:
+        columns = max(len(row) for row in rows)
+        cell_style = self.styles['table']
+        data = [
+            [Paragraph(self.inline(cell), cell_style) for cell in row] + [""] * (columns - len(row))
+            for row in rows
+        ]
+        commands = [
+            ("GRID", (0, 0), (-1, -1), 0.5, "#BDC3C7"),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]
+        if header:
+            commands.append(("BACKGROUND", (0, 0), (-1, 0), "#ECF0F1"))
+
+        table = Table(data, colWidths=[self.width / columns] * columns, repeatRows=1 if header else 0)
+        table.setStyle(TableStyle(commands))
+        return [Spacer(1, 0.05*inch), table, Spacer(1, 0.1*inch)]
+
+    def _flush_code(self) -> list:
+        lines, self.code = self.code, None
+        if not lines:
+            return []
+        return self._code(lines)
+
+    def _table_row(self, stripped: str):
+        if TABLE_SEPARATOR_PATTERN.match(stripped):
+            # The row above the separator is the header
+            self.table_header = len(self.table) == 1
+            return
+        cells = stripped.strip("|").split("|")
+        self.table.append([cell.strip() for cell in cells])
+
+    def _flush_table(self) -> list:
+        rows, header, self.table, self.table_header = self.table, self.table_header, None, False
+        if not rows:
+            return []
+        return self._table(rows, header)
+
+
+class HtmlCompiler(MarkdownCompiler):
+    """
+    Same parsing rules as ``MarkdownCompiler``, emitting XHTML fragments instead of flowables.
+
+    Lists become real nested ``<ul>``/``<ol>`` elements, and indented lines
+    that follow a list item continue it, as in the "common mistakes" section
+    of the notes. The output is well-formed XML, so it serves both the HTML
+    page and the EPUB chapter.
+    """
+
+    def __init__(self):
+        super().__init__(styles={}, width=0)
+        self.lists: List[str] = []
+
+    def inline(self, text: str) -> str:
+        return inline_markup(text, CODE_ELEMENT)
+
+    def finish(self) -> list:
+        return super().finish() + self._close_lists()
+
+    def _close_lists(self, depth: int = 0) -> list:
+        """Close open lists down to ``depth`` levels"""
+        closing = []
+        while len(self.lists) > depth:
+            closing.append(f"</li></{self.lists.pop()}>")
+        return closing
+
+    def _blank(self) -> list:
+        # Blank lines between list items keep the list open
+        return []
+
+    def _heading(self, level: int, text: str) -> list:
+        return self._close_lists() + [f"<h{level}>{text}</h{level}>"]
+
+    def _rule(self) -> list:
+        return self._close_lists() + ["<hr/>"]
+
+    def _quote(self, text: str) -> list:
+        return self._close_lists() + [f"<blockquote><p>{text}</p></blockquote>"]
+
+    def _list_item(self, level: int, number: Optional[str], text: str) -> list:
+        kind = "ol" if number else "ul"
+        # An item can only open one level deeper than the current list
+        level = min(level, len(self.lists))
+        html = self._close_lists(level + 1)
+        if len(self.lists) == level + 1 and self.lists[-1] != kind:
+            html += self._close_lists(level)
+
+        if len(self.lists) == level + 1:
+            html.append("</li>")
+        else:
+            start = f' start="{int(number)}"' if number and int(number) != 1 else ""
+            html.append(f"<{kind}{start}>")
+            self.lists.append(kind)
+        html.append(f"<li>{text}")
+        return html
+
+    def _paragraph(self, text: str, indented: bool = False) -> list:
+        if indented and self.lists:
+            return [f"<br/>{text}"]
+        return self._close_lists() + [f"<p>{text}</p>"]
+
+    def _code(self, lines: List[str]) -> list:
+        code = escape("\n".join(lines))
+        return self._close_lists() + [f"<pre><code>{code}</code></pre>"]
+
+    def _table(self, rows: List[List[str]], header: bool) -> list:
+        columns = max(len(row) for row in rows)
+
+        def row_html(row: List[str], tag: str) -> str:
+            cells = "".join(f"<{tag}>{self.inline(cell)}</{tag}>" for cell in row + [""] * (columns - len(row)))
+            return f"<tr>{cells}</tr>"
+
+        html = self._close_lists() + ["<table>"]
+        if header:
+            html.append(f"<thead>{row_html(rows[0], 'th')}</thead>")
+            rows = rows[1:]
+        html.append("<tbody>" + "".join(row_html(row, "td") for row in rows) + "</tbody></table>")
+        return html
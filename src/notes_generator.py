@@ -3,16 +3,118 @@
 Notes Generator Module - AI-powered note generation and PDF creation
 """
 
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import Optional
+import time
+from typing import Dict, List, Optional, Tuple, Union
 #import google.generativeai as genai
 from vertexai.generative_models import GenerativeModel
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.platypus import Paragraph, Spacer
+
+from batch_prediction import BatchPredictor
+from cache import ResponseCache, make_key
+from chunking import estimate_tokens, split_into_chunks
+from context_cache import InstructionCache
+from markdown_compiler import MarkdownCompiler, inline_markup
+from output_backends import BACKENDS, output_formats
+from output_manifest import OUTPUT_KEY_LENGTH
+from prompts import NotesPrompts
+from rate_limit import GeminiRateLimiter
+from render_pool import RenderPool, header_story, render_notes_pdf
+from theme import get_document_factory
+from utils import log_progress
+
+
+# Characters of chapter text sent when chunking is disabled
+UNCHUNKED_MAX_CHARS = 35000
+
+
+class StreamingNotesRenderer:
+    """
+    Builds the notes PDF story while Gemini is still streaming.
+
+    Every complete markdown line is fed to the markdown compiler as soon as it
+    arrives, using the same rules as ``save_as_pdf``, so only the final
+    layout pass is left when the stream ends. If the stream breaks, whatever
+    arrived so far is still rendered into a ``_partial`` PDF.
+    """
+    
+    def __init__(self, generator: "NotesGenerator", subject: str, chapter: str, key: str,
+                 progress_interval: float = 2.0):
+        self.generator = generator
+        self.subject = subject
+        self.chapter = chapter
+        self.key = key
+        self.styles = generator._build_styles()
+        self.story = generator._header_story(subject, chapter, self.styles)
+        self.compiler = generator._compiler()
+        self.parts = []
+        self.buffer = ""
+        self.tokens = 0
+        self.started = time.monotonic()
+        self.first_token = None
+        self.progress_interval = progress_interval
+        self.last_progress = self.started
+    
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+    
+    def tokens_per_second(self) -> float:
+        return self.tokens / max(time.monotonic() - self.started, 1e-6)
+    
+    def feed(self, text: str):
+        """Consume a streamed fragment, converting every completed line"""
+        if not text:
+            return
+        
+        if self.first_token is None:
+            self.first_token = time.monotonic() - self.started
+        self.parts.append(text)
+        self.tokens += estimate_tokens(text)
+        self.buffer += text
+        
+        *lines, self.buffer = self.buffer.split('\n')
+        for line in lines:
+            self.story.extend(self.compiler.feed(line))
+        
+        now = time.monotonic()
+        if now - self.last_progress >= self.progress_interval:
+            self.last_progress = now
+            log_progress(f"Streaming {self.chapter}: ~{self.tokens} tokens, {self.tokens_per_second():.0f} tok/s", "ai")
+    
+    def finish(self, error: Optional[str] = None) -> Path:
+        """Flush the last line and lay out the PDF, marking it partial if the stream failed"""
+        if self.buffer:
+            self.story.extend(self.compiler.feed(self.buffer))
+            self.buffer = ""
+        self.story.extend(self.compiler.finish())
+        
+        if error:
+            self.story.append(Spacer(1, 0.2*inch))
+            self.story.append(Paragraph(f"<b>⚠️ Generation interrupted:</b> {self.generator.markdown_conversion(error)}",
+                                        self.styles['body']))
+        
+        first_token = f", first token after {self.first_token:.1f}s" if self.first_token is not None else ""
+        log_progress(f"Streamed ~{self.tokens} tokens at {self.tokens_per_second():.0f} tok/s{first_token}", "ai")
+        
+        started = time.perf_counter()
+        filepath = self.generator._notes_filepath(self.subject, self.chapter, self.key, "_partial" if error else "")
+        self.generator._build_document(filepath, self.story)
+        self.generator.documents.record_render(time.perf_counter() - started)
+        return filepath
+
+
+def _chunk_text(chunk) -> str:
+    """Text of a streamed response chunk (chunks without text, e.g. the final usage chunk, yield '')"""
+    try:
+        return chunk.text
+    except (ValueError, IndexError, AttributeError):
+        return ""
 
 
 class NotesGenerator:
@@ -23,252 +125,462 @@ class NotesGenerator:
         self.config = config
         self.notes_dir = Path(config['output']['notes_dir'])
         self.notes_dir.mkdir(parents=True, exist_ok=True)
+        self.response_cache = ResponseCache.from_config(config)
+        if self.response_cache:
+            self.response_cache.evict()
+        self.rate_limiter = GeminiRateLimiter.from_config(config)
+        self.instruction_cache = InstructionCache.from_config(config)
+        self._instruction_models: Dict[str, GenerativeModel] = {}
+        self._instruction_models_lock = threading.Lock()
+        self.prompts = NotesPrompts.from_config(config)
+        self.documents = get_document_factory(config.get('output', {}))
+        self.formats = output_formats(config.get('output', {}))
+    
+    def for_grade(self, grade: int) -> "NotesGenerator":
+        """
+        Generator that writes notes for another grade.
+
+        The copy shares the model client, rate limiter, response and context caches; only the grade
+        used in prompts and headers changes, and its PDFs go to a
+        ``grade_<n>`` subdirectory so batch runs across grades never collide.
+        """
+        if grade == self.config.get('grade'):
+            return self
+        
+        generator = copy.copy(self)
+        generator.config = {**self.config, 'grade': grade}
+        generator.prompts = NotesPrompts.from_config(generator.config)
+        generator.notes_dir = self.notes_dir / f"grade_{grade}"
+        generator.notes_dir.mkdir(parents=True, exist_ok=True)
+        return generator
     
     def generate_notes(self, content: str, subject: str, chapter: str) -> str:
         """Generate comprehensive study notes using Claude AI"""
         
-        student_name = self.config.get('student_name', 'Student')
-        grade = self.config.get('grade', 10)
+        content = self._condense_content(content, subject, chapter)
+        prompt = self._build_prompt(content, subject, chapter)
         
-        prompt = f"""You are an expert educator creating study notes for a {grade}th-grade student named {student_name}.
-
-Subject: {subject}
-Chapter: {chapter}
-
-Original Content:
-{content[:35000]}  # Limit content to avoid token limits
-
-Create comprehensive, high-quality study notes that will help {student_name} score excellent marks. Structure your notes as follows:
-
-# 📚 {chapter}
-
-## 🎯 Chapter Overview
-(2-3 sentences summarizing what this chapter is about)
-
-## 🔑 Key Concepts
-
-### Concept 1: [Name]
-- Clear definition and explanation
-- Why it's important
-- Real-world applications
-
-### Concept 2: [Name]
-(Continue for all major concepts)
-
-## 💡 Important Points to Remember
-- Point 1: Detailed explanation
-- Point 2: Detailed explanation
-(5-8 critical points)
-
-## 🧠 Memory Tricks & Mnemonics
-
-### Trick 1: [Topic]
-**Mnemonic**: [Clever acronym or phrase]
-**Explanation**: How to use this mnemonic
-
-(Provide 3-5 memory tricks)
-
-## ⚡ Quick Revision Points
-• One-liner 1
-• One-liner 2
-(10-15 quick points for last-minute revision)
-
-## ⚠️ Common Mistakes to Avoid
-1. **Mistake**: [What students often get wrong]
-   **Why it's wrong**: [Explanation]
-   **Correct approach**: [How to do it right]
-
-(3-5 common mistakes)
-
-## 🎓 Exam Strategy & Tips
-
-### Question Patterns
-- Pattern 1: [Type of questions asked]
-- Pattern 2: [Type of questions asked]
-
-### Answer Writing Tips
-- Tip 1: [How to structure answers]
-- Tip 2: [Key words to include]
-
-### Time Management
-- Suggested time allocation for different question types
-
-## 📝 Practice Questions
-
-### Short Answer Questions (2-3 marks)
-1. Question with [Hint: key concept to use]
-2. Question with [Hint: key concept to use]
-
-### Long Answer Questions (5 marks)
-1. Question with [Hint: approach to take]
-2. Question with [Hint: approach to take]
-
-### Numerical/Application Questions (if applicable)
-1. Question with [Hint: formula or method]
-
-## 🔗 Topic Connections
-- How this chapter connects to other chapters
-- Real-world relevance
-
----
-
-Make the notes engaging, clear, and focused on exam success. Use simple language suitable for a {grade}th grader. Directly start with notes don't add prefix tax"""
-
+        return self._generate(prompt, self._generation_config(), self._system_instruction())
+    
+    async def agenerate_notes(self, content: str, subject: str, chapter: str) -> str:
+        """Generate study notes with the async Gemini API so many chapters can be in flight"""
+        
+        content = await self._acondense_content(content, subject, chapter)
+        prompt = self._build_prompt(content, subject, chapter)
+        
+        return await self._agenerate(prompt, self._generation_config(), self._system_instruction())
+    
+    def stream_notes_to_pdf(self, content: str, subject: str, chapter: str,
+                            key: Optional[str] = None) -> Tuple[str, Path]:
+        """Stream notes from Gemini and build the PDF (named after ``key``) from each line as it arrives"""
+        
+        content = self._condense_content(content, subject, chapter)
+        prompt = self._build_prompt(content, subject, chapter)
+        generation_config = self._generation_config()
+        instruction = self._system_instruction()
+        key = self._output_key(key, self._cache_text(prompt, instruction))
+        cache_key, cached = self._cache_lookup(self._cache_text(prompt, instruction), generation_config)
+        if cached is not None:
+            return cached, self.save_as_pdf(cached, subject, chapter, key)
+        
+        client, contents = self._request(prompt, instruction)
+        
+        def open_stream():
+            # Pull the first chunk inside the limiter, since quota errors surface there
+            stream = iter(client.generate_content(contents, generation_config=generation_config, stream=True))
+            return next(stream, None), stream
+        
+        renderer = StreamingNotesRenderer(self, subject, chapter, key)
+        try:
+            first, stream = self.rate_limiter.call(open_stream, self._cache_text(prompt, instruction))
+            if first is not None:
+                renderer.feed(_chunk_text(first))
+            for chunk in stream:
+                renderer.feed(_chunk_text(chunk))
+        except Exception as e:
+            partial = renderer.finish(error=str(e))
+            raise Exception(f"Failed to generate notes: {str(e)} (partial notes saved to {partial.name})")
+        finally:
+            self.rate_limiter.charge(renderer.tokens)
+        
+        notes = self._cache_store(cache_key, renderer.text)
+        return notes, renderer.finish()
+    
+    async def astream_notes_to_pdf(self, content: str, subject: str, chapter: str,
+                                   key: Optional[str] = None) -> Tuple[str, Path]:
+        """Async variant of ``stream_notes_to_pdf``; the final layout pass runs in a worker thread"""
+        
+        content = await self._acondense_content(content, subject, chapter)
+        prompt = self._build_prompt(content, subject, chapter)
+        generation_config = self._generation_config()
+        instruction = self._system_instruction()
+        key = self._output_key(key, self._cache_text(prompt, instruction))
+        cache_key, cached = self._cache_lookup(self._cache_text(prompt, instruction), generation_config)
+        if cached is not None:
+            return cached, await asyncio.to_thread(self.save_as_pdf, cached, subject, chapter, key)
+        
+        client, contents = self._request(prompt, instruction)
+        
+        async def open_stream():
+            # Pull the first chunk inside the limiter, since quota errors surface there
+            stream = (await client.generate_content_async(contents, generation_config=generation_config,
+                                                           stream=True)).__aiter__()
+            try:
+                return await stream.__anext__(), stream
+            except StopAsyncIteration:
+                return None, stream
+        
+        renderer = StreamingNotesRenderer(self, subject, chapter, key)
         try:
-            generation_config = {
-                "max_output_tokens":self.config['google']['max_tokens'],
-                "temperature":self.config['google']['temperature'],
-            }
-            response = self.client.generate_content([prompt], generation_config=generation_config)
+            first, stream = await self.rate_limiter.acall(open_stream, self._cache_text(prompt, instruction))
+            if first is not None:
+                renderer.feed(_chunk_text(first))
+            async for chunk in stream:
+                renderer.feed(_chunk_text(chunk))
+        except Exception as e:
+            partial = await asyncio.to_thread(renderer.finish, str(e))
+            raise Exception(f"Failed to generate notes: {str(e)} (partial notes saved to {partial.name})")
+        finally:
+            self.rate_limiter.charge(renderer.tokens)
+        
+        notes = self._cache_store(cache_key, renderer.text)
+        return notes, await asyncio.to_thread(renderer.finish)
+    
+    def _generate(self, prompt: str, generation_config: dict, instruction: Optional[str] = None) -> str:
+        """Single cached Gemini call, optionally under a system instruction"""
+        text = self._cache_text(prompt, instruction)
+        cache_key, cached = self._cache_lookup(text, generation_config)
+        if cached is not None:
+            return cached
+        
+        client, contents = self._request(prompt, instruction)
+        try:
+            response = self.rate_limiter.call(
+                lambda: client.generate_content(contents, generation_config=generation_config), text)
             
-            return response.text
+            return self._cache_store(cache_key, response.text)
             
         except Exception as e:
             raise Exception(f"Failed to generate notes: {str(e)}")
     
-    def save_as_pdf(self, notes: str, subject: str, chapter: str) -> Path:
-        """Save generated notes as a formatted PDF"""
+    async def _agenerate(self, prompt: str, generation_config: dict, instruction: Optional[str] = None) -> str:
+        """Single cached Gemini call on the async API"""
+        text = self._cache_text(prompt, instruction)
+        cache_key, cached = self._cache_lookup(text, generation_config)
+        if cached is not None:
+            return cached
         
-        # Create filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_subject = subject.replace(' ', '_')
-        safe_chapter = chapter.replace(' ', '_')
-        filename = f"{safe_subject}_{safe_chapter}_Notes_{timestamp}.pdf"
-        filepath = self.notes_dir / filename
-        
-        # Create PDF
-        doc = SimpleDocTemplate(
-            str(filepath),
-            pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=36
-        )
+        client, contents = self._request(prompt, instruction)
+        try:
+            response = await self.rate_limiter.acall(
+                lambda: client.generate_content_async(contents, generation_config=generation_config), text)
+            
+            return self._cache_store(cache_key, response.text)
+            
+        except Exception as e:
+            raise Exception(f"Failed to generate notes: {str(e)}")
+    
+    def _request(self, prompt: str, instruction: Optional[str] = None) -> Tuple[GenerativeModel, list]:
+        """
+        Model and contents for a prompt.
         
-        # Define styles
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor='#2C3E50',
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
+        The instruction is served from its context cache when one is registered;
+        otherwise it is the system instruction of a model built once per
+        instruction, an identical prefix for every chapter that Gemini's
+        implicit caching can reuse.
+        """
+        if instruction is None:
+            return self.client, [prompt]
         
-        heading1_style = ParagraphStyle(
-            'CustomHeading1',
-            parent=styles['Heading1'],
-            fontSize=18,
-            textColor='#34495E',
-            spaceAfter=12,
-            spaceBefore=16,
-            fontName='Helvetica-Bold'
-        )
+        model = self.instruction_cache.model_for(instruction) if self.instruction_cache else None
+        if model is None:
+            model = self._instruction_model(instruction)
+        return model, [prompt]
+    
+    def _instruction_model(self, instruction: str) -> GenerativeModel:
+        """Model sending ``instruction`` as its system instruction, shared by every grade copy"""
+        with self._instruction_models_lock:
+            model = self._instruction_models.get(instruction)
+            if model is None:
+                model = GenerativeModel(model_name=self.config['google']['model'], system_instruction=instruction)
+                self._instruction_models[instruction] = model
+            return model
+    
+    @staticmethod
+    def _cache_text(prompt: str, instruction: Optional[str] = None) -> str:
+        """Everything the model reads for a prompt, as used for response cache keys and token estimates"""
+        return f"{instruction}\n\n{prompt}" if instruction else prompt
+    
+    def _chunking_config(self) -> dict:
+        return self.config.get('notes', {}).get('chunking', {})
+    
+    def _plan_chunks(self, content: str) -> List[str]:
+        """
+        Decide how a chapter is sent to Gemini: as a single piece when it fits
+        the input budget, otherwise as token-budgeted chunks split on section
+        boundaries. With chunking disabled, text is cut at ``UNCHUNKED_MAX_CHARS``.
+        """
+        chunking = self._chunking_config()
+        chars_per_token = chunking.get('chars_per_token', 4.0)
+        max_input_tokens = chunking.get('max_input_tokens', 8000)
         
-        heading2_style = ParagraphStyle(
-            'CustomHeading2',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor='#7F8C8D',
-            spaceAfter=10,
-            spaceBefore=12,
-            fontName='Helvetica-Bold'
-        )
+        if not chunking.get('enabled', True):
+            return [content[:UNCHUNKED_MAX_CHARS]]
+        if estimate_tokens(content, chars_per_token) <= max_input_tokens:
+            return [content]
         
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['BodyText'],
-            fontSize=11,
-            alignment=TA_JUSTIFY,
-            spaceAfter=8,
-            leading=14
-        )
+        return split_into_chunks(content, chunking.get('chunk_tokens', 3000), chars_per_token)
+    
+    def _map_generation_config(self) -> dict:
+        """Generation parameters for the per-chunk summaries"""
+        return {
+            "max_output_tokens": self._chunking_config().get('map_max_output_tokens', 4096),
+            "temperature": self.config['google']['temperature'],
+        }
+    
+    def _condense_content(self, content: str, subject: str, chapter: str) -> str:
+        """Map step: summarise every chunk of a long chapter in parallel"""
+        chunks = self._plan_chunks(content)
+        if len(chunks) == 1:
+            return chunks[0]
         
-        bullet_style = ParagraphStyle(
-            'CustomBullet',
-            parent=styles['BodyText'],
-            fontSize=11,
-            leftIndent=20,
-            spaceAfter=6,
-            leading=14
-        )
+        log_progress(f"Chapter split into {len(chunks)} chunks, summarising in parallel", "ai")
+        generation_config = self._map_generation_config()
+        prompts = [self._build_map_prompt(chunk, i, len(chunks), subject, chapter) for i, chunk in enumerate(chunks, 1)]
         
-        # Build PDF content
-        story = []
+        with ThreadPoolExecutor(max_workers=self._chunking_config().get('map_workers', 4)) as pool:
+            summaries = list(pool.map(lambda prompt: self._generate(prompt, generation_config), prompts))
         
-        # Header
-        story.append(Paragraph("NCERT Study Notes", title_style))
-        story.append(Paragraph(f"{subject}", heading1_style))
-        story.append(Paragraph(f"{chapter}", heading2_style))
-        story.append(Spacer(1, 0.2*inch))
+        return self._join_summaries(summaries)
+    
+    async def _acondense_content(self, content: str, subject: str, chapter: str) -> str:
+        """Async map step: summarise every chunk of a long chapter concurrently"""
+        chunks = self._plan_chunks(content)
+        if len(chunks) == 1:
+            return chunks[0]
         
-        # Metadata
-        student_name = self.config.get('student_name', 'Student')
-        story.append(Paragraph(f"<b>Prepared for:</b> {student_name} (Grade {self.config.get('grade', 10)})", body_style))
-        story.append(Paragraph(f"<b>Generated on:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", body_style))
-        story.append(Spacer(1, 0.3*inch))
+        log_progress(f"Chapter split into {len(chunks)} chunks, summarising concurrently", "ai")
+        generation_config = self._map_generation_config()
+        semaphore = asyncio.Semaphore(self._chunking_config().get('map_workers', 4))
         
-        # Process notes content
-        lines = notes.split('\n')
+        async def summarise(prompt: str) -> str:
+            async with semaphore:
+                return await self._agenerate(prompt, generation_config)
         
-        for line in lines:
-            line = line.strip()
-            
-            if not line:
-                story.append(Spacer(1, 0.1*inch))
-                continue
-            
-            # Headers
-            if line.startswith('# '):
-                story.append(Spacer(1, 0.2*inch))
-                story.append(Paragraph(line[2:], title_style))
-            elif line.startswith('## '):
-                story.append(Spacer(1, 0.15*inch))
-                story.append(Paragraph(line[3:], heading1_style))
-            elif line.startswith('### '):
-                story.append(Paragraph(line[4:], heading2_style))
-            
-            # Bullets and lists
-            elif line.startswith('- ') or line.startswith('• '):
-                story.append(Paragraph(f"• {self.markdown_conversion(line[2:])}", bullet_style))
-            elif line.startswith('* '):
-                story.append(Paragraph(f"• {self.markdown_conversion(line[2:])}", bullet_style))
-            
-            # Numbered lists
-            elif len(line) > 2 and line[0].isdigit() and line[1] == '.':
-                story.append(Paragraph(self.markdown_conversion(line), bullet_style))
-            
-            # Bold text
-            elif line.startswith('**') and line.endswith('**'):
-                story.append(Paragraph(f"<b>{line[2:-2]}</b>", body_style))
-            
-            # Regular paragraphs
-            else:
-                line = self.markdown_conversion (line)
-                # Convert markdown bold
-                # line = line.replace('**', '<b>', 1)
-                # line = line.replace('**', '</b>', 1)
-                story.append(Paragraph(line, body_style))
+        summaries = await asyncio.gather(*[
+            summarise(self._build_map_prompt(chunk, i, len(chunks), subject, chapter))
+            for i, chunk in enumerate(chunks, 1)
+        ])
+        
+        return self._join_summaries(summaries)
+    
+    def _join_summaries(self, summaries: List[str]) -> str:
+        """Reduce input: the chunk summaries in chapter order"""
+        return "\n\n".join(
+            f"[Part {i} of {len(summaries)}]\n{summary.strip()}"
+            for i, summary in enumerate(summaries, 1)
+        )
+    
+    def _build_map_prompt(self, chunk: str, index: int, total: int, subject: str, chapter: str) -> str:
+        """Render the prompt that condenses one chunk of a chapter"""
+        return self.prompts.map_prompt(chunk, index, total, subject, chapter)
+    
+    def _cache_lookup(self, prompt: str, generation_config: dict):
+        """Return (cache key, cached notes or None) for a rendered prompt"""
+        if not self.response_cache:
+            return None, None
+        
+        key = self.response_cache.key_for(prompt, self.config['google']['model'], generation_config)
+        return key, self.response_cache.get(key)
+    
+    def _cache_store(self, cache_key: Optional[str], notes: str) -> str:
+        """Persist freshly generated notes and hand them back"""
+        if self.response_cache and cache_key and notes:
+            self.response_cache.set(cache_key, notes, self.config['google']['model'])
+        return notes
+    
+    def _generation_config(self) -> dict:
+        """Generation parameters passed to Gemini"""
+        return {
+            "max_output_tokens": self.config['google']['max_tokens'],
+            "temperature": self.config['google']['temperature'],
+        }
+    
+    def _build_prompt(self, content: str, subject: str, chapter: str) -> str:
+        """Render the per-chapter part of the notes prompt and report the request size"""
+        prompt = self.prompts.chapter_prompt(content, subject, chapter)
+        log_progress(f"Prompt for {chapter}: ~{self.prompts.prompt_tokens(prompt)} tokens "
+                     f"(template ~{self.prompts.instruction_tokens}, sections: {', '.join(self.prompts.sections)})", "ai")
+        return prompt
+    
+    def _system_instruction(self) -> str:
+        """
+        Static notes template shared by every chapter of a grade.
         
-        # Build PDF
-        doc.build(story)
+        It is compiled once from the `notes:` settings, so the text is identical
+        across a run and can be registered once as a context cache, or at least
+        sent as an unchanging prefix that Gemini's implicit caching recognises.
+        """
+        return self.prompts.instruction
+    
+    def save_as_pdf(self, notes: str, subject: str, chapter: str, key: Optional[str] = None) -> Path:
+        """Save generated notes as a formatted PDF named after the chapter's output ``key``"""
+        
+        filepath = self._notes_filepath(subject, chapter, self._output_key(key, notes))
+        seconds = render_notes_pdf(*self._render_settings(), notes, subject, chapter, filepath)
+        self.documents.record_render(seconds)
         
         return filepath
+    
+    def save_outputs(self, notes: str, subject: str, chapter: str, formats: Optional[List[str]] = None,
+                     key: Optional[str] = None) -> List[Path]:
+        """Write the notes in each of ``formats`` (default: every configured format) under one file stem"""
+        filepath = self._notes_filepath(subject, chapter, self._output_key(key, notes))
+        paths = []
+        
+        for name in self.formats if formats is None else formats:
+            path = filepath.with_suffix(BACKENDS[name].suffix)
+            started = time.perf_counter()
+            BACKENDS[name].write(*self._render_settings(), notes, subject, chapter, path)
+            if name == "pdf":
+                self.documents.record_render(time.perf_counter() - started)
+            paths.append(path)
+        
+        return paths
+    
+    def submit_pdf(self, pool: RenderPool, notes: str, subject: str, chapter: str,
+                   key: Optional[str] = None) -> "Future[Path]":
+        """Queue the notes PDF on a render pool (blocking while it is full); the future yields its path"""
+        filepath = self._notes_filepath(subject, chapter, self._output_key(key, notes))
+        rendered = pool.submit(*self._render_settings(), notes, subject, chapter, filepath)
+        saved = Future()
+        
+        def done(render: Future):
+            try:
+                self.documents.record_render(render.result())
+                saved.set_result(filepath)
+            except Exception as e:
+                saved.set_exception(e)
+        
+        rendered.add_done_callback(done)
+        return saved
+    
+    def _render_settings(self) -> tuple:
+        """(output config, student name, grade) that a render needs besides the notes"""
+        return self.config.get('output', {}), self.config.get('student_name', 'Student'), self.config.get('grade', 10)
+    
+    def output_path(self, subject: str, chapter: str, key: str, output_format: str = "pdf") -> Path:
+        """Where the chapter's notes for output ``key`` are written in ``output_format``"""
+        return self._notes_filepath(subject, chapter, key).with_suffix(BACKENDS[output_format].suffix)
+    
+    def output_provenance(self) -> dict:
+        """Prompt version and model settings that, with the source PDF, determine a chapter's notes"""
+        return {
+            "prompt_version": self.prompts.version,
+            "model": self.config['google']['model'],
+            "generation_config": self._generation_config(),
+            "map_generation_config": self._map_generation_config(),
+            "chunking": self._chunking_config(),
+        }
+    
+    @staticmethod
+    def _output_key(key: Optional[str], content: str) -> str:
+        """``key``, or for callers without one a key derived from ``content`` (the notes or the prompt)"""
+        return key or make_key(content)[:OUTPUT_KEY_LENGTH]
+    
+    def _notes_filepath(self, subject: str, chapter: str, key: str, suffix: str = "") -> Path:
+        """Output path for a chapter's notes, named after its output key instead of the time"""
+        safe_subject = subject.replace(' ', '_')
+        safe_chapter = chapter.replace(' ', '_')
+        filename = f"{safe_subject}_{safe_chapter}_Notes_{key}{suffix}.pdf"
+        return self.notes_dir / filename
+    
+    def _build_document(self, filepath: Path, story: list):
+        """Lay out the story into a PDF with the shared document factory"""
+        self.documents.build(filepath, story)
+    
+    def _build_styles(self) -> dict:
+        """Paragraph styles used for the notes PDF (built once per process)"""
+        return self.documents.styles
+    
+    def _header_story(self, subject: str, chapter: str, styles: dict) -> list:
+        """Title block and metadata at the top of every notes PDF"""
+        return header_story(subject, chapter, *self._render_settings()[1:], styles)
+    
+    def _compiler(self) -> MarkdownCompiler:
+        """Fresh markdown compiler for one chapter, on the shared styles"""
+        return MarkdownCompiler(self._build_styles(), self.documents.frame_width)
+    
+    def markdown_conversion(self, text: str) -> str:
+        """Convert inline Markdown (bold, italic, code) to escaped ReportLab markup"""
+        return inline_markup(text)
 
-    def markdown_conversion(self, text: str):
-        """Convert Markdown to HTML"""
-        start = True
-        while "**" in text: 
-            if start:
-                start = False
-                text = text.replace("**", "<b>", 1)
-            else:
-                start = True
-                text = text.replace("**", "</b>", 1)
-        return text
+
+def generate_notes_batch(chapters: List[Tuple[NotesGenerator, str, str, str]],
+                         predictor: BatchPredictor) -> List[Union[str, Exception]]:
+    """
+    Generate notes for many chapters with batch prediction jobs instead of online calls.
+    
+    ``chapters`` holds (generator, content, subject, chapter) tuples, so one job
+    can span grades. Long chapters first have all their chunks summarised in
+    one job (the map step), then every chapter's notes prompt goes into a
+    second job. Cached responses are reused and fresh ones are cached, exactly
+    like ``generate_notes``. Returns the notes, or the exception, per chapter.
+    """
+    model = chapters[0][0].config['google']['model'] if chapters else ""
+    
+    # Map step for chapters that do not fit in one prompt
+    plans = [generator._plan_chunks(content) for generator, content, _, _ in chapters]
+    map_jobs = {}
+    for i, ((generator, _, subject, chapter), chunks) in enumerate(zip(chapters, plans)):
+        if len(chunks) > 1:
+            for j, chunk in enumerate(chunks, 1):
+                prompt = generator._build_map_prompt(chunk, j, len(chunks), subject, chapter)
+                map_jobs[f"{i}:map:{j}"] = (generator, prompt, generator._map_generation_config(), None)
+    
+    if map_jobs:
+        log_progress(f"{sum(len(chunks) > 1 for chunks in plans)} long chapters: summarising {len(map_jobs)} chunks in batch", "ai")
+    summaries = _predict_cached(map_jobs, predictor, model, "map")
+    
+    # Notes step
+    results: List[Union[str, Exception]] = [None] * len(chapters)
+    notes_jobs = {}
+    for i, ((generator, _, subject, chapter), chunks) in enumerate(zip(chapters, plans)):
+        if len(chunks) == 1:
+            content = chunks[0]
+        else:
+            parts = [summaries[f"{i}:map:{j}"] for j in range(1, len(chunks) + 1)]
+            failed = next((part for part in parts if isinstance(part, Exception)), None)
+            if failed is not None:
+                results[i] = Exception(f"Failed to generate notes: chunk summary failed: {str(failed)}")
+                continue
+            content = generator._join_summaries(parts)
+        notes_jobs[str(i)] = (generator, generator._build_prompt(content, subject, chapter),
+                              generator._generation_config(), generator._system_instruction())
+    
+    for key, notes in _predict_cached(notes_jobs, predictor, model, "notes").items():
+        results[int(key)] = Exception(f"Failed to generate notes: {str(notes)}") if isinstance(notes, Exception) else notes
+    
+    return results
 
 
+def _predict_cached(jobs: dict, predictor: BatchPredictor, model: str, label: str) -> dict:
+    """Answer ``key -> (generator, prompt, generation_config, instruction)`` jobs from the cache or one batch job"""
+    results = {}
+    requests = {}
+    cache_keys = {}
+    
+    for key, (generator, prompt, generation_config, instruction) in jobs.items():
+        cache_keys[key], cached = generator._cache_lookup(generator._cache_text(prompt, instruction), generation_config)
+        if cached is not None:
+            results[key] = cached
+        else:
+            requests[key] = (prompt, generation_config, instruction)
+    
+    if results:
+        log_progress(f"{len(results)}/{len(jobs)} {label} prompts answered from cache", "info")
+    
+    for key, text in predictor.predict(requests, model, label).items():
+        results[key] = text if isinstance(text, Exception) else jobs[key][0]._cache_store(cache_keys[key], text)
+    
+    return results
@@ -0,0 +1,216 @@
+"""
+Output Backends Module - Writers that persist generated notes as PDF, Markdown, HTML or EPUB
+"""
+
+import json
+import uuid
+import zipfile
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Union
+
+from markdown_compiler import HtmlCompiler, escape
+from render_pool import render_notes_pdf
+from theme import THEMES
+
+
+class OutputBackend(ABC):
+    """
+    One output format for a chapter's notes.
+
+    ``write`` turns the generated markdown plus the render settings
+    (``output`` config, student name, grade) into ``filepath``. Backends
+    are stateless, so one instance serves every thread of a run.
+    """
+
+    name = ""
+    suffix = ""
+
+    @abstractmethod
+    def write(self, output: dict, student_name: str, grade: int, notes: str, subject: str, chapter: str,
+              filepath: Path):
+        ...
+
+
+class PdfBackend(OutputBackend):
+    """ReportLab layout; the only CPU-heavy format, so runs may send it to a render pool instead"""
+
+    name = "pdf"
+    suffix = ".pdf"
+
+    def write(self, output, student_name, grade, notes, subject, chapter, filepath):
+        render_notes_pdf(output, student_name, grade, notes, subject, chapter, filepath)
+
+
+class MarkdownBackend(OutputBackend):
+    """The notes as generated, behind a YAML front matter block describing the chapter"""
+
+    name = "md"
+    suffix = ".md"
+
+    def write(self, output, student_name, grade, notes, subject, chapter, filepath):
+        # JSON strings are valid YAML scalars and need no escaping rules of their own
+        front_matter = "\n".join([
+            "---",
+            f"title: {json.dumps(chapter, ensure_ascii=False)}",
+            f"subject: {json.dumps(subject, ensure_ascii=False)}",
+            f"grade: {grade}",
+            f"prepared_for: {json.dumps(student_name, ensure_ascii=False)}",
+            f"generated: {datetime.now().isoformat(timespec='seconds')}",
+            "---",
+        ])
+        filepath.write_text(f"{front_matter}\n\n{notes.strip()}\n", encoding='utf-8')
+
+
+class HtmlBackend(OutputBackend):
+    """A standalone XHTML page with the theme's colours in an embedded stylesheet"""
+
+    name = "html"
+    suffix = ".html"
+
+    def write(self, output, student_name, grade, notes, subject, chapter, filepath):
+        filepath.write_text(notes_xhtml(output, student_name, grade, notes, subject, chapter,
+                                        stylesheet=f"<style>{notes_css(output)}</style>"), encoding='utf-8')
+
+
+class EpubBackend(OutputBackend):
+    """
+    A single-chapter EPUB 3 book.
+
+    The package is written directly with ``zipfile``: the uncompressed
+    ``mimetype`` entry first, the container and package documents, a
+    navigation document and the notes page from ``HtmlBackend``'s markup.
+    """
+
+    name = "epub"
+    suffix = ".epub"
+
+    def write(self, output, student_name, grade, notes, subject, chapter, filepath):
+        title = escape(f"{subject} - {chapter}")
+        identifier = uuid.uuid5(uuid.NAMESPACE_URL, f"ncert-notes:{grade}:{subject}:{chapter}:{student_name}")
+        modified = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        container = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>
+</container>
+"""
+        package = f"""<?xml version="1.0" encoding="UTF-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="book-id">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:identifier id="book-id">urn:uuid:{identifier}</dc:identifier>
+    <dc:title>{title}</dc:title>
+    <dc:language>en</dc:language>
+    <dc:subject>{escape(subject)}</dc:subject>
+    <meta property="dcterms:modified">{modified}</meta>
+  </metadata>
+  <manifest>
+    <item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>
+    <item id="notes" href="notes.xhtml" media-type="application/xhtml+xml"/>
+    <item id="css" href="style.css" media-type="text/css"/>
+  </manifest>
+  <spine><itemref idref="notes"/></spine>
+</package>
+"""
+        nav = f"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" lang="en">
+<head><title>{title}</title></head>
+<body><nav epub:type="toc"><ol><li><a href="notes.xhtml">{escape(chapter)}</a></li></ol></nav></body>
+</html>
+"""
+        page = notes_xhtml(output, student_name, grade, notes, subject, chapter,
+                           stylesheet='<link rel="stylesheet" type="text/css" href="style.css"/>')
+
+        with zipfile.ZipFile(filepath, 'w') as book:
+            book.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+            book.writestr("META-INF/container.xml", container, compress_type=zipfile.ZIP_DEFLATED)
+            book.writestr("OEBPS/content.opf", package, compress_type=zipfile.ZIP_DEFLATED)
+            book.writestr("OEBPS/nav.xhtml", nav, compress_type=zipfile.ZIP_DEFLATED)
+            book.writestr("OEBPS/notes.xhtml", page, compress_type=zipfile.ZIP_DEFLATED)
+            book.writestr("OEBPS/style.css", notes_css(output), compress_type=zipfile.ZIP_DEFLATED)
+
+
+BACKENDS: Dict[str, OutputBackend] = {
+    backend.name: backend for backend in (PdfBackend(), MarkdownBackend(), HtmlBackend(), EpubBackend())
+}
+
+# Other spellings accepted in `output.format`
+FORMAT_ALIASES = {"markdown": "md", "htm": "html", "xhtml": "html"}
+
+
+def output_formats(output: dict) -> List[str]:
+    """
+    Formats selected by `output.format`: a name, a comma-separated string or a list.
+
+    PDF, when selected, comes first so it can be started before the cheap formats.
+    """
+    value: Union[str, list] = output.get('format', 'pdf') or 'pdf'
+    names = value.split(",") if isinstance(value, str) else value
+
+    formats = []
+    for name in names:
+        name = str(name).strip().lower().lstrip(".")
+        name = FORMAT_ALIASES.get(name, name)
+        if not name:
+            continue
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown output format '{name}'; available: {sorted(BACKENDS)}")
+        if name not in formats:
+            formats.append(name)
+
+    return sorted(formats, key=lambda name: name != "pdf") or ["pdf"]
+
+
+def notes_css(output: dict) -> str:
+    """Stylesheet for the HTML and EPUB pages, in the heading colours of the PDF theme"""
+    theme = output.get('theme', 'default')
+    if theme not in THEMES:
+        raise ValueError(f"Unknown output theme '{theme}'; available: {sorted(THEMES)}")
+    colors = THEMES[theme]
+    font_size = output.get('font_size', 11)
+
+    return f"""body {{ font-family: Helvetica, Arial, sans-serif; font-size: {font_size}pt; line-height: 1.45;
+       max-width: 46em; margin: 2em auto; padding: 0 1em; color: #222; }}
+h1 {{ color: {colors['title']}; text-align: center; }}
+h2 {{ color: {colors['heading1']}; }}
+h3, h4, h5, h6 {{ color: {colors['heading2']}; }}
+.meta {{ color: {colors['heading2']}; }}
+blockquote {{ margin-left: 1.5em; font-style: italic; color: {colors['heading2']}; }}
+pre {{ background: #F4F6F6; padding: 0.5em; overflow-x: auto; }}
+code {{ font-family: Courier, monospace; }}
+table {{ border-collapse: collapse; margin: 0.5em 0; }}
+th, td {{ border: 1px solid #BDC3C7; padding: 0.25em 0.5em; vertical-align: top; }}
+th {{ background: #ECF0F1; }}
+hr {{ border: none; border-top: 1px solid #BDC3C7; }}
+"""
+
+
+def notes_xhtml(output: dict, student_name: str, grade: int, notes: str, subject: str, chapter: str,
+                stylesheet: str) -> str:
+    """XHTML page of a chapter's notes with the same header block as the PDF"""
+    body = "\n".join(HtmlCompiler().compile(notes))
+    generated = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" lang="en">
+<head>
+<meta charset="utf-8"/>
+<title>{escape(f"{subject} - {chapter}")}</title>
+{stylesheet}
+</head>
+<body>
+<header>
+<h1>NCERT Study Notes</h1>
+<h2>{escape(subject)}</h2>
+<h3>{escape(chapter)}</h3>
+<p class="meta"><b>Prepared for:</b> {escape(student_name)} (Grade {grade})<br/><b>Generated on:</b> {generated}</p>
+</header>
+<main>
+{body}
+</main>
+</body>
+</html>
+"""
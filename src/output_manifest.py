@@ -0,0 +1,141 @@
+"""
+Output Manifest Module - Content-derived output names and a record of what produced each notes file
+"""
+
+import contextlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialised
+    fcntl = None
+
+from cache import file_hash, make_key
+from utils import log_progress
+
+
+# Hex digits of the output key used in file names
+OUTPUT_KEY_LENGTH = 16
+
+
+def output_key(source_sha256: str, provenance: dict) -> str:
+    """Output key of a chapter: its source PDF's content hash plus the prompt and model settings"""
+    return make_key(source_sha256, provenance)[:OUTPUT_KEY_LENGTH]
+
+
+class OutputManifest:
+    """
+    ``manifest.json`` in the notes directory: for every chapter, the output key
+    and the provenance (source PDF hash, prompt version, model settings) that
+    produced its files, plus the files themselves.
+
+    Output files are named after the key, so a chapter whose source and
+    settings are unchanged always maps to the same names. ``up_to_date`` tells
+    whether a chapter already has every requested format for a key, and
+    ``record`` deletes the files of the version it replaces, so the notes
+    directory holds one current version per chapter. Entries are written
+    through a temporary file and an atomic rename after every chapter.
+    Reading, merging and replacing the file happen under an exclusive lock
+    on ``manifest.json.lock``, so shards of a run sharing the notes directory
+    keep each other's chapters.
+    """
+
+    filename = "manifest.json"
+
+    def __init__(self, notes_dir, incremental: bool = True):
+        self.root = Path(notes_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path = self.root / self.filename
+        self.lock_path = self.root / f"{self.filename}.lock"
+        self.incremental = incremental
+        self._lock = threading.Lock()
+        # The file is only ever swapped in whole, so reading needs no lock
+        self.entries: Dict[str, dict] = self._load()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "OutputManifest":
+        """Manifest of `output.notes_dir`; `output.incremental` (off with --refresh) enables skipping"""
+        output = config['output']
+        incremental = output.get('incremental', True) and not config.get('cache', {}).get('refresh', False)
+        return cls(output['notes_dir'], incremental=incremental)
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('chapters', {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError) as e:
+            log_progress(f"Ignoring unreadable output manifest {self.path}: {str(e)}", "warning")
+            return {}
+
+    @staticmethod
+    def chapter_id(grade: int, subject: str, chapter: str) -> str:
+        return f"{grade}/{subject}/{chapter}"
+
+    def source_hash(self, pdf_path) -> str:
+        return file_hash(pdf_path)
+
+    def up_to_date(self, chapter_id: str, key: str, formats: List[str]) -> bool:
+        """Whether the chapter's recorded outputs come from ``key`` and cover every format on disk"""
+        with self._lock:
+            entry = self.entries.get(chapter_id)
+        if not entry or entry.get('key') != key:
+            return False
+        files = entry.get('files', {})
+        return all(name in files and (self.root / files[name]).is_file() for name in formats)
+
+    def record(self, chapter_id: str, key: str, provenance: dict, files: Dict[str, Path]):
+        """Record the chapter's files for ``key`` and delete those of the version they replace"""
+        relative = {name: Path(path).resolve().relative_to(self.root.resolve()).as_posix()
+                    for name, path in files.items()}
+
+        with self._lock, self._file_lock():
+            # Start from the file as other processes left it
+            self.entries = self._load()
+            previous = self.entries.get(chapter_id, {})
+            if previous.get('key') == key:
+                # Same version: keep formats written by earlier runs alongside the new ones
+                relative = {**previous.get('files', {}), **relative}
+            else:
+                for name in set(previous.get('files', {}).values()) - set(relative.values()):
+                    try:
+                        (self.root / name).unlink()
+                    except OSError:
+                        pass
+
+            self.entries[chapter_id] = {
+                "key": key,
+                **provenance,
+                "files": relative,
+                "written": datetime.now().isoformat(timespec='seconds'),
+            }
+            self._save()
+
+    def lookup(self, chapter_id: str) -> Optional[dict]:
+        with self._lock:
+            return self.entries.get(chapter_id)
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with every process using this notes directory"""
+        with open(self.lock_path, 'a') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save(self):
+        """Replace the file with ``entries``; callers hold the file lock"""
+        partial = self.path.with_suffix(f".json.{os.getpid()}.tmp")
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "chapters": self.entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        partial.replace(self.path)
@@ -3,13 +3,32 @@
 PDF Processor Module - Handles PDF download and text extraction
 """
 
-import requests
+import asyncio
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import PyPDF2
 import pdfplumber
 from bs4 import BeautifulSoup
-import utils,traceback
+import utils
+from cache import TextCache
+from catalogue import canonical_filename
+from downloader import PDFDownloader
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """Process-pool worker: extract text from pages [start, end) of a PDF with pdfplumber"""
+    text_content = []
+    
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages[start:end]:
+            text = page.extract_text()
+            if text:
+                text_content.append(text)
+    
+    return text_content
 
 
 class PDFProcessor:
@@ -19,90 +38,124 @@ class PDFProcessor:
         self.config = config
         self.downloads_dir = Path(config['output']['downloads_dir'])
         self.downloads_dir.mkdir(parents=True, exist_ok=True)
-        self.subjects_data = utils.load_subjects_data()
-        #self.session = requests.Session()
+        self.grade = config.get('grade') or utils.load_config()['grade']
+        self.catalogue = utils.get_catalogue()
+        self.downloader = PDFDownloader(config)
+        self.text_cache = TextCache.from_config(config)
+        if self.text_cache:
+            self.text_cache.evict()
+        self._extract_pool = None
+    
+    def close(self):
+        """Release pooled HTTP connections and the page-extraction process pool"""
+        self.downloader.close()
+        if self._extract_pool:
+            self._extract_pool.shutdown(wait=True)
+            self._extract_pool = None
     
-    def download_chapter(self, subject: str, chapter: str) -> Path:
+    def grade_dir(self, grade: Optional[int] = None) -> Path:
+        """Downloads directory for a grade (other grades than the configured one get a subdirectory)"""
+        if grade is None or grade == self.grade:
+            return self.downloads_dir
+        directory = self.downloads_dir / f"grade_{grade}"
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+    
+    def chapter_filepath(self, subject: str, chapter: str, grade: Optional[int] = None) -> Path:
+        """Local path where a chapter PDF is stored"""
+        entry = self.catalogue.get(grade or self.grade, subject, chapter)
+        filename = entry.filename if entry else canonical_filename(subject, chapter)
+        return self.grade_dir(grade) / filename
+    
+    def download_chapter(self, subject: str, chapter: str, grade: Optional[int] = None) -> Path:
         """
         Download chapter PDF from NCERT website
         """
-        # Sanitize filename
-        safe_subject = subject.replace(' ', '_').replace('/', '_')
-        safe_chapter = chapter.replace(' ', '_').replace('/', '_')
-        filename = f"{safe_subject}_{safe_chapter}.pdf"
-        filepath = self.downloads_dir / filename
-        
-        # If file already exists and has content, return it
-        if filepath.exists() and filepath.stat().st_size > 1000:
+        filepath = self.chapter_filepath(subject, chapter, grade)
+        pdf_url = self._get_chapter_url(subject, chapter, grade)
+        have_file = self.downloader.is_valid_pdf(filepath)
+        
+        # If a complete PDF already exists, return it unless it can be revalidated cheaply
+        if have_file and not (pdf_url and self.downloader.can_revalidate(pdf_url, filepath)):
             print(f"      Using existing file: {filepath}")
             return filepath
         
-        # Try to download from NCERT
-        print (f"file not found {filepath}")
-        for attempts in range(3):
+        if not pdf_url:
+            print(f"      No URL known for {subject} - {chapter}")
+            return filepath
+        
+        # Try to download from NCERT, resuming partial transfers between attempts
+        for attempts in range(self.downloader.retries):
+            if attempts:
+                time.sleep(self.downloader.backoff_delay(attempts - 1))
             try:
-                pdf_url = self._get_chapter_url(subject, chapter)
+                print(f"      Downloading from: {pdf_url}")
+                written = self.downloader.fetch(pdf_url, filepath)
                 
-                if pdf_url:
-                    print(f"      Downloading from: {pdf_url}")
-                    response = requests.get(pdf_url, timeout=300, stream=False)
-                    
-                    if response.status_code == 200:
-                        # Save the PDF
-                        with open(filepath, 'wb') as f:
-                            for chunk in response.iter_content(chunk_size=8192):
-                                if chunk:
-                                    f.write(chunk)
-                        
-                        # Verify download
-                        if filepath.stat().st_size > 1000:
-                            print(f"      Successfully downloaded: {filepath.stat().st_size} bytes")
-                            return filepath
-                        else:
-                            print(f"      Download failed: file too small attempts {attempts}")
-                    else:
-                        print(f"      HTTP Error: {response.status_code} attempts {attempts}")
+                if written:
+                    print(f"      Successfully downloaded: {written} bytes")
+                else:
+                    print(f"      Using existing file (not modified): {filepath}")
+                return filepath
             
             except Exception as e:
                 print(f"      Download error: {str(e)} attempts {attempts}")
-                traceback.print_exc()
-                #raise e
         
-        # If download failed, create placeholder
-        # if not filepath.exists() or filepath.stat().st_size < 1000:
-        #     print(f"      Creating placeholder file (download failed)")
-        #     filepath.touch()
+        if have_file:
+            print(f"      Revalidation failed, using existing file: {filepath}")
+        
+        return filepath
+    
+    async def adownload_chapter(self, subject: str, chapter: str, session, grade: Optional[int] = None) -> Path:
+        """
+        Download chapter PDF from NCERT website using a shared aiohttp session
+        """
+        filepath = self.chapter_filepath(subject, chapter, grade)
+        pdf_url = self._get_chapter_url(subject, chapter, grade)
+        have_file = self.downloader.is_valid_pdf(filepath)
+        
+        # If a complete PDF already exists, return it unless it can be revalidated cheaply
+        if have_file and not (pdf_url and self.downloader.can_revalidate(pdf_url, filepath)):
+            print(f"      Using existing file: {filepath}")
+            return filepath
+        
+        if not pdf_url:
+            return filepath
+        
+        for attempts in range(self.downloader.retries):
+            if attempts:
+                await asyncio.sleep(self.downloader.backoff_delay(attempts - 1))
+            try:
+                print(f"      Downloading from: {pdf_url}")
+                headers = self.downloader.request_headers(pdf_url, filepath)
+                
+                async with session.get(pdf_url, headers=headers) as response:
+                    if response.status == 304:
+                        print(f"      Using existing file (not modified): {filepath}")
+                        return filepath
+                    if response.status == 416:
+                        size = self.downloader.complete(pdf_url, filepath, response.headers)
+                    elif response.status in (200, 206):
+                        f, total = self.downloader.open_part(pdf_url, filepath, response.status, response.headers)
+                        with f:
+                            async for chunk in response.content.iter_chunked(self.downloader.chunk_size):
+                                f.write(chunk)
+                        size = self.downloader.complete(pdf_url, filepath, response.headers, total)
+                    else:
+                        print(f"      HTTP Error: {response.status} attempts {attempts}")
+                        continue
+                
+                print(f"      Successfully downloaded: {size} bytes")
+                return filepath
+            
+            except Exception as e:
+                print(f"      Download error: {str(e) or type(e).__name__} attempts {attempts}")
         
         return filepath
 
-    def _get_chapter_url(self, subject: str, chapter: str) -> Optional[str]:
+    def _get_chapter_url(self, subject: str, chapter: str, grade: Optional[int] = None) -> Optional[str]:
         """Get the PDF URL for a specific chapter"""
-        
-        chapter_num = self.subjects_data[subject]["chapters"].get(chapter)
-        if chapter_num:
-            return self.subjects_data[subject]["base_url"].format(chapter_num)
-        
-        # # Handle Science
-        # elif subject == "Science":
-        #     chapter_num = self.NCERT_PDF_URLS["Science"]["chapters"].get(chapter)
-        #     if chapter_num:
-        #         return self.NCERT_PDF_URLS["Science"]["base_url"].format(chapter_num)
-        
-        # # Handle Social Science (multiple books)
-        # elif subject == "Social_Science":
-        #     for book_name, book_data in self.NCERT_PDF_URLS["Social_Science"].items():
-        #         if chapter in book_data["chapters"]:
-        #             chapter_num = book_data["chapters"][chapter]
-        #             return book_data["base_url"].format(chapter_num)
-        
-        # # Handle English (multiple books)
-        # elif subject == "English":
-        #     for book_name, book_data in self.NCERT_PDF_URLS["English"].items():
-        #         if chapter in book_data["chapters"]:
-        #             chapter_num = book_data["chapters"][chapter]
-        #             return book_data["base_url"].format(chapter_num)
-        
-        return None
+        return self.catalogue.url(grade or self.grade, subject, chapter)
     
     def extract_text(self, pdf_path: str) -> str:
         """
@@ -114,27 +167,52 @@ class PDFProcessor:
             # Return sample content for demo
             return self._get_sample_content()
         
-        # Try pdfplumber first (better for complex layouts)
-        try:
-            return self._extract_with_pdfplumber(pdf_path)
-        except Exception:
-            pass
+        cache_key = None
+        if self.text_cache:
+            cache_key = self.text_cache.key_for(pdf_path, self._extractor_id(), self._extraction_settings())
+            cached = self.text_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
-        # Fallback to PyPDF2
-        try:
-            return self._extract_with_pypdf2(pdf_path)
-        except Exception:
-            pass
+        # Try pdfplumber first (better for complex layouts), then fall back to PyPDF2
+        for extractor, extract in (("pdfplumber", self._extract_with_pdfplumber),
+                                   ("pypdf2", self._extract_with_pypdf2)):
+            try:
+                text = extract(pdf_path)
+            except Exception:
+                continue
+            
+            if self.text_cache:
+                self.text_cache.set(cache_key, text, {
+                    "source": pdf_path.name,
+                    "extractor": extractor,
+                    "settings": self._extraction_settings(),
+                })
+            return text
         
         # Return sample content if extraction fails
         return self._get_sample_content()
     
+    def _extractor_id(self) -> str:
+        """Identity of the extractor chain, so library upgrades invalidate cached text"""
+        return f"pdfplumber-{pdfplumber.__version__}|pypdf2-{PyPDF2.__version__}"
+    
+    def _extraction_settings(self) -> dict:
+        """Settings that change the extracted text"""
+        return {"max_pages_per_chapter": self.config['pdf'].get('max_pages_per_chapter', 50)}
+    
     def _extract_with_pdfplumber(self, pdf_path: Path) -> str:
         """Extract text using pdfplumber"""
         text_content = []
         
         with pdfplumber.open(pdf_path) as pdf:
             max_pages = self.config['pdf'].get('max_pages_per_chapter', 50)
+            page_count = min(len(pdf.pages), max_pages)
+            workers = self.config['pdf'].get('parallel_workers', 0)
+            pages_per_chunk = max(1, self.config['pdf'].get('pages_per_chunk', 4))
+            
+            if workers > 1 and page_count > pages_per_chunk:
+                return self._extract_with_pdfplumber_parallel(pdf_path, page_count, pages_per_chunk)
             
             for i, page in enumerate(pdf.pages):
                 if i >= max_pages:
@@ -146,6 +224,26 @@ class PDFProcessor:
         
         return "\\n\\n".join(text_content)
     
+    def _extract_with_pdfplumber_parallel(self, pdf_path: Path, page_count: int, pages_per_chunk: int) -> str:
+        """Extract page ranges across the process pool and reassemble them in page order"""
+        if self._extract_pool is None:
+            # Spawned workers are safe to start from the pipeline's threads
+            self._extract_pool = ProcessPoolExecutor(
+                max_workers=self.config['pdf']['parallel_workers'],
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        
+        futures = [
+            self._extract_pool.submit(_extract_page_range, str(pdf_path), start, min(start + pages_per_chunk, page_count))
+            for start in range(0, page_count, pages_per_chunk)
+        ]
+        
+        text_content = []
+        for future in futures:
+            text_content.extend(future.result())
+        
+        return "\\n\\n".join(text_content)
+    
     def _extract_with_pypdf2(self, pdf_path: Path) -> str:
         """Extract text using PyPDF2"""
         text_content = []
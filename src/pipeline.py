@@ -0,0 +1,101 @@
+"""
+Pipeline Module - Concurrent chapter pipeline with bounded worker pools per stage
+"""
+
+import itertools
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Default number of workers for each stage, keyed by its `concurrency` config setting
+DEFAULT_STAGE_WORKERS = {
+    "download_workers": 4,
+    "extract_workers": 2,
+    "generate_workers": 4,
+    "render_workers": 2,
+}
+
+
+class ChapterPipeline:
+    """
+    Runs chapter states through a fixed sequence of stages.
+
+    Every stage owns its own thread pool, so a chapter can be downloading
+    while another is being extracted and a third is waiting on Gemini.
+    Throughput is bounded by the slowest stage instead of the sum of all
+    stage latencies.
+
+    If ``stop(state)`` is true after a stage, the chapter skips the remaining
+    stages and completes immediately instead of occupying their workers.
+
+    At most ``max_in_flight`` chapters (by default twice the largest stage's
+    worker count) are inside the pipeline at once; the next chapter enters
+    the first stage only when one completes, so downloaded PDFs and extracted
+    text never pile up in front of a slow stage.
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[dict], dict], int]],
+                 stop: Optional[Callable[[dict], bool]] = None, max_in_flight: Optional[int] = None):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.stop = stop
+        self.max_in_flight = max(1, max_in_flight or 2 * max(max(1, workers) for _, _, workers in stages))
+
+    def run(self, states: List[dict],
+            on_complete: Optional[Callable[[int, dict, Optional[Exception]], None]] = None) -> List[dict]:
+        """
+        Push every state through all stages and return the final states in input order.
+
+        ``on_complete(index, state, exception)`` is called from the calling thread
+        as soon as a chapter leaves the last stage or raises.
+        """
+        results: List[Optional[dict]] = [None] * len(states)
+        executors: Dict[str, ThreadPoolExecutor] = {
+            name: ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix=name)
+            for name, _, workers in self.stages
+        }
+        pending = {}
+        waiting = iter(enumerate(states))
+
+        def submit(index: int, stage_index: int, state: dict):
+            name, func, _ = self.stages[stage_index]
+            future = executors[name].submit(func, state)
+            pending[future] = (index, stage_index, state)
+
+        def admit(count: int):
+            for index, state in itertools.islice(waiting, count):
+                submit(index, 0, state)
+
+        def complete(index: int, state: dict, exc: Optional[Exception]):
+            results[index] = state
+            if on_complete:
+                on_complete(index, state, exc)
+            admit(1)
+
+        try:
+            admit(self.max_in_flight)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index, stage_index, state = pending.pop(future)
+
+                    try:
+                        state = future.result()
+                    except Exception as e:
+                        complete(index, state, e)
+                        continue
+
+                    if stage_index + 1 < len(self.stages) and not (self.stop and self.stop(state)):
+                        submit(index, stage_index + 1, state)
+                    else:
+                        complete(index, state, None)
+        finally:
+            for future in pending:
+                future.cancel()
+            for executor in executors.values():
+                executor.shutdown(wait=True)
+
+        return results
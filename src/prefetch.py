@@ -0,0 +1,86 @@
+"""
+Prefetch Module - Bulk, parallel download of every chapter PDF ahead of a generation run
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+from colorama import Fore
+
+from catalogue import ChapterCatalogue
+from pdf_processor import PDFProcessor
+from utils import log_progress
+
+
+def list_chapters(catalogue: ChapterCatalogue, grades: Iterable[int]) -> List[Tuple[int, str, str]]:
+    """Every (grade, subject, chapter) of the given grades that has a downloadable URL"""
+    return [
+        (entry.grade, entry.subject, entry.name)
+        for grade in grades
+        for entry in catalogue.chapters(grade) if entry.url
+    ]
+
+
+def prefetch_chapters(config: dict, workers: int = None, grades: Optional[List[int]] = None) -> Dict[str, float]:
+    """
+    Download every chapter of the configured grade (or of ``grades``) in parallel.
+
+    Files that are already complete PDFs are skipped without touching the
+    network. Requests go through the downloader's shared connection pool and
+    host-level rate limiter, so raising ``workers`` never floods the server.
+    """
+    processor = PDFProcessor(config)
+    tasks = list_chapters(processor.catalogue, grades or [processor.grade])
+    workers = workers or config.get('concurrency', {}).get('download_workers', 4)
+    report = {"total": len(tasks), "downloaded": 0, "skipped": 0, "failed": 0, "bytes": 0, "seconds": 0.0}
+
+    def fetch(grade: int, subject: str, chapter: str) -> Tuple[str, int]:
+        filepath = processor.chapter_filepath(subject, chapter, grade)
+        if processor.downloader.is_valid_pdf(filepath):
+            return "skipped", 0
+
+        filepath = processor.download_chapter(subject, chapter, grade)
+        if processor.downloader.is_valid_pdf(filepath):
+            return "downloaded", filepath.stat().st_size
+        return "failed", 0
+
+    print(f"{Fore.CYAN}📥 Prefetching {len(tasks)} chapters with {workers} workers")
+    start = time.monotonic()
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch") as pool:
+            futures = {pool.submit(fetch, *task): task for task in tasks}
+
+            for future in as_completed(futures):
+                grade, subject, chapter = futures[future]
+                try:
+                    outcome, size = future.result()
+                except Exception as e:
+                    outcome, size = "failed", 0
+                    log_progress(f"Failed: {subject} - {chapter}: {str(e)}", "error")
+                else:
+                    if outcome == "failed":
+                        log_progress(f"Failed: {subject} - {chapter}", "error")
+
+                report[outcome] += 1
+                report["bytes"] += size
+    finally:
+        processor.close()
+
+    report["seconds"] = time.monotonic() - start
+    return report
+
+
+def print_prefetch_report(report: Dict[str, float]):
+    """Print the throughput summary of a prefetch run"""
+    seconds = max(report["seconds"], 1e-6)
+    megabytes = report["bytes"] / (1024 * 1024)
+
+    print(f"\n{Fore.CYAN}{'='*70}")
+    print(f"{Fore.GREEN}📥 Downloaded: {report['downloaded']}/{report['total']} "
+          f"({megabytes:.1f} MB in {report['seconds']:.1f}s)")
+    print(f"{Fore.WHITE}⏭️  Already valid: {report['skipped']}")
+    if report["failed"]:
+        print(f"{Fore.RED}❌ Failed: {report['failed']}")
+    print(f"{Fore.WHITE}⚡ Throughput: {report['downloaded'] / seconds:.2f} files/s, {megabytes / seconds:.2f} MB/s")
+    print(f"{Fore.CYAN}{'='*70}")
@@ -0,0 +1,192 @@
+"""
+Prompts Module - Notes prompt templates compiled once from the `notes:` config
+"""
+
+from typing import Callable, List, Optional, Tuple
+
+from cache import make_key
+from chunking import estimate_tokens
+
+
+# Notes sections in output order: (name, `notes:` flag that enables it or None, template)
+SECTIONS: List[Tuple[str, Optional[str], str]] = [
+    ("overview", None, """# 📚 [Chapter name]
+
+## 🎯 Chapter Overview
+(2-3 sentences summarizing what this chapter is about)"""),
+    ("key_concepts", None, """## 🔑 Key Concepts
+
+### Concept 1: [Name]
+- Clear definition and explanation
+- Why it's important
+- Real-world applications
+
+### Concept 2: [Name]
+(Continue for all major concepts)"""),
+    ("important_points", None, """## 💡 Important Points to Remember
+- Point 1: Detailed explanation
+- Point 2: Detailed explanation
+(5-8 critical points)"""),
+    ("mnemonics", "include_mnemonics", """## 🧠 Memory Tricks & Mnemonics
+
+### Trick 1: [Topic]
+**Mnemonic**: [Clever acronym or phrase]
+**Explanation**: How to use this mnemonic
+
+(Provide 3-5 memory tricks)"""),
+    ("quick_revision", None, """## ⚡ Quick Revision Points
+• One-liner 1
+• One-liner 2
+(10-15 quick points for last-minute revision)"""),
+    ("common_mistakes", None, """## ⚠️ Common Mistakes to Avoid
+1. **Mistake**: [What students often get wrong]
+   **Why it's wrong**: [Explanation]
+   **Correct approach**: [How to do it right]
+
+(3-5 common mistakes)"""),
+    ("exam_tips", "include_exam_tips", """## 🎓 Exam Strategy & Tips
+
+### Question Patterns
+- Pattern 1: [Type of questions asked]
+- Pattern 2: [Type of questions asked]
+
+### Answer Writing Tips
+- Tip 1: [How to structure answers]
+- Tip 2: [Key words to include]
+
+### Time Management
+- Suggested time allocation for different question types"""),
+    ("practice_questions", "include_practice_questions", """## 📝 Practice Questions
+({short_count} short and {long_count} long answer questions, plus numerical ones where the chapter has any)
+
+### Short Answer Questions (2-3 marks)
+1. Question with [Hint: key concept to use]
+
+### Long Answer Questions (5 marks)
+1. Question with [Hint: approach to take]
+
+### Numerical/Application Questions (if applicable)
+1. Question with [Hint: formula or method]"""),
+    ("topic_connections", None, """## 🔗 Topic Connections
+- How this chapter connects to other chapters
+- Real-world relevance"""),
+]
+
+CHAPTER_PROMPT = "Subject: {subject}\nChapter: {chapter}\n\nOriginal Content:\n{content}"
+
+# Wording for the `notes.difficulty_level` setting; other values are used as given
+DIFFICULTY_GUIDANCE = {
+    "basic": "Keep explanations short and concrete, and avoid jargon",
+    "high_school": "Use simple language suitable for a {grade}th grader",
+    "advanced": "Go beyond the textbook where it helps, including derivations and competitive-exam depth",
+}
+
+INSTRUCTION_HEAD = """You are an expert educator creating study notes for a {grade}th-grade student named {student_name}.
+
+You will be given the subject, the chapter name and the original content of one NCERT chapter. Create comprehensive, high-quality study notes that will help {student_name} score excellent marks. Structure your notes as follows:"""
+
+INSTRUCTION_TAIL = """---
+
+Make the notes engaging, clear, and focused on exam success. {difficulty}. Directly start with notes don't add prefix tax"""
+
+MAP_PROMPT = """You are condensing part {index} of {total} of the {grade}th-grade NCERT {subject} chapter "{chapter}". The condensed parts will be combined to write complete study notes, so nothing important may be lost.
+
+Extract, as compact markdown bullet points grouped under the section headings that appear in this part:
+- every concept and definition, with a one-line explanation
+- formulas, laws, dates, names and numerical facts exactly as written
+- solved examples and activities (the problem and its key steps)
+- exercise and in-text questions
+
+Do not add information that is not in the text and do not write an introduction.
+
+Part {index} of {total}:
+"""
+
+
+def _segments(template: str, fields: Tuple[str, ...]) -> Callable[..., str]:
+    """
+    Split a template at its per-call ``fields`` into static segments once, and
+    return a function that joins the segments with the given values.
+    """
+    parts = [template]
+    order = []
+    while True:
+        positions = [(parts[-1].find("{" + field + "}"), field) for field in fields]
+        positions = [(pos, field) for pos, field in positions if pos >= 0]
+        if not positions:
+            break
+        pos, field = min(positions)
+        tail = parts.pop()
+        parts.extend([tail[:pos], tail[pos + len(field) + 2:]])
+        order.append(field)
+
+    def render(**values) -> str:
+        pieces = [parts[0]]
+        for field, static in zip(order, parts[1:]):
+            pieces.append(values[field])
+            pieces.append(static)
+        return "".join(pieces)
+
+    return render
+
+
+class NotesPrompts:
+    """
+    Prompt templates for one grade, compiled once per run.
+
+    The enabled sections and the grade/student fields are rendered into the
+    system instruction up front; per-chapter prompts only join precomputed
+    static segments with the chapter's subject, name and text. Disabled
+    sections are left out of the instruction altogether, so the model neither
+    reads nor writes them.
+    """
+
+    def __init__(self, grade: int = 10, student_name: str = "Student", notes: Optional[dict] = None,
+                 chars_per_token: float = 4.0):
+        notes = notes or {}
+        self.grade = grade
+        self.chars_per_token = chars_per_token
+
+        count = max(1, int(notes.get('practice_questions_count', 5)))
+        long_count = max(1, count // 3) if count > 1 else 0
+        fields = {"grade": grade, "student_name": student_name,
+                  "short_count": count - long_count, "long_count": long_count}
+
+        self.sections = [name for name, flag, _ in SECTIONS if flag is None or notes.get(flag, True)]
+        level = notes.get('difficulty_level', 'high_school')
+        difficulty = DIFFICULTY_GUIDANCE.get(level, f"Pitch the notes at {str(level).replace('_', ' ')} level")
+
+        self.instruction = "\n\n".join(
+            [INSTRUCTION_HEAD.format(**fields)]
+            + [template.format(**fields) for name, _, template in SECTIONS if name in self.sections]
+            + [INSTRUCTION_TAIL.format(difficulty=difficulty.format(**fields))]
+        )
+        self.instruction_tokens = estimate_tokens(self.instruction, chars_per_token)
+        # Changes whenever any prompt text the model sees changes
+        self.version = make_key(self.instruction, CHAPTER_PROMPT, MAP_PROMPT, grade)[:12]
+
+        self._chapter = _segments(CHAPTER_PROMPT, ("subject", "chapter", "content"))
+        self._map = _segments(MAP_PROMPT.replace("{grade}", str(grade)) + "{chunk}",
+                              ("index", "total", "subject", "chapter", "chunk"))
+
+    @classmethod
+    def from_config(cls, config: dict) -> "NotesPrompts":
+        notes = config.get('notes', {})
+        return cls(
+            grade=config.get('grade', 10),
+            student_name=config.get('student_name', 'Student'),
+            notes=notes,
+            chars_per_token=notes.get('chunking', {}).get('chars_per_token', 4.0),
+        )
+
+    def chapter_prompt(self, content: str, subject: str, chapter: str) -> str:
+        """Per-chapter user turn; the notes template itself is ``instruction``"""
+        return self._chapter(subject=subject, chapter=chapter, content=content)
+
+    def map_prompt(self, chunk: str, index: int, total: int, subject: str, chapter: str) -> str:
+        """Prompt that condenses one chunk of a long chapter"""
+        return self._map(index=str(index), total=str(total), subject=subject, chapter=chapter, chunk=chunk)
+
+    def prompt_tokens(self, prompt: str) -> int:
+        """Estimated input tokens of a notes request: the instruction plus the chapter prompt"""
+        return self.instruction_tokens + estimate_tokens(prompt, self.chars_per_token)
@@ -0,0 +1,267 @@
+"""
+Rate Limit Module - Shared, quota-aware throttling and retry for Gemini calls
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+from chunking import estimate_tokens
+from utils import log_progress
+
+
+# HTTP statuses worth retrying: quota (429) and transient server errors
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RATE_LIMIT_MARKERS = ("RESOURCE_EXHAUSTED", "Resource exhausted", "Quota exceeded", "rate limit")
+# A bare "429" also turns up in token counts, sizes and ids, so only a status line counts
+RATE_LIMIT_STATUS_PATTERN = re.compile(r"\b429\b\W*(?:Too Many Requests|Resource|Quota)", re.IGNORECASE)
+TRANSIENT_MARKERS = ("503", "UNAVAILABLE", "500 Internal", "DEADLINE_EXCEEDED", "Deadline Exceeded")
+RETRY_HINT_PATTERN = re.compile(r"retry\w*\W{0,8}(?:in\s+)?(\d+(?:\.\d+)?)\s*s\b", re.IGNORECASE)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate_per_minute`` holding at most ``burst_seconds`` worth of tokens.
+
+    ``reserve`` books tokens immediately and returns how long the caller has
+    to wait before using them, so the bucket can go into debt: concurrent
+    callers queue up behind each other instead of racing, and a request larger
+    than the bucket is still served once its share of the rate has accrued.
+    """
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 10.0):
+        self.base_rate = rate_per_minute / 60.0
+        self.rate = self.base_rate
+        self.capacity = max(1.0, self.base_rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = None
+
+    def _refill(self, now: float):
+        if self.updated is None:
+            self.updated = now
+        elif now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` tokens and return the seconds until they are actually available"""
+        self._refill(now)
+        self.tokens -= amount
+        return max(0.0, -self.tokens / self.rate)
+
+    def charge(self, amount: float, now: float):
+        """Debit tokens after the fact (e.g. output tokens known only once a response arrives)"""
+        self._refill(now)
+        self.tokens -= amount
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Whether an exception is a 429 / RESOURCE_EXHAUSTED quota error"""
+    if _status_code(error) == 429 or type(error).__name__ == "ResourceExhausted":
+        return True
+    message = str(error)
+    return any(marker in message for marker in RATE_LIMIT_MARKERS) or bool(RATE_LIMIT_STATUS_PATTERN.search(message))
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an exception is worth retrying (quota or transient server error)"""
+    if _status_code(error) in RETRYABLE_STATUS or is_rate_limited(error):
+        return True
+    message = str(error)
+    return any(marker in message for marker in TRANSIENT_MARKERS)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status of google.api_core / HTTP client exceptions, when they carry one"""
+    code = getattr(error, 'code', None)
+    if callable(code):
+        return None
+    try:
+        return int(code) if code is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Server-suggested wait in seconds: a google.rpc.RetryInfo detail, a
+    Retry-After header or a "retry in 12s" / "retryDelay": "12s" message.
+    """
+    for detail in getattr(error, 'details', None) or []:
+        delay = getattr(detail, 'retry_delay', None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        if headers.get('Retry-After'):
+            return float(headers['Retry-After'])
+    except (TypeError, ValueError):
+        pass
+
+    match = RETRY_HINT_PATTERN.search(str(error))
+    return float(match.group(1)) if match else None
+
+
+class GeminiRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits shared by every worker.
+
+    Each call reserves one request and the prompt's estimated tokens before it
+    is sent, and the generated tokens are charged when the response arrives.
+    A 429 halves the effective rate (never below ``min_rate_fraction``) and
+    pauses all workers for the server's retry hint. Every success then
+    restores a small step of the rate, so throughput settles just under the
+    real quota instead of bursting into failures. Retryable errors are retried
+    with exponential backoff and full jitter, never sooner than the server asked.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 burst_seconds: float = 10.0, max_retries: int = 5, backoff_base: float = 2.0,
+                 backoff_max: float = 60.0, min_rate_fraction: float = 0.1, recovery_step: float = 0.05):
+        self.requests = TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.min_rate_fraction = min_rate_fraction
+        self.recovery_step = recovery_step
+        self.rate_fraction = 1.0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.rate_limited = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "GeminiRateLimiter":
+        """Build the limiter from the `google:` config section (a 0 limit disables it)"""
+        google = config.get('google', {})
+        return cls(
+            requests_per_minute=google.get('requests_per_minute', 0),
+            tokens_per_minute=google.get('tokens_per_minute', 0),
+            burst_seconds=google.get('burst_seconds', 10.0),
+            max_retries=google.get('max_retries', 5),
+            backoff_base=google.get('retry_backoff_base', 2.0),
+            backoff_max=google.get('retry_backoff_max', 60.0),
+        )
+
+    def reserve(self, tokens: int) -> float:
+        """Book one request and ``tokens`` prompt tokens, returning the wait before sending"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self.paused_until - now)
+            if self.requests:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            return wait
+
+    def charge(self, tokens: int):
+        """Count generated tokens against the tokens-per-minute budget"""
+        if self.tokens and tokens:
+            with self._lock:
+                self.tokens.charge(tokens, time.monotonic())
+
+    def on_success(self):
+        with self._lock:
+            if self.rate_fraction < 1.0:
+                self._set_rate_fraction(self.rate_fraction + self.recovery_step)
+
+    def on_rate_limited(self, hint: Optional[float]):
+        """Back off globally after a 429: pause every worker and lower the rate"""
+        with self._lock:
+            now = time.monotonic()
+            self.rate_limited += 1
+            self.paused_until = max(self.paused_until, now + (hint or self.backoff_base))
+            # Concurrent workers hitting the same burst count as one signal
+            if now - self.last_decrease >= 1.0:
+                self.last_decrease = now
+                self._set_rate_fraction(self.rate_fraction / 2)
+
+    def _set_rate_fraction(self, fraction: float):
+        self.rate_fraction = min(1.0, max(self.min_rate_fraction, fraction))
+        for bucket in (self.requests, self.tokens):
+            if bucket:
+                bucket._refill(time.monotonic())
+                bucket.rate = bucket.base_rate * self.rate_fraction
+
+    def backoff_delay(self, attempt: int, hint: Optional[float] = None) -> float:
+        """Exponential backoff with full jitter for retry ``attempt`` (0-based), at least ``hint``"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        return max(delay, hint or 0.0)
+
+    def _failed(self, error: Exception, attempt: int) -> Tuple[bool, float]:
+        """Record a failed attempt and return (retry?, seconds to wait)"""
+        if attempt >= self.max_retries or not is_retryable(error):
+            return False, 0.0
+
+        hint = retry_after(error)
+        if is_rate_limited(error):
+            self.on_rate_limited(hint)
+        with self._lock:
+            self.retries += 1
+        delay = self.backoff_delay(attempt, hint)
+        log_progress(f"Gemini busy ({str(error)[:80]}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s", "warning")
+        return True, delay
+
+    def call(self, send: Callable[[], object], prompt: str):
+        """Send a request through the limiter, retrying quota and transient errors"""
+        tokens = estimate_tokens(prompt)
+        attempt = 0
+        while True:
+            time.sleep(self.reserve(tokens))
+            try:
+                response = send()
+            except Exception as e:
+                retry, delay = self._failed(e, attempt)
+                if not retry:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+
+            self.on_success()
+            self.charge(response_tokens(response))
+            return response
+
+    async def acall(self, send: Callable[[], Awaitable[object]], prompt: str):
+        """Async variant of ``call``; waiting never blocks the event loop"""
+        tokens = estimate_tokens(prompt)
+        attempt = 0
+        while True:
+            await asyncio.sleep(self.reserve(tokens))
+            try:
+                response = await send()
+            except Exception as e:
+                retry, delay = self._failed(e, attempt)
+                if not retry:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            self.on_success()
+            self.charge(response_tokens(response))
+            return response
+
+    def stats(self) -> dict:
+        return {"rate_limited": self.rate_limited, "retries": self.retries,
+                "rate_fraction": round(self.rate_fraction, 2)}
+
+
+def response_tokens(response) -> int:
+    """Generated tokens of a response: usage metadata when present, else an estimate from its text"""
+    usage = getattr(response, 'usage_metadata', None)
+    count = getattr(usage, 'candidates_token_count', None)
+    if isinstance(count, int):
+        return count
+    try:
+        text = response.text
+    except (ValueError, AttributeError):
+        return 0
+    return estimate_tokens(text) if isinstance(text, str) else 0
@@ -0,0 +1,130 @@
+"""
+Render Pool Module - Notes PDF layout in a process pool, decoupled from generation
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, Spacer
+
+from markdown_compiler import MarkdownCompiler, escape
+from theme import get_document_factory
+
+
+def header_story(subject: str, chapter: str, student_name: str, grade: int, styles: dict) -> list:
+    """Title block and metadata at the top of every notes PDF"""
+    story = []
+
+    # Header
+    story.append(Paragraph("NCERT Study Notes", styles['title']))
+    story.append(Paragraph(escape(subject), styles['heading1']))
+    story.append(Paragraph(escape(chapter), styles['heading2']))
+    story.append(Spacer(1, 0.2*inch))
+
+    # Metadata
+    story.append(Paragraph(f"<b>Prepared for:</b> {escape(student_name)} (Grade {grade})", styles['body']))
+    story.append(Paragraph(f"<b>Generated on:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", styles['body']))
+    story.append(Spacer(1, 0.3*inch))
+
+    return story
+
+
+def render_notes_pdf(output: dict, student_name: str, grade: int, notes: str, subject: str, chapter: str,
+                     filepath: Path) -> float:
+    """
+    Lay out one chapter's notes into ``filepath`` and return the seconds it took.
+
+    Only plain values go in, so this runs the same in the calling thread and
+    in a render pool process, where the stylesheet and document factory are
+    built once per process.
+    """
+    started = time.perf_counter()
+    documents = get_document_factory(output)
+    story = header_story(subject, chapter, student_name, grade, documents.styles)
+    story.extend(MarkdownCompiler(documents.styles, documents.frame_width).compile(notes))
+    documents.build(filepath, story)
+    return time.perf_counter() - started
+
+
+class RenderPool:
+    """
+    Process pool that turns generated notes into PDFs.
+
+    ReportLab layout is CPU bound and holds the GIL, so on stage threads it
+    competes with the threads waiting on Gemini; here every chapter is laid
+    out in its own process. ``submit`` queues a ``(notes, subject, chapter)``
+    job and returns a future of the output path. At most ``max_pending``
+    jobs are queued or rendering at once: further submits block until one
+    finishes, so generation slows down instead of finished-but-unrendered
+    notes piling up in memory.
+    """
+
+    def __init__(self, processes: Optional[int] = None, max_pending: Optional[int] = None):
+        self.processes = processes or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.processes
+        # Spawned, not forked: the parent runs gRPC and worker threads that must not be copied
+        self.executor = ProcessPoolExecutor(max_workers=self.processes,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.rendered = 0
+        self.blocked_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["RenderPool"]:
+        """
+        Build the pool from `concurrency.render_processes` and `render_queue`,
+        or None when render_processes is 0 (render on the stage threads).
+        """
+        concurrency = config.get('concurrency', {})
+        processes = concurrency.get('render_processes')
+        if processes == 0:
+            return None
+        return cls(processes, concurrency.get('render_queue'))
+
+    def submit(self, output: dict, student_name: str, grade: int, notes: str, subject: str, chapter: str,
+               filepath: Path) -> "Future[float]":
+        """Queue one chapter, blocking while ``max_pending`` jobs are outstanding; the future yields render seconds"""
+        if not self._slots.acquire(blocking=False):
+            started = time.monotonic()
+            self._slots.acquire()
+            with self._lock:
+                self.blocked_seconds += time.monotonic() - started
+
+        with self._lock:
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+        try:
+            future = self.executor.submit(render_notes_pdf, output, student_name, grade, notes, subject,
+                                          chapter, filepath)
+        except Exception:
+            self._finished(None)
+            raise
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: Optional[Future]):
+        with self._lock:
+            self.pending -= 1
+            if future is not None and not future.cancelled() and future.exception() is None:
+                self.rendered += 1
+        self._slots.release()
+
+    def close(self):
+        """Wait for queued renders and stop the worker processes"""
+        self.executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"processes": self.processes, "rendered": self.rendered, "peak_queued": self.peak_pending,
+                    "generation_blocked_s": round(self.blocked_seconds, 2)}
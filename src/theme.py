@@ -0,0 +1,197 @@
+"""
+Theme Module - Process-wide ReportLab stylesheets and document factory for notes PDFs
+"""
+
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Tuple
+
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.pagesizes import A4, A5, legal, letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate
+
+
+PAGE_SIZES = {"A4": A4, "A5": A5, "LETTER": letter, "LEGAL": legal}
+
+# Heading colours per theme, selected with `output.theme`
+THEMES = {
+    "default": {"title": "#2C3E50", "heading1": "#34495E", "heading2": "#7F8C8D"},
+    "print": {"title": "#000000", "heading1": "#000000", "heading2": "#333333"},
+}
+
+# Margins in points (72 per inch)
+DEFAULT_MARGINS = {"left": 72, "right": 72, "top": 72, "bottom": 36}
+
+
+@lru_cache(maxsize=None)
+def get_stylesheet(theme: str = "default", font_size: float = 11) -> Dict[str, ParagraphStyle]:
+    """
+    Paragraph styles for notes PDFs, built once per (theme, font size) in a process.
+
+    Heading sizes scale with the body font size, so the default 11pt body
+    gives the original 24/18/14pt title and headings.
+    """
+    if theme not in THEMES:
+        raise ValueError(f"Unknown output theme '{theme}'; available: {sorted(THEMES)}")
+    colors = THEMES[theme]
+    scale = font_size / 11
+    base = getSampleStyleSheet()
+
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=base['Heading1'],
+            fontSize=round(24 * scale, 1),
+            leading=round(29 * scale, 1),
+            textColor=colors['title'],
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        'heading1': ParagraphStyle(
+            'CustomHeading1',
+            parent=base['Heading1'],
+            fontSize=round(18 * scale, 1),
+            leading=round(22 * scale, 1),
+            textColor=colors['heading1'],
+            spaceAfter=12,
+            spaceBefore=16,
+            fontName='Helvetica-Bold'
+        ),
+        'heading2': ParagraphStyle(
+            'CustomHeading2',
+            parent=base['Heading2'],
+            fontSize=round(14 * scale, 1),
+            leading=round(17 * scale, 1),
+            textColor=colors['heading2'],
+            spaceAfter=10,
+            spaceBefore=12,
+            fontName='Helvetica-Bold'
+        ),
+        'body': ParagraphStyle(
+            'CustomBody',
+            parent=base['BodyText'],
+            fontSize=font_size,
+            alignment=TA_JUSTIFY,
+            spaceAfter=8,
+            leading=round(14 * scale, 1)
+        ),
+        'bullet': ParagraphStyle(
+            'CustomBullet',
+            parent=base['BodyText'],
+            fontSize=font_size,
+            leftIndent=20,
+            spaceAfter=6,
+            leading=round(14 * scale, 1)
+        ),
+        'quote': ParagraphStyle(
+            'CustomQuote',
+            parent=base['BodyText'],
+            fontSize=font_size,
+            fontName='Helvetica-Oblique',
+            textColor=colors['heading2'],
+            leftIndent=24,
+            spaceAfter=8,
+            leading=round(14 * scale, 1)
+        ),
+        'code': ParagraphStyle(
+            'CustomCode',
+            parent=base['Code'],
+            fontSize=round(font_size * 0.85, 1),
+            leading=round(12 * scale, 1),
+            backColor='#F4F6F6',
+            borderPadding=4,
+            spaceBefore=4,
+            spaceAfter=8
+        ),
+        'table': ParagraphStyle(
+            'CustomTableCell',
+            parent=base['BodyText'],
+            fontSize=round(font_size * 0.9, 1),
+            leading=round(12 * scale, 1)
+        ),
+        # Nested list levels 1-3 (level 0 is 'bullet')
+        **{
+            f'bullet{level}': ParagraphStyle(
+                f'CustomBullet{level}',
+                parent=base['BodyText'],
+                fontSize=font_size,
+                leftIndent=20 + 18 * level,
+                spaceAfter=4,
+                leading=round(14 * scale, 1)
+            )
+            for level in range(1, 4)
+        },
+    }
+
+
+class DocumentFactory:
+    """
+    Page geometry and styles from the `output:` config, shared by every render worker.
+
+    ``build`` lays out a story into a PDF and records how long it took, so the
+    per-chapter render cost of a run can be reported and benchmarked.
+    """
+
+    def __init__(self, page_size: str = "A4", font_size: float = 11, theme: str = "default",
+                 margins: Tuple[Tuple[str, float], ...] = ()):
+        if page_size.upper() not in PAGE_SIZES:
+            raise ValueError(f"Unknown output page_size '{page_size}'; available: {sorted(PAGE_SIZES)}")
+        self.page_size = PAGE_SIZES[page_size.upper()]
+        self.margins = {**DEFAULT_MARGINS, **dict(margins)}
+        self.styles = get_stylesheet(theme, font_size)
+        self.renders = 0
+        self.render_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def frame_width(self) -> float:
+        """Width available to flowables between the side margins"""
+        return self.page_size[0] - self.margins['left'] - self.margins['right']
+
+    def document(self, filepath: Path) -> SimpleDocTemplate:
+        return SimpleDocTemplate(
+            str(filepath),
+            pagesize=self.page_size,
+            rightMargin=self.margins['right'],
+            leftMargin=self.margins['left'],
+            topMargin=self.margins['top'],
+            bottomMargin=self.margins['bottom']
+        )
+
+    def build(self, filepath: Path, story: list):
+        """Lay out the story into a PDF"""
+        self.document(filepath).build(story)
+
+    def record_render(self, seconds: float):
+        """Count one rendered chapter (story conversion plus layout)"""
+        with self._lock:
+            self.renders += 1
+            self.render_seconds += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            average = self.render_seconds / self.renders * 1000 if self.renders else 0.0
+            return {"rendered": self.renders, "total_s": round(self.render_seconds, 2),
+                    "avg_ms": round(average, 1)}
+
+
+_factories: Dict[tuple, DocumentFactory] = {}
+_factories_lock = threading.Lock()
+
+
+def get_document_factory(output: dict) -> DocumentFactory:
+    """The process-wide factory for an `output:` config section"""
+    key = (
+        str(output.get('page_size', 'A4')),
+        float(output.get('font_size', 11)),
+        output.get('theme', 'default'),
+        tuple(sorted((output.get('margins') or {}).items())),
+    )
+    with _factories_lock:
+        if key not in _factories:
+            _factories[key] = DocumentFactory(*key)
+        return _factories[key]
+
@@ -2,12 +2,80 @@
 Utility Functions Module
 """
 
+import copy
 import json
+import threading
 import yaml
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from colorama import Fore, Style
 
+from catalogue import ChapterCatalogue
+
+
+CONFIG_PATH = "config/config.yaml"
+SUBJECTS_PATH = "config/subjects.json"
+
+
+class ConfigRegistry:
+    """
+    Process-wide cache of the parsed configuration files.
+    
+    Each file is parsed once and re-parsed only when its mtime changes, and
+    derived indexes are rebuilt only when the file they come from changes,
+    so the many workers that build a PDFProcessor share one parse.
+    """
+    
+    def __init__(self):
+        self._files = {}
+        self._derived = {}
+        self._lock = threading.RLock()
+    
+    def load(self, path, parse: Callable[[Path], object]):
+        """Parsed contents of ``path`` (None if it does not exist), cached until its mtime changes"""
+        path = Path(path).resolve()
+        
+        with self._lock:
+            try:
+                mtime = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            
+            entry = self._files.get(path)
+            if entry is None or entry[0] != mtime:
+                entry = (mtime, parse(path) if mtime is not None else None)
+                self._files[path] = entry
+            return entry[1]
+    
+    def derived(self, path, name: str, parse: Callable[[Path], object], build: Callable[[object], object]):
+        """Value computed from a cached file by ``build``, recomputed only when the file changes"""
+        with self._lock:
+            source = self.load(path, parse)
+            key = (Path(path).resolve(), name)
+            entry = self._derived.get(key)
+            if entry is None or entry[0] is not source:
+                entry = (source, build(source))
+                self._derived[key] = entry
+            return entry[1]
+    
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self._derived.clear()
+
+
+_registry = ConfigRegistry()
+
+
+def _parse_yaml(path: Path):
+    with open(path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def _parse_json(path: Path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 
 def display_banner():
     """Display application banner"""
@@ -25,12 +93,11 @@ def display_banner():
 
 
 def load_config() -> dict:
-    """Load configuration from YAML file"""
-    config_path = Path("config/config.yaml")
+    """Load configuration from YAML file (parsed once per process, callers get their own copy)"""
+    config = _registry.load(CONFIG_PATH, _parse_yaml)
     
-    if config_path.exists():
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+    if config is not None:
+        config = copy.deepcopy(config)
     else:
         # Default configuration
         config = {
@@ -60,15 +127,14 @@ def load_config() -> dict:
     return config
 
 
-def load_subjects_data() -> dict:
-    """Load subjects and chapters data from JSON"""
-    subjects_path = Path("config/subjects.json")
-    config = load_config()
+def load_subjects_data(grade: Optional[int] = None) -> dict:
+    """Load subjects and chapters data from JSON for a grade (parsed once per process, callers get their own copy)"""
+    if grade is None:
+        grade = load_config()['grade']
     
-    if subjects_path.exists():
-        with open(subjects_path, 'r', encoding='utf-8') as f:
-            subjects_data = json.load(f)
-            return subjects_data.get(f"grade_{config['grade']}", {"subjects": {}})["subjects"]
+    subjects_data = _registry.load(SUBJECTS_PATH, _parse_json)
+    if subjects_data is not None:
+        return copy.deepcopy(subjects_data.get(f"grade_{grade}", {"subjects": {}})["subjects"])
     
     # Default subjects data
     return {
@@ -81,6 +147,14 @@ def load_subjects_data() -> dict:
         }
 
 
+def get_catalogue() -> ChapterCatalogue:
+    """Chapter catalogue for every grade, recompiled only when subjects.json changes"""
+    return _registry.derived(
+        SUBJECTS_PATH, "catalogue", _parse_json,
+        lambda data: ChapterCatalogue(data or {})
+    )
+
+
 def setup_directories(config: dict):
     """Create necessary directories"""
     Path(config['output']['downloads_dir']).mkdir(parents=True, exist_ok=True)
@@ -90,15 +164,15 @@ def setup_directories(config: dict):
 def get_user_input(config: dict) -> Tuple[List[str], Dict[str, List[str]]]:
     """Get subjects and chapters from user interactively"""
     
-    subjects_data = load_subjects_data()
-    grade_data = subjects_data
+    grade = config.get('grade')
+    catalogue = get_catalogue()
     
-    available_subjects = list(grade_data.keys())
+    available_subjects = catalogue.subjects(grade)
     
     print(f"\n{Fore.GREEN}📚 Available Subjects:{Style.RESET_ALL}")
     for i, subject in enumerate(available_subjects, 1):
         #print(f"   {Fore.YELLOW}{i}.{Style.RESET_ALL} My Subject{subject}")
-        chapter_count = len(grade_data[subject].get('chapters', {}))
+        chapter_count = len(catalogue.chapter_names(grade, subject))
         print(f"   {Fore.YELLOW}{i}.{Style.RESET_ALL} {subject} ({chapter_count} chapters)")
     
     # Get subjects
@@ -123,7 +197,7 @@ def get_user_input(config: dict) -> Tuple[List[str], Dict[str, List[str]]]:
     chapters_dict = {}
     
     for subject in selected_subjects:
-        available_chapters = list(grade_data[subject].get('chapters', {}).keys())
+        available_chapters = catalogue.chapter_names(grade, subject)
         
         print(f"\n{Fore.CYAN}📖 Chapters for {subject}:{Style.RESET_ALL}")
         for i, chapter in enumerate(available_chapters, 1):
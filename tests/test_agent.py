@@ -3,8 +3,10 @@
 Unit tests for the NCERT Notes Agent
 """
 
+import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 import sys
 
 # Add src to path
@@ -12,6 +14,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from utils import load_config
 
+import agent as agent_module
+from batch_prediction import BatchPredictor, LocalBatchClient
+from catalogue import ChapterCatalogue
+
 
 class TestAgent(unittest.TestCase):
     """Test cases for agent functionality"""
@@ -38,5 +44,262 @@ class TestAgent(unittest.TestCase):
         self.assertTrue(notes_dir.exists())
 
 
+class TestBatchMode(unittest.TestCase):
+    """Test cases for multi-grade batch runs"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = load_config()
+        self.config['output'] = {'downloads_dir': f"{self.tmp.name}/downloads", 'notes_dir': f"{self.tmp.name}/notes"}
+        self.config['cache'] = {'enabled': False}
+        self.config['concurrency'] = {'mode': 'sequential'}
+        self.config['checkpoints'] = {'enabled': False}
+        self.catalogue = ChapterCatalogue({
+            "grade_9": {"subjects": {"Science": {"ncert_code": "iesc1", "base_url": "https://x/iesc1{:02d}.pdf",
+                                                 "chapters": {"Matter": 1}}}},
+            "grade_10": {"subjects": {"Science": {"ncert_code": "jesc1", "base_url": "https://x/jesc1{:02d}.pdf",
+                                                  "chapters": {"Light": 10, "Electricity": 11}}}},
+        })
+
+        # The agent's client and the generator's instruction models are one mock
+        self.model_class = mock.MagicMock()
+        patches = [
+            mock.patch.object(agent_module, "vertexai"),
+            mock.patch.object(agent_module, "GenerativeModel", self.model_class),
+            mock.patch("notes_generator.GenerativeModel", self.model_class),
+            mock.patch.object(agent_module, "get_catalogue", return_value=self.catalogue),
+            mock.patch("pdf_processor.utils.get_catalogue", return_value=self.catalogue),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_grades_share_one_queue_and_client(self):
+        """Test that every grade's chapters run on one agent with grade-specific prompts and paths"""
+        agent = agent_module.NCERTNotesAgent(self.config)
+        agent.pdf_processor.download_chapter = mock.Mock(side_effect=lambda s, c, g: Path(f"/missing/{g}/{c}.pdf"))
+        agent.pdf_processor.downloader.is_valid_pdf = lambda path: True
+        agent.pdf_processor.extract_text = lambda path: "chapter text"
+        agent.client.generate_content.return_value = mock.Mock(text="# Notes")
+
+        summary = agent.run_batch([9, 10])
+
+        instructions = [call.kwargs["system_instruction"] for call in self.model_class.call_args_list
+                        if "system_instruction" in call.kwargs]
+        self.assertEqual((summary["total"], summary["completed"], summary["failed"]), (3, 3, 0))
+        self.assertEqual([call.args[2] for call in agent.pdf_processor.download_chapter.call_args_list], [9, 10, 10])
+        self.assertEqual(len(instructions), 2)
+        self.assertIn("9th-grade", instructions[0])
+        self.assertIn("10th-grade", instructions[1])
+        self.assertEqual(len(list(Path(self.config['output']['notes_dir'], "grade_9").glob("*.pdf"))), 1)
+        self.assertIs(agent._generator_for({"grade": 9}).client, agent.client)
+
+    def test_batch_prediction_mode(self):
+        """Test that batch prediction mode sends every prompt in one job and renders the results"""
+        self.config['concurrency'] = {'mode': 'batch_prediction'}
+        agent = agent_module.NCERTNotesAgent(self.config)
+        agent.pdf_processor.download_chapter = lambda s, c, g: Path(f"/missing/{g}/{c}.pdf")
+        agent.pdf_processor.downloader.is_valid_pdf = lambda path: True
+        agent.pdf_processor.extract_text = lambda path: "chapter text"
+        prompts = []
+        client = LocalBatchClient(f"{self.tmp.name}/service", lambda prompt, config: prompts.append(prompt) or "# Notes")
+        agent.batch_predictor = BatchPredictor(client, f"{self.tmp.name}/jobs", poll_interval=0)
+
+        summary = agent.run_batch([9, 10])
+
+        self.assertEqual((summary["total"], summary["completed"], summary["failed"]), (3, 3, 0))
+        self.assertEqual(len(prompts), 3)
+        self.assertEqual(len(list(Path(self.tmp.name, "service").iterdir())), 1)
+        self.assertEqual(len(list(Path(self.config['output']['notes_dir']).rglob("*.pdf"))), 3)
+        agent.client.generate_content.assert_not_called()
+
+    def test_pipeline_renders_in_process_pool(self):
+        """Test that pipeline mode queues renders on the process pool as soon as notes are generated"""
+        self.config['concurrency'] = {'mode': 'pipeline', 'render_processes': 2}
+        agent = agent_module.NCERTNotesAgent(self.config)
+        agent.pdf_processor.download_chapter = lambda s, c, g: Path(f"/missing/{g}/{c}.pdf")
+        agent.pdf_processor.downloader.is_valid_pdf = lambda path: True
+        agent.pdf_processor.extract_text = lambda path: "chapter text"
+        agent.client.generate_content.return_value = mock.Mock(text="# Notes\n- **point**")
+
+        with mock.patch.object(agent_module.NotesGenerator, "save_as_pdf") as save_as_pdf:
+            summary = agent.run_batch([9, 10])
+
+        self.assertEqual((summary["total"], summary["completed"], summary["failed"]), (3, 3, 0))
+        save_as_pdf.assert_not_called()
+        self.assertEqual(len(list(Path(self.config['output']['notes_dir']).rglob("*.pdf"))), 3)
+        self.assertIsNone(agent._renders.get((10, "Science", "Light")))
+
+    def test_pipeline_takes_max_in_flight_from_config(self):
+        """Test that pipeline mode admits chapters up to concurrency.max_in_flight"""
+        self.config['concurrency'] = {'mode': 'pipeline', 'max_in_flight': 1, 'render_processes': 0}
+        agent = agent_module.NCERTNotesAgent(self.config)
+        agent.pdf_processor.download_chapter = lambda s, c, g: Path(f"/missing/{g}/{c}.pdf")
+        agent.pdf_processor.downloader.is_valid_pdf = lambda path: True
+        agent.pdf_processor.extract_text = lambda path: "chapter text"
+        agent.client.generate_content.return_value = mock.Mock(text="# Notes")
+
+        with mock.patch.object(agent_module, "ChapterPipeline", wraps=agent_module.ChapterPipeline) as pipeline:
+            summary = agent.run_batch([9, 10])
+
+        self.assertEqual((summary["total"], summary["completed"]), (3, 3))
+        self.assertEqual(pipeline.call_args.kwargs["max_in_flight"], 1)
+
+    def test_formats_without_pdf_skip_rendering(self):
+        """Test that a Markdown and HTML run writes both formats and never lays out a PDF"""
+        self.config['output']['format'] = ["md", "html"]
+        self.config['google']['stream'] = True
+        agent = agent_module.NCERTNotesAgent(self.config)
+        agent.pdf_processor.download_chapter = lambda s, c, g: Path(f"/missing/{g}/{c}.pdf")
+        agent.pdf_processor.downloader.is_valid_pdf = lambda path: True
+        agent.pdf_processor.extract_text = lambda path: "chapter text"
+        agent.client.generate_content.return_value = mock.Mock(text="# Notes")
+
+        with mock.patch("render_pool.render_notes_pdf") as render:
+            summary = agent.run_batch([10])
+
+        self.assertEqual((summary["total"], summary["completed"]), (2, 2))
+        render.assert_not_called()
+        notes_dir = Path(self.config['output']['notes_dir'])
+        self.assertEqual(sorted(path.suffix for path in notes_dir.rglob("*.*")), [".html", ".html", ".md", ".md"])
+
+    def test_unchanged_chapters_are_skipped(self):
+        """Test that a second run skips chapters whose outputs are current and a new source regenerates them"""
+        downloads = Path(self.tmp.name, "downloads")
+        downloads.mkdir(parents=True, exist_ok=True)
+
+        def download(subject, chapter, grade):
+            path = downloads / f"{grade}_{chapter}.pdf"
+            if not path.exists():
+                path.write_bytes(b"%PDF-1.4 " + chapter.encode())
+            return path
+
+        def run(mode: str) -> dict:
+            self.config['concurrency'] = {'mode': mode, 'render_processes': 0}
+            agent = agent_module.NCERTNotesAgent(self.config)
+            agent.pdf_processor.download_chapter = download
+            agent.pdf_processor.downloader.is_valid_pdf = lambda path: True
+            agent.pdf_processor.extract_text = lambda path: "chapter text"
+            agent.client.generate_content.reset_mock()
+            agent.client.generate_content.return_value = mock.Mock(text="# Notes")
+            summary = agent.run_batch([10])
+            summary["calls"] = agent.client.generate_content.call_count
+            return summary
+
+        first = run("sequential")
+        notes_dir = Path(self.config['output']['notes_dir'])
+        names = sorted(path.name for path in notes_dir.glob("*.pdf"))
+
+        for mode in ("sequential", "pipeline", "batch_prediction"):
+            with self.subTest(mode=mode):
+                again = run(mode)
+                self.assertEqual((again["completed"], again["up_to_date"], again["calls"]), (2, 2, 0))
+
+        (downloads / "10_Light.pdf").write_bytes(b"%PDF-1.4 revised")
+        revised = run("sequential")
+
+        self.assertEqual((first["up_to_date"], first["calls"]), (0, 2))
+        self.assertEqual((revised["up_to_date"], revised["calls"]), (1, 1))
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all("Notes_" in name and name[-20:-4].isalnum() for name in names))
+        current = sorted(path.name for path in notes_dir.glob("*.pdf"))
+        self.assertEqual(len(current), 2)
+        self.assertEqual(len(set(current) & set(names)), 1)
+
+    def test_async_mode_downloads_generates_and_records_failures(self):
+        """Test that async mode writes notes over the aiohttp session and counts a failed download by stage"""
+        self.config['concurrency'] = {'mode': 'async', 'render_processes': 0}
+        self.config['download'] = {**self.config.get('download', {}), 'retries': 1}
+        body = b"%PDF-1.4\n" + b"0" * 2000 + b"\n%%EOF\n"
+        requested = []
+
+        class Content:
+            async def iter_chunked(self, size):
+                for start in range(0, len(body), size):
+                    yield body[start:start + size]
+
+        class Response:
+            def __init__(self, url):
+                self.status = 404 if "jesc111" in url else 200
+                self.headers = {"Content-Length": str(len(body))}
+                self.content = Content()
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+        class Session:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def get(self, url, headers=None):
+                requested.append(url)
+                return Response(url)
+
+        agent = agent_module.NCERTNotesAgent(self.config)
+        agent.pdf_processor.extract_text = lambda path: "chapter text"
+        agent.client.generate_content_async = mock.AsyncMock(return_value=mock.Mock(text="# Notes"))
+
+        with mock.patch.object(agent_module.aiohttp, "ClientSession", Session):
+            summary = agent.run_batch([10])
+
+        self.assertEqual(sorted(requested), ["https://x/jesc110.pdf", "https://x/jesc111.pdf"])
+        self.assertEqual((summary["total"], summary["completed"], summary["failed"]), (2, 1, 1))
+        self.assertEqual(summary["failures_by_stage"], {"download_pdf": 1})
+        agent.client.generate_content_async.assert_awaited_once()
+        agent.client.generate_content.assert_not_called()
+        notes = list(Path(self.config['output']['notes_dir']).glob("*.pdf"))
+        self.assertEqual(len(notes), 1)
+        self.assertIn("Light", notes[0].name)
+
+    def test_async_mode_records_generation_failures(self):
+        """Test that an async Gemini error fails the chapter at the generation stage"""
+        self.config['concurrency'] = {'mode': 'async', 'render_processes': 0}
+        agent = agent_module.NCERTNotesAgent(self.config)
+
+        async def adownload(subject, chapter, session, grade):
+            return Path(f"/missing/{chapter}.pdf")
+        agent.pdf_processor.adownload_chapter = adownload
+        agent.pdf_processor.downloader.is_valid_pdf = lambda path: True
+        agent.pdf_processor.extract_text = lambda path: "chapter text"
+        agent.client.generate_content_async = mock.AsyncMock(side_effect=ValueError("bad request"))
+
+        summary = agent.run_batch([10])
+
+        self.assertEqual((summary["completed"], summary["failed"]), (0, 2))
+        self.assertEqual(summary["failures_by_stage"], {"generate_notes": 2})
+        self.assertEqual(list(Path(self.config['output']['notes_dir']).glob("*.pdf")), [])
+
+    def test_failed_stage_short_circuits(self):
+        """Test that a failed download skips extraction, Gemini and rendering in every mode"""
+        for mode in ("sequential", "pipeline", "async", "batch_prediction"):
+            with self.subTest(mode=mode):
+                self.config['concurrency'] = {'mode': mode}
+                agent = agent_module.NCERTNotesAgent(self.config)
+                agent.pdf_processor.download_chapter = lambda s, c, g: Path(f"/missing/{c}.pdf")
+
+                async def adownload(subject, chapter, session, grade):
+                    return Path(f"/missing/{chapter}.pdf")
+                agent.pdf_processor.adownload_chapter = adownload
+                agent.pdf_processor.extract_text = mock.Mock(return_value="text")
+
+                summary = agent.run_batch([9, 10])
+
+                self.assertEqual(summary["failed"], 3)
+                self.assertEqual(summary["failures_by_stage"], {"download_pdf": 3})
+                agent.pdf_processor.extract_text.assert_not_called()
+                agent.client.generate_content.assert_not_called()
+                agent.client.generate_content_async.assert_not_called()
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Unit tests for batch prediction jobs
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from batch_prediction import (BatchClient, BatchJobError, BatchPredictor, LocalBatchClient, VertexBatchClient,
+                              build_request, parse_prediction)
+from notes_generator import NotesGenerator, generate_notes_batch
+
+
+class TestBatchPredictor(unittest.TestCase):
+    """Test cases for the job file round trip through a local stand-in service"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def predictor(self, respond):
+        return BatchPredictor(LocalBatchClient(Path(self.tmp.name, "service"), respond),
+                              Path(self.tmp.name, "jobs"), poll_interval=0)
+
+    def test_results_are_matched_by_key(self):
+        """Test that every request gets its own answer and failures stay per request"""
+        def respond(prompt, generation_config):
+            if prompt == "bad":
+                raise RuntimeError("blocked")
+            return f"{prompt}:{generation_config['max_output_tokens']}"
+
+        results = self.predictor(respond).predict(
+            {"a": ("first", {"max_output_tokens": 10}), "b": ("bad", {}), "c": ("third", {"max_output_tokens": 5})},
+            model="gemini")
+
+        self.assertEqual((results["a"], results["c"]), ("first:10", "third:5"))
+        self.assertIsInstance(results["b"], BatchJobError)
+        job_file = next(Path(self.tmp.name, "jobs").glob("notes-*.jsonl"))
+        request = json.loads(job_file.read_text(encoding="utf-8").splitlines()[0])["request"]
+        self.assertEqual(request["generationConfig"], {"maxOutputTokens": 10})
+
+    def test_polls_until_done_and_times_out(self):
+        """Test that a running job is polled again and abandoned after the timeout"""
+        client = mock.Mock(spec=BatchClient)
+        client.submit.return_value = "job-1"
+        client.poll.side_effect = [False, False, True]
+        client.fetch_results.return_value = []
+        predictor = BatchPredictor(client, self.tmp.name, poll_interval=0)
+
+        results = predictor.predict({"a": ("prompt", {})}, model="gemini")
+
+        self.assertEqual(client.poll.call_count, 3)
+        self.assertIsInstance(results["a"], BatchJobError)
+
+        client.poll.side_effect = None
+        client.poll.return_value = False
+        predictor.timeout = 0
+        with self.assertRaises(BatchJobError):
+            predictor.predict({"a": ("prompt", {})}, model="gemini")
+
+    def test_prediction_parsing(self):
+        """Test reading answers and errors from service output lines"""
+        request = build_request("k1", "prompt", {})["request"]
+        answer = {"request": request, "status": "",
+                  "response": {"candidates": [{"content": {"parts": [{"text": "Hello"}, {"text": " there"}]}}]}}
+        self.assertEqual(parse_prediction(answer), ("k1", "Hello there"))
+
+        key, error = parse_prediction({"request": request, "status": "quota exceeded"})
+        self.assertEqual(key, "k1")
+        self.assertIn("quota exceeded", str(error))
+
+    def test_vertex_jobs_carry_their_own_location(self):
+        """Test that Vertex jobs are submitted and polled in the batch region without re-initialising vertexai"""
+        with mock.patch("google.cloud.storage.Client"), \
+                mock.patch("google.cloud.aiplatform.BatchPredictionJob") as job_class, \
+                mock.patch("vertexai.init") as init:
+            client = VertexBatchClient("proj", "europe-west4", "gs://bucket/jobs/")
+            job_class.submit.return_value.resource_name = "projects/proj/locations/europe-west4/batchPredictionJobs/1"
+            job_id = client.submit(Path(self.tmp.name, "notes_1.jsonl"), "gemini-1.5-pro")
+            job_class.return_value.state.name = "JOB_STATE_SUCCEEDED"
+            self.assertTrue(client.poll(job_id))
+
+        init.assert_not_called()
+        submitted = job_class.submit.call_args.kwargs
+        self.assertEqual((submitted["project"], submitted["location"]), ("proj", "europe-west4"))
+        self.assertEqual(submitted["model_name"], "publishers/google/models/gemini-1.5-pro")
+        self.assertEqual(submitted["gcs_source"], "gs://bucket/jobs/notes_1/notes_1.jsonl")
+        job_class.assert_called_with(job_id, project="proj", location="europe-west4")
+
+    def test_clients_implement_every_method(self):
+        """Test that the client interface cannot be instantiated without its methods"""
+        with self.assertRaises(TypeError):
+            BatchClient()
+
+
+class TestBatchNotes(unittest.TestCase):
+    """Test cases for generating chapter notes with batch jobs"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.config = {
+            'google': {'model': 'gemini', 'max_tokens': 1000, 'temperature': 0.7},
+            'output': {'notes_dir': f"{self.tmp.name}/notes"},
+            'cache': {'enabled': True, 'dir': f"{self.tmp.name}/cache"},
+            'notes': {'chunking': {'max_input_tokens': 50, 'chunk_tokens': 30}},
+        }
+        self.generator = NotesGenerator(mock.Mock(), self.config)
+        self.prompts = []
+
+        def respond(prompt, generation_config):
+            self.prompts.append(prompt)
+            return "summary" if prompt.startswith("You are condensing") else "# Notes"
+
+        self.predictor = BatchPredictor(LocalBatchClient(f"{self.tmp.name}/service", respond),
+                                        f"{self.tmp.name}/jobs", poll_interval=0)
+
+    def test_long_chapters_are_summarised_in_a_map_job(self):
+        """Test that chunk summaries run in a first job and the notes prompts in a second"""
+        long_text = "\n\n".join(f"Section {i}. " + "word " * 40 for i in range(4))
+        chapters = [(self.generator, "short text", "Science", "Light"),
+                    (self.generator.for_grade(9), long_text, "Science", "Matter")]
+
+        results = generate_notes_batch(chapters, self.predictor)
+
+        self.assertEqual(results, ["# Notes", "# Notes"])
+        map_prompts = [p for p in self.prompts if p.startswith("You are condensing")]
+        self.assertGreater(len(map_prompts), 1)
+        self.assertIn("9th-grade", map_prompts[0])
+        self.assertIn("[Part 1 of", self.prompts[-1] + self.prompts[-2])
+        self.assertEqual(len(list(Path(self.tmp.name, "service").iterdir())), 2)
+        self.generator.client.generate_content.assert_not_called()
+
+    def test_cached_notes_skip_the_job(self):
+        """Test that a second run is answered from the response cache without a job"""
+        chapters = [(self.generator, "short text", "Science", "Light")]
+        generate_notes_batch(chapters, self.predictor)
+        self.prompts.clear()
+
+        self.assertEqual(generate_notes_batch(chapters, self.predictor), ["# Notes"])
+        self.assertEqual(self.prompts, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
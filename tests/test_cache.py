@@ -0,0 +1,104 @@
+"""
+Unit tests for the on-disk caches
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cache import ResponseCache, TextCache, make_key
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the generated-notes cache"""
+
+    def setUp(self):
+        """Set up a throwaway cache directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_depends_on_prompt_and_config(self):
+        """Test that any change to prompt, model or generation config changes the key"""
+        base = self.cache.key_for("prompt", "gemini", {"temperature": 0.7})
+        self.assertEqual(base, self.cache.key_for("prompt", "gemini", {"temperature": 0.7}))
+        self.assertNotEqual(base, self.cache.key_for("prompt!", "gemini", {"temperature": 0.7}))
+        self.assertNotEqual(base, self.cache.key_for("prompt", "gemini-flash", {"temperature": 0.7}))
+        self.assertNotEqual(base, self.cache.key_for("prompt", "gemini", {"temperature": 0.2}))
+
+    def test_hit_and_miss_counters(self):
+        """Test round trip and counters"""
+        key = make_key("chapter")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.set(key, "# Notes", "gemini")
+        self.assertEqual(self.cache.get(key), "# Notes")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_refresh_skips_reads(self):
+        """Test that refresh mode misses but still stores"""
+        key = make_key("chapter")
+        self.cache.set(key, "old", "gemini")
+        refreshing = ResponseCache(self.tmp.name, refresh=True)
+        self.assertIsNone(refreshing.get(key))
+        refreshing.set(key, "new", "gemini")
+        self.assertEqual(self.cache.get(key), "new")
+
+    def test_eviction_by_age_and_size(self):
+        """Test that expired and least recently used entries are evicted"""
+        cache = ResponseCache(self.tmp.name, max_size_mb=0.001, max_age_days=1)
+        old, lru, fresh = make_key("old"), make_key("lru"), make_key("fresh")
+        cache.set(old, "x" * 100, "gemini")
+        cache.set(lru, "y" * 600, "gemini")
+        cache.set(fresh, "z" * 600, "gemini")
+
+        now = time.time()
+        os.utime(cache._path(old), (now - 2 * 86400, now - 2 * 86400))
+        os.utime(cache._path(lru), (now - 60, now - 60))
+
+        self.assertEqual(cache.evict(), 2)
+        self.assertIsNone(cache.get(old))
+        self.assertIsNone(cache.get(lru))
+        self.assertEqual(cache.get(fresh), "z" * 600)
+
+
+class TestTextCache(unittest.TestCase):
+    """Test cases for the extracted-text cache"""
+
+    def setUp(self):
+        """Set up a throwaway cache directory and PDF"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = TextCache(Path(self.tmp.name) / "text")
+        self.pdf = Path(self.tmp.name) / "chapter.pdf"
+        self.pdf.write_bytes(b"%PDF-1.4 first version")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_is_compressed(self):
+        """Test that text is stored gzip-compressed and read back intact"""
+        key = self.cache.key_for(self.pdf, "pdfplumber", {"max_pages_per_chapter": 50})
+        self.cache.set(key, "chapter text " * 200, {"extractor": "pdfplumber"})
+        self.assertEqual(self.cache.get(key), "chapter text " * 200)
+        self.assertLess(self.cache._path(key).stat().st_size, 200)
+
+    def test_key_invalidation(self):
+        """Test that content, extractor and settings changes all change the key"""
+        settings = {"max_pages_per_chapter": 50}
+        base = self.cache.key_for(self.pdf, "pdfplumber", settings)
+        self.assertNotEqual(base, self.cache.key_for(self.pdf, "pypdf2", settings))
+        self.assertNotEqual(base, self.cache.key_for(self.pdf, "pdfplumber", {"max_pages_per_chapter": 10}))
+
+        self.pdf.write_bytes(b"%PDF-1.4 second version, re-downloaded")
+        self.assertNotEqual(base, self.cache.key_for(self.pdf, "pdfplumber", settings))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Unit tests for the compiled chapter catalogue
+"""
+
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from catalogue import ChapterCatalogue
+from utils import get_catalogue
+
+
+DATA = {
+    "grade_9": {"subjects": {
+        "Mathematics": {"ncert_code": "iemh1", "base_url": "https://x/iemh1{:02d}.pdf",
+                        "chapters": {"Number Systems": 1}},
+    }},
+    "grade_10": {"subjects": {
+        "Geography": {"ncert_code": "jess1", "base_url": "https://x/jess1{:02d}.pdf",
+                      "chapters": {"Resources and Development": 1}},
+        "Hindi_Kshitij": {"ncert_code": "jhhn1", "base_url": "https://x/jhhn1{:02d}.pdf",
+                          "sections": {"Gadya_Khand": {"Shared Story": 7}, "Kavya_Khand": {"Poem": 9}}},
+        "Hindi_Kritika": {"ncert_code": "jhhn2", "base_url": "https://x/jhhn2{:02d}.pdf",
+                          "chapters": {"Shared Story": 1}},
+        "Hindi_Sparsh": {"ncert_code": "jhhn3", "base_url": "https://x/jhhn3{:02d}.pdf"},
+    }},
+}
+
+
+class TestChapterCatalogue(unittest.TestCase):
+    """Test cases for ChapterCatalogue lookups"""
+
+    def setUp(self):
+        self.catalogue = ChapterCatalogue(DATA)
+
+    def test_lookup_by_name_and_code(self):
+        """Test that both lookup keys resolve to the same precomputed entry"""
+        entry = self.catalogue.get(10, "Geography", "Resources and Development")
+        self.assertEqual(entry.url, "https://x/jess101.pdf")
+        self.assertEqual(entry.filename, "Geography_Resources_and_Development.pdf")
+        self.assertIs(self.catalogue.by_code("jess1", 1), entry)
+        self.assertIsNone(self.catalogue.get(9, "Geography", "Resources and Development"))
+
+    def test_sections_are_flattened(self):
+        """Test that chapters grouped under sections are catalogued with their section"""
+        self.assertEqual(self.catalogue.chapter_names(10, "Hindi_Kshitij"), ["Shared Story", "Poem"])
+        poem = self.catalogue.by_code("jhhn1", 9)
+        self.assertEqual((poem.section, poem.url), ("Kavya_Khand", "https://x/jhhn109.pdf"))
+        self.assertEqual(self.catalogue.chapter_names(10, "Hindi_Sparsh"), [])
+
+    def test_duplicate_chapter_names_are_reported(self):
+        """Test that a chapter name shared by two books of a grade is flagged"""
+        self.assertEqual(list(self.catalogue.duplicates), [(10, "Shared Story")])
+        books = [entry.book_code for entry in self.catalogue.duplicates[(10, "Shared Story")]]
+        self.assertEqual(books, ["jhhn1", "jhhn2"])
+
+    def test_enumeration_across_grades(self):
+        """Test enumerating chapters for all grades or one subject"""
+        self.assertEqual(self.catalogue.grades(), [9, 10])
+        self.assertEqual(len(list(self.catalogue.chapters())), len(self.catalogue))
+        self.assertEqual([e.name for e in self.catalogue.chapters(9)], ["Number Systems"])
+
+    def test_catalogue_from_subjects_json(self):
+        """Test the shared catalogue compiled from config/subjects.json"""
+        catalogue = get_catalogue()
+        self.assertEqual(catalogue.url(10, "Mathematics", "Real Numbers"),
+                         "https://ncert.nic.in/textbook/pdf/jemh101.pdf")
+        self.assertTrue(catalogue.chapter_names(10, "Hindi_Kshitij"))
+        self.assertIs(catalogue, get_catalogue())
+
+
+if __name__ == '__main__':
+    unittest.main()
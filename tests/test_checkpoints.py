@@ -0,0 +1,123 @@
+"""
+Unit tests for checkpointed, resumable runs
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import agent as agent_module
+from catalogue import ChapterCatalogue
+from checkpoints import RunCheckpoints, UnknownRunError
+from utils import load_config
+
+
+CATALOGUE = ChapterCatalogue({
+    "grade_10": {"subjects": {"Science": {"ncert_code": "jesc1", "base_url": "https://x/jesc1{:02d}.pdf",
+                                          "chapters": {"Light": 1, "Electricity": 2, "Magnetism": 3}}}},
+})
+
+
+class TestResumableRuns(unittest.TestCase):
+    """Test cases for resuming a run from its checkpoints"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.config = load_config()
+        self.config['output'] = {'downloads_dir': f"{self.tmp.name}/downloads", 'notes_dir': f"{self.tmp.name}/notes"}
+        self.config['cache'] = {'enabled': False}
+        self.config['checkpoints'] = {'enabled': True, 'path': f"{self.tmp.name}/checkpoints.sqlite"}
+
+        # The agent's client and the generator's instruction models are one mock
+        model_class = mock.MagicMock()
+        for patch in (mock.patch.object(agent_module, "vertexai"),
+                      mock.patch.object(agent_module, "GenerativeModel", model_class),
+                      mock.patch("notes_generator.GenerativeModel", model_class),
+                      mock.patch("pdf_processor.utils.get_catalogue", return_value=CATALOGUE)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.downloads = []
+        self.generations = []
+        self.fail_chapter = "Electricity"
+
+    def make_agent(self, mode: str):
+        self.config['concurrency'] = {'mode': mode}
+        agent = agent_module.NCERTNotesAgent(self.config)
+
+        def download(subject, chapter, grade, *args):
+            self.downloads.append(chapter)
+            return Path(f"/missing/{chapter}.pdf")
+
+        async def adownload(subject, chapter, session, grade):
+            return download(subject, chapter, grade)
+
+        def generate(prompt, generation_config):
+            chapter = prompt[-1].split("Chapter: ")[1].split("\n")[0]
+            self.generations.append(chapter)
+            if chapter == self.fail_chapter:
+                raise RuntimeError("quota exceeded")
+            return mock.Mock(text=f"# {chapter}")
+
+        async def agenerate(prompt, generation_config):
+            return generate(prompt, generation_config)
+
+        agent.pdf_processor.download_chapter = download
+        agent.pdf_processor.downloader.is_valid_pdf = lambda path: True
+        agent.pdf_processor.extract_text = lambda path: f"Text of {Path(path).stem}"
+        agent.pdf_processor.adownload_chapter = adownload
+        agent.client.generate_content.side_effect = generate
+        agent.client.generate_content_async.side_effect = agenerate
+        return agent
+
+    def run_and_resume(self, mode: str):
+        chapters = {"Science": ["Light", "Electricity", "Magnetism"]}
+        first = self.make_agent(mode).run(["Science"], chapters)
+        self.assertEqual((first["completed"], first["failed"]), (2, 1))
+
+        self.downloads.clear()
+        self.generations.clear()
+        self.fail_chapter = None
+        second = self.make_agent(mode).resume(first["run_id"])
+
+        self.assertEqual((second["completed"], second["failed"]), (3, 0))
+        self.assertEqual(second["run_id"], first["run_id"])
+        # Only the failed chapter's Gemini call is repeated, and nothing is downloaded again
+        self.assertEqual(self.generations, ["Electricity"])
+        self.assertEqual(self.downloads, [])
+        saved = {path.name.split("_Notes_")[0] for path in Path(self.config['output']['notes_dir']).glob("*.pdf")}
+        self.assertEqual(saved, {"Science_Light", "Science_Electricity", "Science_Magnetism"})
+
+    def test_sequential_resume(self):
+        self.run_and_resume("sequential")
+
+    def test_pipeline_resume(self):
+        self.run_and_resume("pipeline")
+
+    def test_async_resume(self):
+        self.run_and_resume("async")
+
+    def test_unknown_run_id(self):
+        """Test that resuming an unknown run fails clearly"""
+        with self.assertRaises(UnknownRunError):
+            self.make_agent("sequential").resume("no-such-run")
+
+    def test_tasks_are_recorded(self):
+        """Test that a run's chapter list can be read back by id"""
+        checkpoints = RunCheckpoints(self.config['checkpoints']['path'])
+        checkpoints.record_tasks([(10, "Science", "Light")])
+        checkpoints.close()
+
+        reopened = RunCheckpoints(self.config['checkpoints']['path'], checkpoints.run_id)
+        self.assertEqual(reopened.load_tasks(), [(10, "Science", "Light")])
+        reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
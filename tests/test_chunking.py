@@ -0,0 +1,103 @@
+"""
+Unit tests for token-aware chunking and map-reduce note generation
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from chunking import estimate_tokens, split_into_chunks, split_sections
+from notes_generator import NotesGenerator
+
+
+CHAPTER = "\n".join(
+    f"{n}.1 SECTION {n}\n" + "\n".join(f"Paragraph {n}.{p} " + "fact " * 60 for p in range(4))
+    for n in range(1, 6)
+)
+
+
+class TestChunking(unittest.TestCase):
+    """Test cases for section-aware chunking"""
+
+    def test_sections_start_at_headings(self):
+        """Test that numbered headings open new sections"""
+        sections = split_sections(CHAPTER)
+        self.assertEqual(len(sections), 5)
+        self.assertTrue(all(section.startswith(f"{n}.1 SECTION") for n, section in enumerate(sections, 1)))
+
+    def test_chunks_respect_budget_and_cover_text(self):
+        """Test that every chunk fits the budget and no words are lost"""
+        chunks = split_into_chunks(CHAPTER, max_tokens=200)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(estimate_tokens(chunk) <= 201 for chunk in chunks))
+        self.assertEqual(" ".join(chunks).split(), CHAPTER.split())
+
+    def test_small_sections_are_packed_together(self):
+        """Test that whole sections share a chunk when the budget allows"""
+        chunks = split_into_chunks(CHAPTER, max_tokens=5000)
+        self.assertEqual(len(chunks), 1)
+
+    def test_unbroken_text_is_hard_cut(self):
+        """Test the fallback for text without any boundary"""
+        chunks = split_into_chunks("x" * 1000, max_tokens=100)
+        self.assertEqual([len(chunk) for chunk in chunks], [400, 400, 200])
+
+
+class TestMapReduce(unittest.TestCase):
+    """Test cases for map-reduce generation in NotesGenerator"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = mock.Mock()
+        self.client.generate_content.side_effect = lambda prompt, generation_config: mock.Mock(
+            text="SUMMARY" if "You are condensing" in prompt[0] else "# Notes")
+        self.config = {
+            'google': {'model': 'gemini', 'max_tokens': 1000, 'temperature': 0.7},
+            'output': {'notes_dir': self.tmp.name},
+            'cache': {'enabled': False},
+            'notes': {'chunking': {'max_input_tokens': 400, 'chunk_tokens': 300}},
+        }
+        # Requests carrying the notes instruction go to the same mock client
+        patch = mock.patch("notes_generator.GenerativeModel", return_value=self.client)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_long_chapter_is_mapped_then_reduced(self):
+        """Test that each chunk is summarised and the summaries feed one final call"""
+        generator = NotesGenerator(self.client, self.config)
+        notes = generator.generate_notes(CHAPTER, "Science", "Chapter")
+
+        chunk_count = len(split_into_chunks(CHAPTER, 300))
+        self.assertEqual(notes, "# Notes")
+        self.assertEqual(self.client.generate_content.call_count, chunk_count + 1)
+        final_prompt = self.client.generate_content.call_args_list[-1][0][0][-1]
+        self.assertIn(f"[Part {chunk_count} of {chunk_count}]\nSUMMARY", final_prompt)
+
+    def test_short_chapter_is_single_call(self):
+        """Test that text within budget goes straight to the note prompt"""
+        generator = NotesGenerator(self.client, self.config)
+        generator.generate_notes("1.1 INTRO\nshort text", "Science", "Chapter")
+        self.assertEqual(self.client.generate_content.call_count, 1)
+
+    def test_disabled_chunking_keeps_the_character_limit(self):
+        """Test that with chunking off the chapter is cut at 35000 characters in one call"""
+        self.config['notes']['chunking']['enabled'] = False
+        generator = NotesGenerator(self.client, self.config)
+        generator.generate_notes("a" * 34000 + "b" * 2000, "Science", "Chapter")
+
+        self.assertEqual(self.client.generate_content.call_count, 1)
+        prompt = self.client.generate_content.call_args.args[0][-1]
+        self.assertIn("a" * 34000 + "b" * 1000, prompt)
+        self.assertNotIn("b" * 1001, prompt)
+
+
+if __name__ == '__main__':
+    unittest.main()
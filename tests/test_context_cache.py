@@ -0,0 +1,99 @@
+"""
+Unit tests for context caching of the notes instruction
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from context_cache import InstructionCache
+from notes_generator import NotesGenerator
+
+
+class TestInstructionCache(unittest.TestCase):
+    """Test cases for registering the static notes instruction"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.config = {
+            'google': {'model': 'gemini', 'max_tokens': 1000, 'temperature': 0.7,
+                       'context_cache': {'enabled': True, 'min_tokens': 100}},
+            'output': {'notes_dir': self.tmp.name},
+            'cache': {'enabled': False},
+        }
+        self.create = mock.patch("vertexai.caching.CachedContent.create").start()
+        self.from_cached = mock.patch("vertexai.generative_models.GenerativeModel.from_cached_content").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_prompt_is_split_into_instruction_and_chapter(self):
+        """Test that only the chapter part of the prompt varies"""
+        generator = NotesGenerator(mock.Mock(), self.config)
+        prompt = generator._build_prompt("text", "Science", "Light")
+
+        self.assertNotIn("Key Concepts", prompt)
+        self.assertIn("Chapter: Light", prompt)
+        self.assertIn("Key Concepts", generator._system_instruction())
+        self.assertNotIn("Light", generator._system_instruction())
+
+    def test_instruction_registered_once_per_grade(self):
+        """Test that every chapter of a grade is sent against one registered cache"""
+        cached_model = self.from_cached.return_value
+        cached_model.generate_content.return_value = mock.Mock(text="# Notes")
+        generator = NotesGenerator(mock.Mock(), self.config)
+
+        for chapter in ("Light", "Electricity", "Magnetism"):
+            generator.generate_notes("text", "Science", chapter)
+        generator.for_grade(9).generate_notes("text", "Science", "Matter")
+
+        self.assertEqual(self.create.call_count, 2)
+        self.assertIn("10th-grade", self.create.call_args_list[0].kwargs["system_instruction"])
+        contents = cached_model.generate_content.call_args.args[0]
+        self.assertEqual(len(contents), 1)
+        self.assertTrue(contents[0].startswith("Subject: Science"))
+        generator.client.generate_content.assert_not_called()
+        self.assertEqual(generator.instruction_cache.stats()["cached_requests"], 4)
+
+    def test_short_or_failed_instruction_is_sent_as_system_instruction(self):
+        """Test the fallback to one model per instruction carrying it as its system instruction"""
+        for config, create_error in (({'enabled': True, 'min_tokens': 100000}, None),
+                                     ({'enabled': True, 'min_tokens': 100}, RuntimeError("unsupported"))):
+            with self.subTest(config=config), mock.patch("notes_generator.GenerativeModel") as model_class:
+                self.create.side_effect = create_error
+                self.config['google']['context_cache'] = config
+                model = model_class.return_value
+                model.generate_content.return_value = mock.Mock(text="# Notes")
+                generator = NotesGenerator(mock.Mock(), self.config)
+
+                generator.generate_notes("text", "Science", "Light")
+                generator.for_grade(9).generate_notes("text", "Science", "Matter")
+                generator.generate_notes("text", "Science", "Electricity")
+
+                instructions = [call.kwargs["system_instruction"] for call in model_class.call_args_list]
+                self.assertEqual(len(instructions), 2)
+                self.assertIn("10th-grade", instructions[0])
+                self.assertIn("9th-grade", instructions[1])
+                contents = [call.args[0] for call in model.generate_content.call_args_list]
+                self.assertEqual([len(parts) for parts in contents], [1, 1, 1])
+                self.assertTrue(all(parts[0].startswith("Subject: Science") for parts in contents))
+                generator.client.generate_content.assert_not_called()
+                self.assertEqual(generator.instruction_cache.stats()["registered"], 0)
+
+    def test_ttl_is_extended_while_in_use(self):
+        """Test that a long run keeps its cache alive"""
+        cache = InstructionCache("gemini", ttl_minutes=0, min_tokens=1)
+        cache.model_for("instruction")
+        cache.model_for("instruction")
+
+        self.create.return_value.update.assert_called()
+        cache.close()
+        self.create.return_value.delete.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
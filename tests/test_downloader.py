@@ -0,0 +1,230 @@
+"""
+Unit tests for the PDF downloader against a local HTTP server
+"""
+
+import functools
+import re
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler, BaseHTTPRequestHandler
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from downloader import HostRateLimiter, PDFDownloader
+
+
+PAYLOAD = b"%PDF-1.4\n" + bytes(range(256)) * 40 + b"\n%%EOF\n"
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FlakyRangeHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD with Range support, dropping the first `drops` GETs halfway through"""
+
+    drops = 0
+    seen_ranges = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def _respond(self, send_body: bool):
+        start, end = 0, len(PAYLOAD) - 1
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")
+        else:
+            self.send_response(200)
+        if send_body:
+            type(self).seen_ranges.append(self.headers.get("Range"))
+
+        body = PAYLOAD[start:end + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+
+        if not send_body:
+            return
+        if type(self).drops > 0:
+            type(self).drops -= 1
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class TestPDFDownloader(unittest.TestCase):
+    """Test cases for pooled, streaming downloads"""
+
+    def setUp(self):
+        """Serve a temporary directory over HTTP"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "srv").mkdir()
+        (self.root / "srv" / "chapter.pdf").write_bytes(PAYLOAD)
+        (self.root / "srv" / "tiny.pdf").write_bytes(b"%PDF")
+
+        handler = functools.partial(QuietHandler, directory=str(self.root / "srv"))
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.downloader = PDFDownloader({"download": {"chunk_size": 1024}})
+
+    def tearDown(self):
+        self.downloader.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_download_then_revalidate(self):
+        """Test that a second fetch is answered with 304 from stored validators"""
+        target = self.root / "chapter.pdf"
+        url = f"{self.base_url}/chapter.pdf"
+
+        self.assertFalse(self.downloader.can_revalidate(url, target))
+        self.assertEqual(self.downloader.fetch(url, target), len(PAYLOAD))
+        self.assertTrue(self.downloader.can_revalidate(url, target))
+        self.assertEqual(self.downloader.fetch(url, target), 0)
+        self.assertEqual(target.read_bytes(), PAYLOAD)
+
+    def test_too_small_download_is_not_kept(self):
+        """Test that undersized bodies raise and leave no partial file behind"""
+        target = self.root / "tiny.pdf"
+        with self.assertRaises(ValueError):
+            self.downloader.fetch(f"{self.base_url}/tiny.pdf", target)
+        self.assertEqual(list(self.root.glob("tiny.pdf*")), [])
+
+
+class TestResumableDownloads(unittest.TestCase):
+    """Test cases for Range resumption against a server that drops connections"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.target = Path(self.tmp.name) / "chapter.pdf"
+        FlakyRangeHandler.drops = 0
+        FlakyRangeHandler.seen_ranges = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyRangeHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/chapter.pdf"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_interrupted_transfer_resumes_with_range(self):
+        """Test that a dropped connection keeps the part file and the retry resumes it"""
+        FlakyRangeHandler.drops = 1
+        downloader = PDFDownloader({"download": {"chunk_size": 1024}})
+
+        with self.assertRaises(Exception):
+            downloader.fetch(self.url, self.target)
+        self.assertFalse(self.target.exists())
+        half = downloader.part_path(self.target).stat().st_size
+        self.assertGreater(half, 0)
+
+        self.assertEqual(downloader.fetch(self.url, self.target), len(PAYLOAD))
+        self.assertEqual(self.target.read_bytes(), PAYLOAD)
+        self.assertEqual(FlakyRangeHandler.seen_ranges, [None, f"bytes={half}-"])
+        self.assertFalse(downloader.part_path(self.target).exists())
+        downloader.close()
+
+    def test_parallel_ranges_reassemble_file(self):
+        """Test that a file fetched as parallel byte ranges is byte-identical"""
+        FlakyRangeHandler.drops = 1
+        downloader = PDFDownloader({"download": {"parallel_ranges": 4, "parallel_min_size_mb": 0,
+                                                 "backoff_base": 0.01}})
+
+        self.assertEqual(downloader.fetch(self.url, self.target), len(PAYLOAD))
+        self.assertEqual(self.target.read_bytes(), PAYLOAD)
+        self.assertEqual(len(FlakyRangeHandler.seen_ranges), 5)
+        downloader.close()
+
+    def test_interrupted_parallel_fetch_starts_over(self):
+        """Test that an interrupted parallel fetch leaves nothing to resume and the next fetch starts over"""
+        downloader = PDFDownloader({"download": {"parallel_ranges": 4, "parallel_min_size_mb": 0}})
+        fetch_range = downloader._fetch_range
+        calls = []
+
+        def interrupted(url, part, start, end):
+            calls.append(start)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            fetch_range(url, part, start, end)
+
+        downloader._fetch_range = interrupted
+        with self.assertRaises(KeyboardInterrupt):
+            downloader.fetch(self.url, self.target)
+        self.assertEqual(list(Path(self.tmp.name).iterdir()), [])
+
+        downloader._fetch_range = fetch_range
+        FlakyRangeHandler.seen_ranges = []
+        self.assertEqual(downloader.fetch(self.url, self.target), len(PAYLOAD))
+        self.assertEqual(self.target.read_bytes(), PAYLOAD)
+        self.assertNotIn(f"bytes={len(PAYLOAD)}-", FlakyRangeHandler.seen_ranges)
+        downloader.close()
+
+    def test_backoff_is_bounded(self):
+        """Test that jittered backoff never exceeds the exponential cap"""
+        downloader = PDFDownloader({"download": {"backoff_base": 1.0, "backoff_max": 5.0}})
+        for attempt in range(6):
+            delay = downloader.backoff_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(5.0, 2 ** attempt))
+        downloader.close()
+
+
+class TestHostRateLimiter(unittest.TestCase):
+    """Test cases for host-level politeness limits"""
+
+    def test_request_rate_per_host(self):
+        """Test that request starts on one host are spaced by the configured rate"""
+        limiter = HostRateLimiter(max_concurrent=4, requests_per_second=50)
+        start = time.monotonic()
+        for _ in range(6):
+            with limiter.slot("https://ncert.nic.in/textbook/pdf/a.pdf"):
+                pass
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_concurrency_per_host(self):
+        """Test that one host never sees more than max_concurrent requests"""
+        limiter = HostRateLimiter(max_concurrent=2)
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def request():
+            with limiter.slot("https://ncert.nic.in/x.pdf"):
+                with lock:
+                    active["now"] += 1
+                    active["peak"] = max(active["peak"], active["now"])
+                time.sleep(0.02)
+                with lock:
+                    active["now"] -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(active["peak"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Unit tests for headless job manifests
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import main
+from catalogue import ChapterCatalogue
+from manifest import ManifestError, apply_manifest, load_manifest, parse_shard, resolve_chapters
+
+
+CATALOGUE = ChapterCatalogue({
+    "grade_9": {"subjects": {
+        "Science": {"ncert_code": "iesc1", "base_url": "https://x/iesc1{:02d}.pdf",
+                    "chapters": {"Matter": 1, "Atoms": 2}},
+    }},
+    "grade_10": {"subjects": {
+        "Science": {"ncert_code": "jesc1", "base_url": "https://x/jesc1{:02d}.pdf",
+                    "chapters": {"Reactions": 1, "Acids, Bases and Salts": 2, "Metals": 3, "Carbon": 4}},
+        "Mathematics": {"ncert_code": "jemh1", "base_url": "https://x/jemh1{:02d}.pdf",
+                        "chapters": {"Real Numbers": 1}},
+    }},
+})
+
+
+def names(entries):
+    return [(entry.grade, entry.name) for entry in entries]
+
+
+class TestResolveChapters(unittest.TestCase):
+    """Test cases for expanding a manifest into catalogue chapters"""
+
+    def test_defaults_to_configured_grade(self):
+        """Test that an empty manifest selects every chapter of the configured grade"""
+        self.assertEqual(len(resolve_chapters({}, CATALOGUE, 10)), 5)
+
+    def test_numbers_ranges_and_names(self):
+        """Test the chapter selector forms, per subject"""
+        manifest = {"grades": [10], "chapters": {"Science": ["1", "3-4", "Acids, Bases and Salts"]}}
+        self.assertEqual(names(resolve_chapters(manifest, CATALOGUE, 10)), [
+            (10, "Reactions"), (10, "Acids, Bases and Salts"), (10, "Metals"), (10, "Carbon")])
+
+    def test_all_grades_and_subject_filter(self):
+        """Test grades 'all' combined with a subject filter"""
+        manifest = {"grades": "all", "subjects": ["Science"], "chapters": [1]}
+        self.assertEqual(names(resolve_chapters(manifest, CATALOGUE, 10)), [(9, "Matter"), (10, "Reactions")])
+
+    def test_shards_partition_the_job(self):
+        """Test that shards are disjoint and together cover every chapter"""
+        shards = [names(resolve_chapters({"grades": "all", "shard": f"{i}/3"}, CATALOGUE, 10)) for i in range(3)]
+        covered = sorted(chapter for shard in shards for chapter in shard)
+        self.assertEqual(covered, sorted(names(resolve_chapters({"grades": "all"}, CATALOGUE, 10))))
+
+    def test_invalid_jobs_are_rejected(self):
+        """Test the validation errors"""
+        for manifest in ({"grades": [11]}, {"subjects": ["Art"]}, {"grades": "ten"}, {"shard": "4/4"}):
+            with self.assertRaises(ManifestError):
+                resolve_chapters(manifest, CATALOGUE, 10)
+
+
+class TestManifestFiles(unittest.TestCase):
+    """Test cases for reading manifests and merging their config sections"""
+
+    def test_load_and_apply(self):
+        """Test that a YAML manifest overrides only the sections it names"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "job.yaml"
+            path.write_text("grades: [10]\nconcurrency:\n  mode: async\n")
+            manifest = load_manifest(path)
+
+        config = {"concurrency": {"mode": "sequential", "max_in_flight": 32}}
+        apply_manifest(config, manifest)
+        self.assertEqual(config["concurrency"], {"mode": "async", "max_in_flight": 32})
+
+    def test_shard_forms(self):
+        """Test both shard spellings"""
+        self.assertEqual(parse_shard("1/4"), (1, 4))
+        self.assertEqual(parse_shard({"index": 0, "count": 2}), (0, 2))
+
+
+class TestHeadlessRun(unittest.TestCase):
+    """Test cases for the exit status of headless runs"""
+
+    def test_empty_selection_is_invalid(self):
+        """Test that a job selecting no chapters exits as invalid without starting the agent"""
+        with tempfile.TemporaryDirectory() as tmp:
+            status_file = Path(tmp) / "status.json"
+            # Mathematics has a single chapter, so the second of two shards is empty
+            args = main.parse_args(["run", "--grades", "10", "--subjects", "Mathematics", "--shard", "1/2",
+                                    "--status-file", str(status_file)])
+            with mock.patch.object(main, "get_catalogue", return_value=CATALOGUE), \
+                    mock.patch.object(main, "setup_directories"), \
+                    mock.patch.object(main, "NCERTNotesAgent") as agent, \
+                    mock.patch("builtins.print"):
+                exit_code = main.run_headless(args)
+            status = json.loads(status_file.read_text())
+
+        self.assertEqual(exit_code, main.EXIT_INVALID)
+        self.assertEqual((status["status"], status["error"]), ("error", "no chapters selected"))
+        agent.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Unit tests for the markdown-to-flowable compiler
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reportlab.platypus import HRFlowable, Paragraph, Preformatted, Table
+
+from markdown_compiler import HtmlCompiler, MarkdownCompiler, inline_markup
+from notes_generator import NotesGenerator
+from theme import get_document_factory
+
+
+NOTES = """# Light
+## Overview
+Some **bold**, *italic* and `code` text
+- point one
+  - nested point
+1. numbered
+> a quote
+---
+| Term | Meaning |
+|------|---------|
+| f | focal length |
+```
+1/v + 1/u = 1/f
+```
+Final paragraph"""
+
+
+class TestInlineMarkup(unittest.TestCase):
+    """Test cases for inline emphasis and escaping"""
+
+    def test_emphasis(self):
+        """Test bold, italic and code spans"""
+        self.assertEqual(inline_markup("a **b** *c* __d__ _e_"), "a <b>b</b> <i>c</i> <b>d</b> <i>e</i>")
+        self.assertEqual(inline_markup("*a **b** c*"), "<i>a <b>b</b> c</i>")
+        self.assertEqual(inline_markup("use `x<y` here"), 'use <font face="Courier">x&lt;y</font> here')
+
+    def test_bold_italic(self):
+        """Test that triple markers open and close both spans in nesting order"""
+        self.assertEqual(inline_markup("***both***"), "<b><i>both</i></b>")
+        self.assertEqual(inline_markup("a ___both___ b"), "a <b><i>both</i></b> b")
+        self.assertEqual(inline_markup("**bold *both***"), "<b>bold <i>both</i></b>")
+        self.assertEqual(inline_markup("*it **both***"), "<i>it <b>both</b></i>")
+
+    def test_escaping_and_literals(self):
+        """Test that markup characters are escaped and stray markers stay literal"""
+        self.assertEqual(inline_markup("a < b & c > d"), "a &lt; b &amp; c &gt; d")
+        self.assertEqual(inline_markup("2 * 3 and snake_case_name"), "2 * 3 and snake_case_name")
+        self.assertEqual(inline_markup("unclosed **bold"), "unclosed **bold")
+        self.assertEqual(inline_markup("**a *b** c*"), "<b>a *b</b> c*")
+
+    def test_many_spans(self):
+        """Test a line with thousands of bold spans (quadratic before)"""
+        line = "x **y** " * 5000
+        self.assertEqual(inline_markup(line).count("<b>"), 5000)
+
+
+class TestMarkdownCompiler(unittest.TestCase):
+    """Test cases for block structure"""
+
+    def setUp(self):
+        factory = get_document_factory({})
+        self.styles = factory.styles
+        self.compiler = MarkdownCompiler(factory.styles, factory.frame_width)
+
+    def test_block_types(self):
+        """Test headings, lists, quotes, rules, tables and code blocks"""
+        story = self.compiler.compile(NOTES)
+        paragraphs = {flowable.style.name: flowable for flowable in story if isinstance(flowable, Paragraph)}
+
+        self.assertIn("CustomTitle", paragraphs)
+        self.assertIn("CustomBullet1", paragraphs)
+        self.assertIn("CustomQuote", paragraphs)
+        self.assertEqual(sum(isinstance(f, Table) for f in story), 1)
+        self.assertEqual(sum(isinstance(f, Preformatted) for f in story), 1)
+        self.assertEqual(sum(isinstance(f, HRFlowable) for f in story), 1)
+        table = next(f for f in story if isinstance(f, Table))
+        self.assertEqual((len(table._cellvalues), table.repeatRows), (2, 1))
+
+    def test_streamed_lines_match_whole_document(self):
+        """Test that feeding lines one at a time gives the same flowables"""
+        streamed = MarkdownCompiler(self.styles, 400)
+        story = [f for line in NOTES.split("\n") for f in streamed.feed(line)] + streamed.finish()
+
+        self.assertEqual([type(f) for f in story], [type(f) for f in self.compiler.compile(NOTES)])
+
+    def test_html_lists(self):
+        """Test that the HTML compiler nests lists and keeps indented lines in their item"""
+        html = "".join(HtmlCompiler().compile("- a\n  - b\n- c\n\n2. two\n   **Why**: x\ntext"))
+
+        self.assertEqual(html, '<ul><li>a<ul><li>b</li></ul></li><li>c</li></ul>'
+                               '<ol start="2"><li>two<br/><b>Why</b>: x</li></ol><p>text</p>')
+
+    def test_unsafe_text_renders(self):
+        """Test that text with markup characters builds a valid PDF"""
+        with tempfile.TemporaryDirectory() as tmp:
+            config = {'google': {'model': 'gemini'}, 'output': {'notes_dir': tmp}, 'cache': {'enabled': False}}
+            generator = NotesGenerator(None, config)
+            path = generator.save_as_pdf("## x < y & <b>\n- 5 > 3 **and** <unclosed", "Acids & Bases", "pH < 7")
+
+            self.assertTrue(path.read_bytes().startswith(b"%PDF"))
+
+
+if __name__ == '__main__':
+    unittest.main()
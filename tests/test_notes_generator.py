@@ -0,0 +1,71 @@
+"""
+Unit tests for note rendering and streaming generation
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from notes_generator import NotesGenerator
+
+
+NOTES = "# Title\n## Overview\nSome **bold** text\n- point one\n1. numbered\n"
+
+
+def fake_stream(text, fail_after=None):
+    """Yield text in small response chunks, optionally raising part-way"""
+    for i in range(0, len(text), 7):
+        if fail_after is not None and i >= fail_after:
+            raise RuntimeError("stream reset")
+        yield mock.Mock(text=text[i:i + 7])
+
+
+class TestStreamingGeneration(unittest.TestCase):
+    """Test cases for streaming Gemini output into the PDF"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.client = mock.Mock()
+        self.config = {
+            'google': {'model': 'gemini', 'max_tokens': 1000, 'temperature': 0.7, 'stream': True},
+            'output': {'notes_dir': self.tmp.name},
+            'cache': {'enabled': False},
+        }
+        # Requests carrying the notes instruction go to the same mock client
+        patch = mock.patch("notes_generator.GenerativeModel", return_value=self.client)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.generator = NotesGenerator(self.client, self.config)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stream_builds_pdf(self):
+        """Test that streamed fragments are reassembled and rendered"""
+        self.client.generate_content.return_value = fake_stream(NOTES)
+        notes, pdf_path = self.generator.stream_notes_to_pdf("content", "Science", "Light")
+
+        self.assertEqual(notes, NOTES)
+        self.assertTrue(pdf_path.exists())
+        self.assertTrue(pdf_path.read_bytes().startswith(b"%PDF"))
+        self.assertTrue(self.client.generate_content.call_args.kwargs["stream"])
+
+    def test_partial_output_survives_failure(self):
+        """Test that a mid-stream failure still leaves a partial PDF behind"""
+        self.client.generate_content.return_value = fake_stream(NOTES, fail_after=21)
+
+        with self.assertRaises(Exception) as raised:
+            self.generator.stream_notes_to_pdf("content", "Science", "Light")
+
+        partials = list(Path(self.tmp.name).glob("*_partial.pdf"))
+        self.assertEqual(len(partials), 1)
+        self.assertIn(partials[0].name, str(raised.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for the notes output backends
+"""
+
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from notes_generator import NotesGenerator
+from output_backends import BACKENDS, output_formats
+
+
+NOTES = "# Light\n## Mirrors & lenses\n- **focal length** f\n  - sign convention\n1. m = -v/u\n\nx < y"
+SETTINGS = ({'theme': 'default'}, "Asha & Ravi", 10)
+
+
+class TestOutputFormats(unittest.TestCase):
+    """Test cases for `output.format` parsing"""
+
+    def test_formats(self):
+        """Test strings, lists, aliases and PDF-first ordering"""
+        self.assertEqual(output_formats({}), ["pdf"])
+        self.assertEqual(output_formats({'format': "html, pdf"}), ["pdf", "html"])
+        self.assertEqual(output_formats({'format': ["markdown", "EPUB", "md"]}), ["md", "epub"])
+        with self.assertRaises(ValueError):
+            output_formats({'format': "docx"})
+
+
+class TestBackends(unittest.TestCase):
+    """Test cases for the Markdown, HTML and EPUB writers"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+
+    def test_markdown(self):
+        """Test that the notes are written unchanged behind front matter"""
+        path = self.dir / "notes.md"
+        BACKENDS["md"].write(*SETTINGS, NOTES, "Science", 'Light "Reflection"', path)
+
+        text = path.read_text(encoding='utf-8')
+        self.assertTrue(text.startswith('---\ntitle: "Light \\"Reflection\\""\nsubject: "Science"\ngrade: 10\n'))
+        self.assertTrue(text.endswith(NOTES + "\n"))
+
+    def test_html_is_well_formed(self):
+        """Test that the page parses as XML with escaped text and nested lists"""
+        path = self.dir / "notes.html"
+        BACKENDS["html"].write(*SETTINGS, NOTES, "Science", "Light", path)
+
+        page = ElementTree.parse(path).getroot()
+        ns = {"h": "http://www.w3.org/1999/xhtml"}
+        self.assertEqual(page.find(".//h:main/h:h2", ns).text, "Mirrors & lenses")
+        self.assertIsNotNone(page.find(".//h:main/h:ul/h:li/h:ul/h:li", ns))
+        self.assertIn("Asha & Ravi", "".join(page.find(".//h:p[@class='meta']", ns).itertext()))
+        self.assertIn("<style>", path.read_text(encoding='utf-8'))
+
+    def test_epub_package(self):
+        """Test the EPUB container layout and that its documents parse"""
+        path = self.dir / "notes.epub"
+        BACKENDS["epub"].write(*SETTINGS, NOTES, "Science", "Light", path)
+
+        with zipfile.ZipFile(path) as book:
+            first = book.infolist()[0]
+            self.assertEqual((first.filename, first.compress_type), ("mimetype", zipfile.ZIP_STORED))
+            self.assertEqual(book.read("mimetype"), b"application/epub+zip")
+            for name in ("META-INF/container.xml", "OEBPS/content.opf", "OEBPS/nav.xhtml", "OEBPS/notes.xhtml"):
+                ElementTree.fromstring(book.read(name))
+            self.assertIn(b'href="style.css"', book.read("OEBPS/notes.xhtml"))
+
+    def test_generator_writes_every_format(self):
+        """Test that one generation is saved in all configured formats under one stem"""
+        config = {'google': {'model': 'gemini'}, 'cache': {'enabled': False},
+                  'output': {'notes_dir': self.tmp.name, 'format': "pdf,md,html,epub"}}
+        generator = NotesGenerator(None, config)
+
+        paths = generator.save_outputs(NOTES, "Science", "Light")
+
+        self.assertEqual([path.suffix for path in paths], [".pdf", ".md", ".html", ".epub"])
+        self.assertEqual(len({path.stem for path in paths}), 1)
+        self.assertTrue(paths[0].read_bytes().startswith(b"%PDF"))
+
+
+if __name__ == '__main__':
+    unittest.main()
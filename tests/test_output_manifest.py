@@ -0,0 +1,98 @@
+"""
+Unit tests for content-derived output names and the output manifest
+"""
+
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from output_manifest import OutputManifest, output_key
+from prompts import NotesPrompts
+
+
+class TestOutputManifest(unittest.TestCase):
+    """Test cases for up-to-date checks and recording outputs"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+
+    def write(self, name: str) -> Path:
+        path = self.root / name
+        path.write_text("notes", encoding='utf-8')
+        return path
+
+    def test_keys(self):
+        """Test that keys change with the source and the settings only"""
+        provenance = {"prompt_version": NotesPrompts().version, "model": "gemini"}
+        self.assertEqual(output_key("abc", provenance), output_key("abc", dict(provenance)))
+        self.assertNotEqual(output_key("abc", provenance), output_key("abd", provenance))
+        self.assertNotEqual(NotesPrompts().version, NotesPrompts(notes={'difficulty_level': 'advanced'}).version)
+        self.assertEqual(len(output_key("abc", provenance)), 16)
+
+    def test_up_to_date(self):
+        """Test that a chapter is current only for its key with every format on disk"""
+        manifest = OutputManifest(self.root)
+        manifest.record("10/Science/Light", "k1", {"model": "gemini"},
+                        {"pdf": self.write("Light_k1.pdf"), "md": self.write("Light_k1.md")})
+
+        reloaded = OutputManifest(self.root)
+        self.assertTrue(reloaded.up_to_date("10/Science/Light", "k1", ["pdf", "md"]))
+        self.assertFalse(reloaded.up_to_date("10/Science/Light", "k2", ["pdf"]))
+        self.assertFalse(reloaded.up_to_date("10/Science/Light", "k1", ["pdf", "html"]))
+        self.assertEqual(reloaded.lookup("10/Science/Light")["model"], "gemini")
+
+        (self.root / "Light_k1.md").unlink()
+        self.assertFalse(reloaded.up_to_date("10/Science/Light", "k1", ["md"]))
+
+    def test_new_version_replaces_files(self):
+        """Test that recording a new key deletes the previous version's files"""
+        manifest = OutputManifest(self.root)
+        manifest.record("10/Science/Light", "k1", {}, {"pdf": self.write("Light_k1.pdf")})
+        manifest.record("10/Science/Light", "k1", {}, {"md": self.write("Light_k1.md")})
+        manifest.record("10/Science/Light", "k2", {}, {"pdf": self.write("Light_k2.pdf")})
+
+        self.assertEqual(sorted(path.name for path in self.root.glob("Light_*")), ["Light_k2.pdf"])
+        self.assertEqual(manifest.lookup("10/Science/Light")["files"], {"pdf": "Light_k2.pdf"})
+
+    def test_writers_merge(self):
+        """Test that two manifests on one directory keep each other's chapters"""
+        first, second = OutputManifest(self.root), OutputManifest(self.root)
+        first.record("10/Science/Light", "k1", {}, {"pdf": self.write("a.pdf")})
+        second.record("10/Science/Electricity", "k2", {}, {"pdf": self.write("b.pdf")})
+
+        self.assertEqual(sorted(OutputManifest(self.root).entries), ["10/Science/Electricity", "10/Science/Light"])
+
+    def test_concurrent_writers_keep_every_entry(self):
+        """Test that two manifests recording at the same time lose none of each other's chapters"""
+        manifests = [OutputManifest(self.root), OutputManifest(self.root)]
+
+        def record(index: int):
+            for n in range(25):
+                manifests[index].record(f"10/Subject{index}/Chapter{n}", "k", {},
+                                        {"md": self.write(f"{index}_{n}.md")})
+
+        threads = [threading.Thread(target=record, args=(index,)) for index in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(OutputManifest(self.root).entries), 50)
+
+    def test_refresh_disables_incremental(self):
+        """Test that --refresh (cache.refresh) regenerates up-to-date chapters"""
+        config = {'output': {'notes_dir': self.tmp.name}}
+        self.assertTrue(OutputManifest.from_config(config).incremental)
+        config['cache'] = {'refresh': True}
+        self.assertFalse(OutputManifest.from_config(config).incremental)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Unit tests for PDF text extraction
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import sys
+
+from reportlab.pdfgen import canvas
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pdf_processor import PDFProcessor
+
+
+class TestParallelExtraction(unittest.TestCase):
+    """Test cases for splitting a chapter's pages across the extraction process pool"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.pdf_path = Path(self.tmp.name) / "chapter.pdf"
+        pdf = canvas.Canvas(str(self.pdf_path))
+        for number in range(1, 11):
+            pdf.drawString(72, 720, f"Page {number} of the chapter")
+            pdf.showPage()
+        pdf.save()
+
+    def processor(self, parallel_workers: int) -> PDFProcessor:
+        config = {
+            'grade': 10,
+            'output': {'downloads_dir': str(Path(self.tmp.name) / "downloads")},
+            'cache': {'enabled': False},
+            'pdf': {'max_pages_per_chapter': 50, 'parallel_workers': parallel_workers, 'pages_per_chunk': 3},
+        }
+        with mock.patch("pdf_processor.utils.get_catalogue"):
+            processor = PDFProcessor(config)
+        self.addCleanup(processor.close)
+        return processor
+
+    def test_parallel_matches_sequential(self):
+        """Test that pooled extraction returns the sequential text in page order and the pool closes"""
+        sequential = self.processor(0).extract_text(self.pdf_path)
+        processor = self.processor(2)
+
+        text = processor.extract_text(self.pdf_path)
+        pool = processor._extract_pool
+
+        self.assertEqual(text, sequential)
+        positions = [text.index(f"Page {number} of") for number in range(1, 11)]
+        self.assertEqual(positions, sorted(positions))
+        self.assertIsNotNone(pool)
+
+        processor.close()
+        self.assertIsNone(processor._extract_pool)
+        with self.assertRaises(RuntimeError):
+            pool.submit(int)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Unit tests for the concurrent chapter pipeline
+"""
+
+import threading
+import time
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pipeline import ChapterPipeline
+
+
+class TestChapterPipeline(unittest.TestCase):
+    """Test cases for the per-stage worker pools"""
+
+    def test_results_keep_input_order(self):
+        """Test that every state passes every stage and results stay ordered"""
+        def stage(name):
+            def run(state):
+                time.sleep(0.01 * (5 - state["n"]))
+                state["trail"].append(name)
+                return state
+            return run
+
+        pipeline = ChapterPipeline([("a", stage("a"), 3), ("b", stage("b"), 2)])
+        states = [{"n": n, "trail": []} for n in range(5)]
+        results = pipeline.run(states)
+
+        self.assertEqual([s["n"] for s in results], list(range(5)))
+        self.assertTrue(all(s["trail"] == ["a", "b"] for s in results))
+
+    def test_stage_concurrency_is_bounded(self):
+        """Test that a stage never runs more workers than configured"""
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def slow(state):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+            return state
+
+        pipeline = ChapterPipeline([("fast", lambda s: s, 8), ("slow", slow, 2)])
+        pipeline.run([{} for _ in range(8)])
+
+        self.assertEqual(active["peak"], 2)
+
+    def test_exception_stops_chapter(self):
+        """Test that a raising stage is reported and later stages are skipped"""
+        def boom(state):
+            if state["n"] == 1:
+                raise RuntimeError("boom")
+            return state
+
+        seen = []
+        pipeline = ChapterPipeline([("a", boom, 2), ("b", lambda s: dict(s, done=True), 1)])
+        results = pipeline.run([{"n": 0}, {"n": 1}],
+                               on_complete=lambda i, s, e: seen.append((i, e is None)))
+
+        self.assertTrue(results[0]["done"])
+        self.assertNotIn("done", results[1])
+        self.assertEqual(sorted(seen), [(0, True), (1, False)])
+
+    def test_chapters_in_flight_are_bounded(self):
+        """Test that new chapters enter the first stage only as others complete"""
+        lock = threading.Lock()
+        in_flight = {"now": 0, "peak": 0}
+
+        def enter(state):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            return state
+
+        def slow(state):
+            time.sleep(0.01)
+            return state
+
+        def leave(index, state, exc):
+            with lock:
+                in_flight["now"] -= 1
+
+        pipeline = ChapterPipeline([("fast", enter, 4), ("slow", slow, 1)], max_in_flight=3)
+        results = pipeline.run([{"n": n} for n in range(12)], on_complete=leave)
+
+        self.assertEqual([s["n"] for s in results], list(range(12)))
+        self.assertEqual(in_flight["peak"], 3)
+        self.assertEqual(ChapterPipeline([("a", enter, 4), ("b", slow, 2)]).max_in_flight, 8)
+
+    def test_stop_skips_remaining_stages(self):
+        """Test that a state matching stop() completes without reaching later stages"""
+        def stage(name):
+            def run(state):
+                state["trail"].append(name)
+                state["failed"] = name == "a" and state["n"] == 1
+                return state
+            return run
+
+        completed = []
+        pipeline = ChapterPipeline([("a", stage("a"), 2), ("b", stage("b"), 2)], stop=lambda s: s["failed"])
+        results = pipeline.run([{"n": n, "trail": []} for n in range(3)],
+                               on_complete=lambda index, state, exc: completed.append(index))
+
+        self.assertEqual([s["trail"] for s in results], [["a", "b"], ["a"], ["a", "b"]])
+        self.assertEqual(sorted(completed), [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
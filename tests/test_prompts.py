@@ -0,0 +1,55 @@
+"""
+Unit tests for the compiled notes prompt templates
+"""
+
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from chunking import estimate_tokens
+from prompts import NotesPrompts
+
+
+class TestNotesPrompts(unittest.TestCase):
+    """Test cases for building prompts from the `notes:` settings"""
+
+    def test_flags_remove_sections(self):
+        """Test that disabled sections are left out and shrink the prompt"""
+        full = NotesPrompts(grade=9, student_name="Asha")
+        lean = NotesPrompts(grade=9, student_name="Asha", notes={
+            'include_mnemonics': False, 'include_exam_tips': False, 'include_practice_questions': False})
+
+        self.assertIn("Memory Tricks", full.instruction)
+        for heading in ("Memory Tricks", "Exam Strategy", "Practice Questions"):
+            self.assertNotIn(heading, lean.instruction)
+        self.assertIn("Key Concepts", lean.instruction)
+        self.assertLess(lean.instruction_tokens, full.instruction_tokens)
+        self.assertNotIn("mnemonics", lean.sections)
+
+    def test_settings_are_rendered(self):
+        """Test grade, student, question count and difficulty wording"""
+        prompts = NotesPrompts(grade=9, student_name="Asha",
+                               notes={'practice_questions_count': 6, 'difficulty_level': 'advanced'})
+
+        self.assertIn("9th-grade student named Asha", prompts.instruction)
+        self.assertIn("(4 short and 2 long answer questions", prompts.instruction)
+        self.assertIn("competitive-exam depth", prompts.instruction)
+        self.assertNotIn("{", prompts.instruction.replace("{grade}", ""))
+
+    def test_chapter_and_map_prompts(self):
+        """Test that per-call prompts join the static segments with the chapter values"""
+        prompts = NotesPrompts(grade=10)
+
+        self.assertEqual(prompts.chapter_prompt("Text {x}", "Science", "Light"),
+                         "Subject: Science\nChapter: Light\n\nOriginal Content:\nText {x}")
+        map_prompt = prompts.map_prompt("CHUNK", 2, 5, "Science", "Light")
+        self.assertTrue(map_prompt.startswith('You are condensing part 2 of 5 of the 10th-grade NCERT Science chapter "Light"'))
+        self.assertTrue(map_prompt.endswith("Part 2 of 5:\nCHUNK"))
+        self.assertEqual(prompts.prompt_tokens(map_prompt), prompts.instruction_tokens + estimate_tokens(map_prompt))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Unit tests for the Gemini rate limiter and retry policy
+"""
+
+import asyncio
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import rate_limit
+from rate_limit import GeminiRateLimiter, TokenBucket, is_rate_limited, is_retryable, retry_after
+
+
+class QuotaError(Exception):
+    """Stand-in for google.api_core.exceptions.ResourceExhausted"""
+    code = 429
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for reservation-based token buckets"""
+
+    def test_reservations_queue_behind_each_other(self):
+        """Test that callers beyond the burst wait one interval each"""
+        bucket = TokenBucket(rate_per_minute=60, burst_seconds=2)
+        waits = [bucket.reserve(1, now=100.0) for _ in range(5)]
+        self.assertEqual(waits, [0.0, 0.0, 1.0, 2.0, 3.0])
+
+    def test_refill_over_time(self):
+        """Test that unused capacity accrues up to the burst size"""
+        bucket = TokenBucket(rate_per_minute=60, burst_seconds=2)
+        bucket.reserve(2, now=100.0)
+        self.assertEqual(bucket.reserve(2, now=110.0), 0.0)
+
+
+class TestRetryHints(unittest.TestCase):
+    """Test cases for error classification and server hints"""
+
+    def test_classification(self):
+        self.assertTrue(is_retryable(QuotaError("quota")))
+        self.assertTrue(is_retryable(Exception("503 UNAVAILABLE")))
+        self.assertFalse(is_retryable(ValueError("Invalid argument: prompt blocked")))
+
+    def test_rate_limits_need_a_status_not_a_number(self):
+        """Test that 429 inside counts or ids does not count as a quota error"""
+        self.assertTrue(is_rate_limited(QuotaError("quota")))
+        self.assertTrue(is_rate_limited(Exception("429 Too Many Requests")))
+        self.assertTrue(is_rate_limited(Exception("429 Resource has been exhausted (e.g. check quota).")))
+        self.assertTrue(is_rate_limited(Exception("RESOURCE_EXHAUSTED")))
+        for message in ("Input of 14290 tokens exceeds the limit", "Response of 429 bytes could not be parsed",
+                        "Request 429-abc failed: invalid argument"):
+            self.assertFalse(is_rate_limited(ValueError(message)), message)
+
+    def test_hint_sources(self):
+        """Test RetryInfo details, Retry-After headers and message hints"""
+        detail = SimpleNamespace(retry_delay=SimpleNamespace(seconds=7, nanos=500_000_000))
+        self.assertEqual(retry_after(SimpleNamespace(details=[detail])), 7.5)
+
+        error = Exception("busy")
+        error.response = SimpleNamespace(headers={"Retry-After": "3"})
+        self.assertEqual(retry_after(error), 3.0)
+
+        self.assertEqual(retry_after(Exception('429 Quota exceeded. Please retry in 12.5s.')), 12.5)
+        self.assertEqual(retry_after(Exception('{"retryDelay": "20s"}')), 20.0)
+        self.assertIsNone(retry_after(Exception("boom")))
+
+
+class TestGeminiRateLimiter(unittest.TestCase):
+    """Test cases for adaptive throttling and retries"""
+
+    def setUp(self):
+        self.sleeps = []
+        patch = mock.patch.object(rate_limit.time, "sleep", side_effect=self.sleeps.append)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_429_is_retried_after_hint_and_lowers_rate(self):
+        """Test that a quota error waits for the hint, halves the rate and then recovers"""
+        limiter = GeminiRateLimiter(requests_per_minute=600, backoff_base=0.01)
+        send = mock.Mock(side_effect=[QuotaError("Resource exhausted, retry in 4s"), SimpleNamespace(text="ok")])
+
+        response = limiter.call(send, "prompt")
+
+        self.assertEqual(response.text, "ok")
+        self.assertEqual(send.call_count, 2)
+        self.assertGreaterEqual(max(self.sleeps), 4.0)
+        self.assertAlmostEqual(limiter.rate_fraction, 0.55)
+        self.assertEqual(limiter.stats()["rate_limited"], 1)
+
+    def test_non_retryable_errors_propagate(self):
+        limiter = GeminiRateLimiter()
+        send = mock.Mock(side_effect=ValueError("safety block"))
+        with self.assertRaises(ValueError):
+            limiter.call(send, "prompt")
+        self.assertEqual(send.call_count, 1)
+
+    def test_retries_are_bounded(self):
+        limiter = GeminiRateLimiter(max_retries=2, backoff_base=0.01)
+        send = mock.Mock(side_effect=QuotaError("quota"))
+        with self.assertRaises(QuotaError):
+            limiter.call(send, "prompt")
+        self.assertEqual(send.call_count, 3)
+
+    def test_rate_never_drops_below_floor(self):
+        limiter = GeminiRateLimiter(requests_per_minute=60, min_rate_fraction=0.2)
+        for _ in range(10):
+            limiter.last_decrease = 0.0
+            limiter.on_rate_limited(None)
+        self.assertEqual(limiter.rate_fraction, 0.2)
+        self.assertAlmostEqual(limiter.requests.rate, 0.2)
+
+    def test_async_call(self):
+        """Test the async path retries without blocking on time.sleep"""
+        limiter = GeminiRateLimiter(backoff_base=0.001)
+        attempts = []
+
+        async def send():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise Exception("503 UNAVAILABLE")
+            return SimpleNamespace(text="ok")
+
+        response = asyncio.run(limiter.acall(send, "prompt"))
+        self.assertEqual((response.text, len(attempts)), ("ok", 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
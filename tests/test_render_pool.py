@@ -0,0 +1,65 @@
+"""
+Unit tests for the PDF render process pool
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from notes_generator import NotesGenerator
+from render_pool import RenderPool
+
+
+class TestRenderPool(unittest.TestCase):
+    """Test cases for rendering notes in worker processes"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_renders_in_worker_processes(self):
+        """Test that jobs come back as PDFs and render times are recorded in the parent"""
+        config = {'google': {'model': 'gemini'}, 'output': {'notes_dir': self.tmp.name}, 'cache': {'enabled': False}}
+        generator = NotesGenerator(None, config)
+        renders = generator.documents.renders
+        pool = RenderPool(processes=2)
+        self.addCleanup(pool.close)
+
+        futures = [generator.submit_pdf(pool, f"# Notes {i}\n- **point**", "Science", f"Chapter {i}")
+                   for i in range(3)]
+        paths = [future.result(timeout=60) for future in futures]
+
+        self.assertTrue(all(path.read_bytes().startswith(b"%PDF") for path in paths))
+        self.assertEqual(len(set(paths)), 3)
+        self.assertEqual(generator.documents.renders - renders, 3)
+        self.assertEqual(pool.stats()["rendered"], 3)
+
+    def test_full_queue_blocks_submit(self):
+        """Test that submits wait for a free slot instead of queueing without bound"""
+        pool = RenderPool(processes=1, max_pending=1)
+        self.addCleanup(pool.close)
+        job = ({}, "Student", 10, "# Notes", "Science")
+
+        first = pool.submit(*job, "One", Path(self.tmp.name, "one.pdf"))
+        second = pool.submit(*job, "Two", Path(self.tmp.name, "two.pdf"))
+
+        self.assertTrue(first.done())
+        second.result(timeout=60)
+        stats = pool.stats()
+        self.assertEqual(stats["peak_queued"], 1)
+        self.assertGreater(stats["generation_blocked_s"], 0)
+
+    def test_from_config(self):
+        """Test that render_processes 0 disables the pool"""
+        self.assertIsNone(RenderPool.from_config({'concurrency': {'render_processes': 0}}))
+        pool = RenderPool.from_config({'concurrency': {'render_processes': 3}})
+        self.addCleanup(pool.close)
+        self.assertEqual((pool.processes, pool.max_pending), (3, 6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Unit tests for the shared stylesheet registry and document factory
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reportlab.lib.pagesizes import A4, letter
+
+from notes_generator import NotesGenerator
+from theme import get_document_factory, get_stylesheet
+
+
+class TestTheme(unittest.TestCase):
+    """Test cases for styles and page setup built from the `output:` config"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def generator(self, **output):
+        config = {
+            'google': {'model': 'gemini', 'max_tokens': 1000, 'temperature': 0.7},
+            'output': {'notes_dir': self.tmp.name, **output},
+            'cache': {'enabled': False},
+        }
+        return NotesGenerator(None, config)
+
+    def test_styles_are_built_once_per_process(self):
+        """Test that generators with the same output settings share one stylesheet and factory"""
+        first, second = self.generator(), self.generator()
+
+        self.assertIs(first.documents, second.documents)
+        self.assertIs(first._build_styles(), second._build_styles())
+        self.assertIs(first.for_grade(9).documents, first.documents)
+
+    def test_output_settings_are_applied(self):
+        """Test page size, font size, theme and margins from the config"""
+        default = get_document_factory({})
+        custom = get_document_factory({'page_size': 'letter', 'font_size': 22, 'theme': 'print',
+                                       'margins': {'left': 36}})
+
+        self.assertEqual((default.page_size, custom.page_size), (A4, letter))
+        self.assertEqual(default.styles['title'].fontSize, 24)
+        self.assertEqual(custom.styles['title'].fontSize, 48)
+        self.assertEqual(custom.styles['body'].fontSize, 22)
+        self.assertEqual(str(custom.styles['heading1'].textColor), str(get_stylesheet('print')['heading1'].textColor))
+        self.assertEqual((custom.margins['left'], custom.margins['bottom']), (36, 36))
+        with self.assertRaises(ValueError):
+            get_document_factory({'theme': 'neon'})
+
+    def test_render_time_is_recorded(self):
+        """Test that every rendered chapter is timed"""
+        generator = self.generator(font_size=10.5)
+        before = generator.documents.renders
+
+        path = generator.save_as_pdf("# Title\n- point", "Science", "Light")
+
+        self.assertTrue(path.read_bytes().startswith(b"%PDF"))
+        self.assertEqual(generator.documents.renders, before + 1)
+        self.assertGreater(generator.documents.render_seconds, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
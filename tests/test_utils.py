@@ -0,0 +1,70 @@
+"""
+Unit tests for the configuration registry
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from utils import ConfigRegistry, load_config, load_subjects_data
+
+
+class TestConfigRegistry(unittest.TestCase):
+    """Test cases for parse-once configuration loading"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "data.json"
+        self.path.write_text(json.dumps({"value": 1}))
+        self.registry = ConfigRegistry()
+        self.parses = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def parse(self, path):
+        self.parses += 1
+        return json.loads(path.read_text())
+
+    def test_parses_once_until_mtime_changes(self):
+        """Test that repeated loads reuse the parse and a modified file is re-read"""
+        self.assertEqual(self.registry.load(self.path, self.parse), {"value": 1})
+        self.assertEqual(self.registry.load(self.path, self.parse), {"value": 1})
+        self.assertEqual(self.parses, 1)
+
+        self.path.write_text(json.dumps({"value": 2}))
+        stat = self.path.stat()
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(self.registry.load(self.path, self.parse), {"value": 2})
+        self.assertEqual(self.parses, 2)
+
+    def test_derived_values_follow_their_file(self):
+        """Test that derived indexes are rebuilt only when the source is re-parsed"""
+        builds = []
+        build = lambda data: builds.append(data) or data["value"] * 10
+
+        self.assertEqual(self.registry.derived(self.path, "x10", self.parse, build), 10)
+        self.assertEqual(self.registry.derived(self.path, "x10", self.parse, build), 10)
+        self.assertEqual(len(builds), 1)
+
+    def test_load_config_returns_private_copies(self):
+        """Test that callers cannot mutate the shared parse"""
+        config = load_config()
+        config['grade'] = -1
+        self.assertNotEqual(load_config()['grade'], -1)
+
+    def test_load_subjects_data_returns_private_copies(self):
+        """Test that callers cannot mutate the shared subjects parse"""
+        subjects = load_subjects_data(10)
+        subjects.clear()
+        self.assertNotEqual(load_subjects_data(10), {})
+
+
+if __name__ == '__main__':
+    unittest.main()